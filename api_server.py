@@ -1,122 +1,166 @@
 """Backend API server for React frontend to communicate with agents."""
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import asyncio
-from src.my_util import my_a2a
+import contextlib
+import json
+import uvicorn
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from sse_starlette.sse import EventSourceResponse
+from a2a.types import Message, TaskStatusUpdateEvent
+from src.my_util import my_a2a, health_monitor, get_result_text, get_result_data
+from src.my_util.settings import get_settings, get_settings_manager
+from src.green_agent.tasks import get_task_registry
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for React frontend
 
+# Batch health answers may be this old; background probes keep registered agents fresher
+BATCH_HEALTH_MAX_AGE = 2 * health_monitor.interval
+# At most this many URLs per batch health request
+MAX_BATCH_URLS = 50
 
-async def check_agent_ready(url):
-    """Check if an agent is ready"""
-    try:
-        ready = await my_a2a.wait_agent_ready(url, timeout=2)
-        return ready
-    except Exception:
-        return False
+
+async def check_agent_ready(url, fresh=False):
+    """Cached health of an agent (probed now if stale, or always when `fresh`)"""
+    return await my_a2a.check_health(url, max_age=0 if fresh else None)
 
 
 async def send_message_to_agent(url, message):
     """Send a message to an agent and get response"""
     try:
         response = await my_a2a.send_message(url, message)
-        
-        # Extract text from response
-        from a2a.utils import get_text_parts
-        text_parts = get_text_parts(response.root.result.parts)
-        
-        if text_parts:
-            return text_parts[0]
+
+        # Extract text from the response (a Message, or a Task for agents that report progress)
+        text = get_result_text(response.root.result)
+
+        if text:
+            return text
         else:
             return str(response.root.result)
     except Exception as e:
         raise Exception(f"Failed to send message: {str(e)}")
 
 
-def run_async(coro):
-    """Helper to run async functions in Flask"""
-    # Create a new event loop for this thread
-    new_loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(new_loop)
+async def stream_evaluation_events(url, message):
+    """Relay a streamed green agent evaluation as SSE: progress events, then the result"""
     try:
-        return new_loop.run_until_complete(coro)
-    finally:
-        new_loop.close()
+        async for result in my_a2a.stream_message(url, message):
+            for event in get_result_data(result):
+                yield {'event': 'progress', 'data': json.dumps(event)}
+            if isinstance(result, Message) or (isinstance(result, TaskStatusUpdateEvent) and result.final):
+                yield {'event': 'result', 'data': json.dumps({'response': get_result_text(result)})}
+    except Exception as e:
+        yield {'event': 'error', 'data': json.dumps({'error': f"Failed to stream evaluation: {str(e)}"})}
 
 
-@app.route('/api/check-agent', methods=['GET'])
-def check_agent():
+async def read_json(request):
+    """Return the JSON request body as a dict, or None if it is missing or malformed"""
+    try:
+        data = await request.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def check_agent(request):
     """Check if an agent is ready"""
-    url = request.args.get('url')
+    url = request.query_params.get('url')
     if not url:
-        return jsonify({'error': 'URL parameter required'}), 400
-    
+        return JSONResponse({'error': 'URL parameter required'}, status_code=400)
+
+    fresh = request.query_params.get('fresh', '').lower() in ('1', 'true', 'yes')
     try:
-        ready = run_async(check_agent_ready(url))
-        return jsonify({'ready': ready})
+        health = await check_agent_ready(url, fresh)
+        return JSONResponse(health)
     except Exception as e:
-        return jsonify({'error': str(e), 'ready': False}), 500
+        return JSONResponse({'error': str(e), 'ready': False}, status_code=500)
+
+
+async def agents_health(request):
+    """Health of many agents in one call (?url=...&url=...); the agents are then probed in the background"""
+    urls = request.query_params.getlist('url')
+    if not urls:
+        return JSONResponse({'error': 'at least one url parameter required'}, status_code=400)
+    if len(urls) > MAX_BATCH_URLS:
+        return JSONResponse({'error': f'at most {MAX_BATCH_URLS} urls per request'}, status_code=400)
 
+    health_monitor.register(*urls)
+    agents = await my_a2a.check_health_many(urls, max_age=BATCH_HEALTH_MAX_AGE)
+    return JSONResponse({'agents': agents})
 
-@app.route('/api/send-message', methods=['POST'])
-def send_message():
+
+async def send_message(request):
     """Send a message to an agent"""
-    data = request.get_json()
+    data = await read_json(request)
+    if data is None:
+        return JSONResponse({'error': 'JSON body required'}, status_code=400)
     url = data.get('url')
     message = data.get('message')
-    
+
     if not url or not message:
-        return jsonify({'error': 'URL and message required'}), 400
-    
+        return JSONResponse({'error': 'URL and message required'}, status_code=400)
+
     try:
-        response_text = run_async(send_message_to_agent(url, message))
-        return jsonify({'response': response_text})
+        response_text = await send_message_to_agent(url, message)
+        return JSONResponse({'response': response_text})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return JSONResponse({'error': str(e)}, status_code=500)
 
 
-@app.route('/api/health', methods=['GET'])
-def health():
+async def health(request):
     """Health check endpoint"""
-    return jsonify({'status': 'ok'})
+    return JSONResponse({'status': 'ok', 'settings': get_settings_manager().stats()})
 
 
-@app.route('/api/test-cases', methods=['GET'])
-def get_test_cases():
+async def a2a_stats(request):
+    """Connection pool, agent card cache and health monitor statistics"""
+    return JSONResponse({**my_a2a.pool_stats(), 'health': health_monitor.stats()})
+
+
+async def get_test_cases(request):
     """Get predefined test cases for the demo"""
     test_cases = [
         {
-            "id": "med_001",
-            "name": "Blood Pressure Retrieval",
-            "description": "Retrieve the blood pressure reading for patient MRN S1234567",
-            "expected_answer": "118/77 mmHg",
-            "category": "vitals"
-        },
-        {
-            "id": "med_002",
-            "name": "Hemoglobin Lab Result",
-            "description": "Get the latest lab results for patient MRN S1234567, specifically the hemoglobin level",
-            "expected_answer": "14.2 g/dL",
-            "category": "labs"
+            "id": task["task_id"],
+            "name": task["name"],
+            "description": task["description"],
+            "expected_answer": ", ".join(task["expected_answer"] or []),
+            "category": task["category"]
         }
+        for task in get_task_registry().all()
     ]
-    return jsonify({'test_cases': test_cases})
+    return JSONResponse({'test_cases': test_cases})
 
 
-@app.route('/api/run-evaluation', methods=['POST'])
-def run_evaluation():
+def parse_max_steps(value):
+    """A request's step limit: the max_steps setting when absent, None when it is not a positive integer"""
+    if value is None:
+        return get_settings().max_steps
+    if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+        return None
+    try:
+        steps = int(value)
+    except (TypeError, ValueError):
+        return None
+    return steps if steps > 0 else None
+
+
+async def run_evaluation(request):
     """Trigger green agent to evaluate white agent"""
-    data = request.get_json()
+    data = await read_json(request)
+    if data is None:
+        return JSONResponse({'error': 'JSON body required'}, status_code=400)
     green_agent_url = data.get('green_agent_url')
     white_agent_url = data.get('white_agent_url')
     task_description = data.get('task_description', 'Retrieve the blood pressure reading for patient MRN S1234567')
-    max_steps = int(data.get('max_steps', 30))
-    
+
     if not green_agent_url or not white_agent_url:
-        return jsonify({'error': 'green_agent_url and white_agent_url required'}), 400
-    
+        return JSONResponse({'error': 'green_agent_url and white_agent_url required'}, status_code=400)
+    max_steps = parse_max_steps(data.get('max_steps'))
+    if max_steps is None:
+        return JSONResponse({'error': 'max_steps must be a positive integer'}, status_code=400)
+
     try:
         # Format the task message for the green agent
         task_message = f"""
@@ -132,16 +176,48 @@ You should test it with the following medical task:
 {max_steps}
 </max_steps>
 """
-        
-        response_text = run_async(send_message_to_agent(green_agent_url, task_message))
-        return jsonify({'response': response_text})
+
+        if data.get('stream'):
+            # Server-sent events: one "progress" event per step, then "result" (or "error")
+            return EventSourceResponse(stream_evaluation_events(green_agent_url, task_message))
+
+        response_text = await send_message_to_agent(green_agent_url, task_message)
+        return JSONResponse({'response': response_text})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # All requests share the server's event loop and the pooled A2A session
+    health_monitor.start()
+    get_settings_manager().watch()
+    yield
+    await health_monitor.stop()
+    await my_a2a.aclose()
+
+
+def create_app():
+    """Build the ASGI app serving the /api/* routes"""
+    routes = [
+        Route('/api/check-agent', check_agent, methods=['GET']),
+        Route('/api/agents-health', agents_health, methods=['GET']),
+        Route('/api/send-message', send_message, methods=['POST']),
+        Route('/api/health', health, methods=['GET']),
+        Route('/api/a2a-stats', a2a_stats, methods=['GET']),
+        Route('/api/test-cases', get_test_cases, methods=['GET']),
+        Route('/api/run-evaluation', run_evaluation, methods=['POST']),
+    ]
+    # Enable CORS for React frontend
+    middleware = [Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])]
+    return Starlette(routes=routes, middleware=middleware, lifespan=lifespan)
 
 
-if __name__ == '__main__':
-    port = 5001  # Use 5001 to avoid conflict with macOS AirPlay on 5000
-    print(f"Starting API server on http://localhost:{port}")
-    print("Make sure your agents are running on ports 9001 (green) and 9002 (white)")
-    app.run(host='0.0.0.0', port=port, debug=True)
+app = create_app()
+
 
+if __name__ == '__main__':
+    settings = get_settings()
+    print(f"Starting API server on http://localhost:{settings.api_port}")
+    print(f"Make sure your agents are running on ports {settings.green_port} (green) and {settings.white_port} (white)")
+    uvicorn.run(app, host=settings.api_host, port=settings.api_port)
@@ -0,0 +1,121 @@
+"""Micro-benchmark: per-step parse cost of the action parser vs the legacy regex pair.
+
+Usage:
+    python benchmarks/bench_action_parser.py [--number N]
+
+The legacy functions below are verbatim copies of the pre-parser
+implementation in src/green_agent/agent.py, kept here as the baseline.
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.green_agent.actions import parse_action  # noqa: E402
+
+SAMPLES = [
+    "GET https://api.medical.example.com/vitals.search?mrn=S1234567&name=BP",
+    "GET https://api.medical.example.com/labs.search?mrn=S1234567&test=hemoglobin&from=2023-01-01&to=2024-02-01",
+    'POST https://api.medical.example.com/vital.create {"mrn": "S1234567", "name": "BP", "value": "120/80", "unit": "mmHg"}',
+    'finish(["118/77 mmHg"])',
+    'finish(["14.2 g/dL", "2024-01-15T10:30:00Z"])',
+    "I think the answer is 118/77",
+]
+
+
+def legacy_parse_white_agent_response(response_text: str):
+    """
+    Parse white agent response to extract GET/POST/finish calls.
+    Returns tuple: (action_type, action_data)
+    """
+    response_text = response_text.strip()
+    
+    # Check for finish([...])
+    finish_match = re.match(r'finish\s*\(\[(.*?)\]\)', response_text, re.DOTALL)
+    if finish_match:
+        content = finish_match.group(1).strip()
+        # Parse array elements
+        if content:
+            # Simple parsing - handle quoted strings
+            items = []
+            for item in content.split(','):
+                item = item.strip().strip('"\'')
+                items.append(item)
+            return ("finish", items)
+        else:
+            return ("finish", [])
+    
+    # Check for GET request
+    get_match = re.match(r'GET\s+([^\s]+)', response_text)
+    if get_match:
+        url = get_match.group(1).strip()
+        return ("GET", url)
+    
+    # Check for POST request
+    post_match = re.match(r'POST\s+([^\s]+)\s+(.+)', response_text, re.DOTALL)
+    if post_match:
+        url = post_match.group(1).strip()
+        payload = post_match.group(2).strip()
+        try:
+            payload_dict = json.loads(payload)
+            return ("POST", {"url": url, "payload": payload_dict})
+        except json.JSONDecodeError:
+            return ("POST", {"url": url, "payload": payload})
+    
+    return (None, None)
+
+
+def legacy_validate_response_format(response_text: str) -> bool:
+    """Validate that response follows strict formatting rules"""
+    response_text = response_text.strip()
+    
+    # Must be one of: GET, POST, or finish
+    valid_patterns = [
+        r'^GET\s+[^\s]+$',
+        r'^POST\s+[^\s]+\s+\{.*\}$',
+        r'^POST\s+[^\s]+\s+.*$',
+        r'^finish\s*\(\[.*?\]\)$',
+    ]
+    
+    for pattern in valid_patterns:
+        if re.match(pattern, response_text, re.DOTALL):
+            return True
+    
+    return False
+
+
+def legacy_step(text):
+    """What evaluate_white_agent used to do per step"""
+    legacy_validate_response_format(text)
+    return legacy_parse_white_agent_response(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200_000, help="steps per measurement")
+    args = parser.parse_args()
+
+    results = {}
+    for name, fn in (("legacy_validate_and_parse", legacy_step), ("parse_action", parse_action)):
+        per_sample = {}
+        for sample in SAMPLES:
+            best = min(timeit.repeat(lambda: fn(sample), number=args.number // len(SAMPLES), repeat=5))
+            per_sample[sample[:40]] = best / (args.number // len(SAMPLES)) * 1e9
+        results[name] = {
+            "mean_ns_per_step": sum(per_sample.values()) / len(per_sample),
+            "per_sample_ns": per_sample,
+        }
+
+    legacy_ns = results["legacy_validate_and_parse"]["mean_ns_per_step"]
+    new_ns = results["parse_action"]["mean_ns_per_step"]
+    results["speedup"] = legacy_ns / new_ns
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Load test: requests/sec of the frontend API server under concurrent calls.
+
+Usage:
+    python api_server.py &
+    python benchmarks/bench_api_server.py [--api URL] [--requests N] [--concurrency C]
+
+An echo A2A agent is started in-process and used as the target of
+/api/check-agent and /api/send-message, so no LLM or API key is needed.
+To compare against another server build (e.g. the old Flask version from
+git history), start it on another port and pass its URL with --api.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from a2a.server.agent_execution import AgentExecutor  # noqa: E402
+from a2a.server.apps import A2AStarletteApplication  # noqa: E402
+from a2a.server.request_handlers import DefaultRequestHandler  # noqa: E402
+from a2a.server.tasks import InMemoryTaskStore  # noqa: E402
+from a2a.utils import new_agent_text_message  # noqa: E402
+from src.white_agent.agent import prepare_white_agent_card  # noqa: E402
+
+
+class EchoExecutor(AgentExecutor):
+    async def execute(self, context, event_queue):
+        await event_queue.enqueue_event(
+            new_agent_text_message(f"echo: {context.get_user_input()}", context_id=context.context_id)
+        )
+
+    async def cancel(self, context, event_queue):
+        pass
+
+
+def start_echo_agent(port: int) -> str:
+    url = f"http://localhost:{port}"
+    app = A2AStarletteApplication(
+        agent_card=prepare_white_agent_card(url),
+        http_handler=DefaultRequestHandler(agent_executor=EchoExecutor(), task_store=InMemoryTaskStore()),
+    ).build()
+    server = uvicorn.Server(uvicorn.Config(app, host="localhost", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return url
+
+
+async def load(client: httpx.AsyncClient, make_request, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await make_request(client, i)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "req_per_sec": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main(args):
+    agent_url = start_echo_agent(args.agent_port)
+    scenarios = {
+        "check-agent": lambda client, i: client.get(f"{args.api}/api/check-agent", params={"url": agent_url}),
+        "send-message": lambda client, i: client.post(
+            f"{args.api}/api/send-message", json={"url": agent_url, "message": f"ping {i}"}
+        ),
+    }
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        for name, make_request in scenarios.items():
+            # Warm up the server's card cache and connection pool
+            await load(client, make_request, min(10, args.requests), 1)
+            result = await load(client, make_request, args.requests, args.concurrency)
+            print(
+                f"{name:<13} {result['req_per_sec']:8.1f} req/s   "
+                f"p50 {result['p50_ms']:7.1f} ms   p99 {result['p99_ms']:7.1f} ms   "
+                f"errors {result['errors']}/{result['requests']}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--api", default="http://localhost:5001", help="API server base URL")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--agent-port", type=int, default=9190, help="port for the in-process echo agent")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,132 @@
+"""Micro-benchmark: bulk re-grading throughput of the unit-aware grader vs the legacy substring matcher.
+
+Usage:
+    python benchmarks/bench_grading.py [--answers N] [--distinct N]
+
+Answers are generated for the corpus tasks: correct values, the same values
+in other units, near misses and wrong units. `--distinct` bounds how many
+different answer strings occur (stored results repeat a lot); use a value
+as large as `--answers` to measure the uncached parse cost.
+The legacy function below is a verbatim copy of the pre-grader matching in
+src/green_agent/agent.py, kept here as the baseline.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.green_agent.grading import grade_many, parse_quantities  # noqa: E402
+from src.green_agent.tasks import get_task_registry  # noqa: E402
+
+# task_id-independent answer templates per expected answer; {d} is a small perturbation
+VARIANTS = {
+    "118/77 mmHg": ["{a}/{b} mmHg", "BP {a}/{b}", "{a}/{b} mm Hg on 2024-01-15T10:30:00Z", "{a} mmHg"],
+    "14.2 g/dL": ["{x:.1f} g/dL", "{y:.0f} g/L", "Hemoglobin {x:.1f}", "{x:.0f}"],
+    "72 bpm": ["{n} bpm", "HR {n} beats per minute", "{n}", "{n} mmHg"],
+    "95 mg/dL": ["{n} mg/dL", "{m:.2f} mmol/L", "glucose {n}", "{n} g/dL"],
+}
+
+
+def legacy_grade(final_answer, expected) -> bool:
+    """What evaluate_white_agent used to do for tasks with an expected answer"""
+    success = False
+    # Normalize final_answer - handle both list and string
+    if isinstance(final_answer, list):
+        final_answer_str = " ".join(str(item) for item in final_answer)
+    else:
+        final_answer_str = str(final_answer)
+    final_answer_str = final_answer_str.lower().strip()
+
+    if isinstance(expected, list):
+        # Check if any expected value matches (flexible substring matching)
+        for exp in expected:
+            exp_str = str(exp).lower().strip()
+            # Remove units for more flexible matching
+            exp_clean = exp_str.replace("mmhg", "").replace("g/dl", "").replace("/", "").strip()
+            ans_clean = final_answer_str.replace("mmhg", "").replace("g/dl", "").replace("/", "").strip()
+
+            # Check multiple matching strategies
+            if (exp_str in final_answer_str or
+                final_answer_str in exp_str or
+                exp_clean in ans_clean or
+                ans_clean in exp_clean or
+                any(part in final_answer_str for part in exp_str.split() if len(part) > 2)):
+                success = True
+                break
+    else:
+        # Single expected value
+        exp_str = str(expected).lower().strip()
+        exp_clean = exp_str.replace("mmhg", "").replace("g/dl", "").replace("/", "").strip()
+        ans_clean = final_answer_str.replace("mmhg", "").replace("g/dl", "").replace("/", "").strip()
+
+        success = (exp_str in final_answer_str or
+                  final_answer_str in exp_str or
+                  exp_clean in ans_clean or
+                  ans_clean in exp_clean)
+    return success
+
+
+def make_answer(rng: random.Random, expected: str) -> list:
+    d = rng.choice((0, 0, 0, 1, -1, 3))
+    template = rng.choice(VARIANTS[expected])
+    x = 14.2 + d / 10
+    n = {"72 bpm": 72, "95 mg/dL": 95}.get(expected, 0) + d
+    return [template.format(a=118 + d, b=77, x=x, y=x * 10, n=n, m=n / 18.0156)]
+
+
+def generate(count: int, distinct: int, seed: int = 0):
+    rng = random.Random(seed)
+    tasks = [t for t in get_task_registry().all() if t.get("expected_answer")]
+    pool = []
+    for _ in range(min(distinct, count)):
+        task = rng.choice(tasks)
+        answer = make_answer(rng, task["expected_answer"][0])
+        if len(pool) >= distinct // 2:
+            # Make the answer string unique so it misses every cache
+            answer = [f"{answer[0]} (ref {len(pool)})"]
+        pool.append((task, answer))
+    pairs = [pool[i % len(pool)] for i in range(count)]
+    rng.shuffle(pairs)
+    return [t for t, _ in pairs], [a for _, a in pairs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=1_000_000, help="answers to grade")
+    parser.add_argument("--distinct", type=int, default=10_000, help="distinct answer strings among them")
+    args = parser.parse_args()
+
+    tasks, answers = generate(args.answers, args.distinct)
+    parse_quantities.cache_clear()
+
+    started = time.perf_counter()
+    legacy = [legacy_grade(answer, task["expected_answer"]) for task, answer in zip(tasks, answers)]
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    graded = grade_many(tasks, answers)
+    grader_seconds = time.perf_counter() - started
+
+    # Deterministic: a second pass gives identical grades
+    assert grade_many(tasks, answers) == graded
+
+    results = {
+        "answers": args.answers,
+        "distinct_answers": min(args.distinct, args.answers),
+        "legacy": {"seconds": legacy_seconds, "answers_per_s": args.answers / legacy_seconds,
+                   "success_rate": sum(legacy) / len(legacy)},
+        "grade_many": {"seconds": grader_seconds, "answers_per_s": args.answers / grader_seconds,
+                       "success_rate": sum(graded) / len(graded)},
+        "disagreements": sum(a != b for a, b in zip(legacy, graded)),
+        "parse_cache": parse_quantities.cache_info()._asdict(),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Throughput benchmark: evaluations/sec and per-step overhead of the green agent harness.
+
+Usage:
+    python benchmarks/bench_harness.py [--evaluations N] [--concurrency C] [--output FILE]
+
+The green agent's suite runner evaluates an in-process scripted white agent
+(src/white_agent/scripted.py), so no LLM or API key is needed and every run
+takes the same path. Per-step latency is split into the A2A round trip to the
+white agent, action parsing, the EHR tool call and grading. Write the results
+with --output and compare the JSON across commits to catch harness regressions.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from itertools import islice, cycle
+from pathlib import Path
+
+import numpy as np
+import uvicorn
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.green_agent.agent import evaluate_suite, select_tasks  # noqa: E402
+from src.my_util import my_a2a  # noqa: E402
+from src.white_agent.scripted import build_scripted_white_app  # noqa: E402
+
+PHASES = ("a2a", "parse", "tool", "grade")
+
+
+def start_scripted_agent(port: int, delay: float) -> str:
+    url = f"http://localhost:{port}"
+    app = build_scripted_white_app(url, delay)
+    server = uvicorn.Server(uvicorn.Config(app, host="localhost", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return url
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def latency_summary(samples: list) -> dict:
+    if not samples:
+        return {"count": 0, "p50_ms": None, "p99_ms": None, "mean_ms": None}
+    values = np.asarray(samples) * 1000
+    p50, p99 = np.percentile(values, [50, 99])
+    return {"count": len(samples), "p50_ms": float(p50), "p99_ms": float(p99), "mean_ms": float(values.mean())}
+
+
+def phase_samples(results: list) -> dict:
+    samples = {phase: [] for phase in PHASES}
+    for result in results:
+        timings = result.get("timings") or {}
+        for phase in ("a2a", "parse", "tool"):
+            samples[phase].extend(timings.get(phase, []))
+        if timings.get("grade"):
+            samples["grade"].append(timings["grade"])
+    return samples
+
+
+async def run(args, url: str, tasks: list) -> dict:
+    # Warm up the agent card cache and connection pool
+    await evaluate_suite(url, tasks[:1], args.max_steps, concurrency=1)
+    if args.tracemalloc:
+        tracemalloc.start()
+    started = time.perf_counter()
+    suite = await evaluate_suite(url, tasks, args.max_steps, concurrency=args.concurrency)
+    elapsed = time.perf_counter() - started
+    traced_peak = tracemalloc.get_traced_memory()[1] / (1 << 20) if args.tracemalloc else None
+    tracemalloc.stop()
+    await my_a2a.aclose()
+
+    results = suite["results"]
+    samples = phase_samples(results)
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {
+            "evaluations": len(tasks),
+            "concurrency": args.concurrency,
+            "max_steps": args.max_steps,
+            "agent_delay": args.delay,
+            "category": args.category,
+        },
+        "elapsed_s": elapsed,
+        "evaluations_per_sec": len(tasks) / elapsed,
+        "steps": sum(r["steps"] for r in results),
+        "steps_per_sec": sum(r["steps"] for r in results) / elapsed,
+        "success_rate": suite["aggregate"]["success_rate"],
+        "errors": sum(1 for r in results if str(r.get("notes", "")).startswith("Error")),
+        "latency": {phase: latency_summary(samples[phase]) for phase in PHASES},
+        "peak_rss_mb": peak_rss_mb(),
+        "tracemalloc_peak_mb": traced_peak,
+    }
+
+
+def print_report(report: dict):
+    config = report["config"]
+    print(
+        f"{config['evaluations']} evaluations, concurrency {config['concurrency']}: "
+        f"{report['evaluations_per_sec']:.1f} evals/s, {report['steps_per_sec']:.1f} steps/s "
+        f"({report['elapsed_s']:.2f} s, success {report['success_rate']:.0%}, errors {report['errors']})"
+    )
+    for phase, summary in report["latency"].items():
+        if summary["count"]:
+            print(
+                f"  {phase:<6} p50 {summary['p50_ms']:8.3f} ms   p99 {summary['p99_ms']:8.3f} ms   "
+                f"n={summary['count']}"
+            )
+    memory = f"peak RSS {report['peak_rss_mb']:.1f} MB"
+    if report["tracemalloc_peak_mb"] is not None:
+        memory += f", traced peak {report['tracemalloc_peak_mb']:.1f} MB"
+    print(f"  {memory}")
+
+
+def main(args):
+    tasks = select_tasks(category=args.category)
+    if not tasks:
+        sys.exit(f"No tasks found for category {args.category!r}")
+    tasks = list(islice(cycle(tasks), args.evaluations))
+    url = start_scripted_agent(args.agent_port, args.delay)
+    report = asyncio.run(run(args, url, tasks))
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--evaluations", type=int, default=200, help="evaluations to run (tasks are cycled)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--max-steps", type=int, default=10)
+    parser.add_argument("--category", default=None, help="only cycle tasks from this category")
+    parser.add_argument("--delay", type=float, default=0.0, help="simulated white agent think time (seconds)")
+    parser.add_argument("--agent-port", type=int, default=9191, help="port for the in-process scripted agent")
+    parser.add_argument("--tracemalloc", action="store_true", help="also trace Python allocations (slower)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    main(parser.parse_args())
@@ -0,0 +1,105 @@
+"""Startup benchmark: cold-start time of each main.py subcommand in a fresh interpreter.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat N] [--budget SECONDS] [--output FILE]
+
+Each probe runs in a new Python process and imports what its subcommand
+loads before doing any work (the agents' server stack, the launcher, the
+report module); "help" runs `main.py --help` end to end. The report lists
+the median and best wall time per probe and whether LiteLLM was imported,
+which no subcommand should do at startup. With --budget the script exits
+non-zero when any median exceeds it, so CI can catch import regressions.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Modules that should only load on first use
+HEAVY_MODULES = ("litellm", "openai")
+
+# probe name -> Python source run in a fresh interpreter from the repo root
+PROBES = {
+    "help": "import sys; sys.argv = ['main.py', '--help']\nimport main\ntry:\n    main.app()\nexcept SystemExit:\n    pass",
+    "green": "import main\nfrom src.green_agent import start_green_agent",
+    "white": "import main\nfrom src.white_agent import start_white_agent",
+    "launch": "import main\nfrom src.launcher import launch_evaluation",
+    "fleet": "import main\nfrom src.launcher import run_fleet",
+    "report": "import main\nfrom src.green_agent.reporting import build_report",
+}
+
+_REPORT_HEAVY = "\nimport json, sys\nprint(json.dumps([m for m in {heavy!r} if m in sys.modules]))"
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=ROOT,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_probe(source: str) -> tuple:
+    """(wall seconds, heavy modules loaded) of one fresh interpreter running `source`"""
+    code = source + _REPORT_HEAVY.format(heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    elapsed = time.perf_counter() - started
+    return elapsed, json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(args):
+    # One untimed run warms the OS file cache and __pycache__, so every probe measures the same thing
+    run_probe(PROBES["help"])
+    probes = {}
+    for name in args.probe or PROBES:
+        samples = []
+        loaded = []
+        for _ in range(args.repeat):
+            elapsed, loaded = run_probe(PROBES[name])
+            samples.append(elapsed)
+        probes[name] = {
+            "median_s": statistics.median(samples),
+            "best_s": min(samples),
+            "heavy_modules": loaded,
+        }
+        print(f"  {name:<8} median {probes[name]['median_s']:.3f}s   best {probes[name]['best_s']:.3f}s"
+              + (f"   loaded {', '.join(loaded)}" if loaded else ""))
+
+    failures = [f"{name} imports {', '.join(p['heavy_modules'])}" for name, p in probes.items() if p["heavy_modules"]]
+    if args.budget is not None:
+        failures += [
+            f"{name} median {p['median_s']:.3f}s > budget {args.budget:.3f}s"
+            for name, p in probes.items() if p["median_s"] > args.budget
+        ]
+    report = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "budget_s": args.budget,
+        "probes": probes,
+        "failures": failures,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.output}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per probe")
+    parser.add_argument("--probe", action="append", choices=sorted(PROBES), help="only these probes (repeatable)")
+    parser.add_argument("--budget", type=float, default=None, help="fail if any median exceeds this many seconds")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    main(parser.parse_args())
@@ -1,30 +1,115 @@
 """CLI entry point for orthoai-agent."""
 
 import typer
-import asyncio
-
-from src.green_agent import start_green_agent
-from src.white_agent import start_white_agent
-from src.launcher import launch_evaluation
 
+# Subcommands import what they need when they run: the agents pull in the A2A
+# server stack and uvicorn, so `--help` and the other commands stay fast
 app = typer.Typer(help="OrthoAI Agent - Medical context agents for AgentBeats evaluation platform")
 
 
 @app.command()
-def green():
+def green(
+    workers: int = typer.Option(1, help="Worker processes; more than one shares tasks through TASK_STORE_PATH"),
+    judge_model: str = typer.Option(
+        None, help="Judge for tasks without an expected answer; 'local' for the offline stand-in "
+        "(default: the judge_model setting, openai/gpt-4o-mini)"
+    ),
+):
     """Start the green agent (assessment manager)."""
-    start_green_agent()
+    from src.green_agent import start_green_agent
+
+    start_green_agent(workers=workers, judge_model=judge_model)
 
 
 @app.command()
-def white():
+def white(
+    cache_mode: str = typer.Option(
+        None, help="LLM completion cache mode: off, readwrite or replay (default: LLM_CACHE_MODE or readwrite)"
+    ),
+    cache_path: str = typer.Option(None, help="SQLite file for the completion cache (default: LLM_CACHE_PATH)"),
+    replay: str = typer.Option(
+        None, help="Answer from recorded transcripts (results database, suite/result JSON or JSONL) instead of the LLM"
+    ),
+    workers: int = typer.Option(
+        1, help="Worker processes; more than one shares tasks and conversations through TASK_STORE_PATH"
+    ),
+    model: str = typer.Option(None, help="LLM model (default: the white_model setting, openai/gpt-4o)"),
+):
     """Start the white agent (target being tested)."""
-    start_white_agent()
+    if replay and workers > 1:
+        raise typer.BadParameter("Transcript replay runs in a single worker; drop --workers or --replay")
+    from src.white_agent import start_white_agent
+
+    start_white_agent(cache_mode=cache_mode, cache_path=cache_path, replay=replay, workers=workers, model=model)
+
+
+@app.command()
+def report(
+    db: str = typer.Option(None, help="Results database (default: RESULTS_DB_PATH or .cache/results.sqlite)"),
+    by: list[str] = typer.Option(["category", "agent"], help="Break down by category, agent, task or model (repeatable)"),
+    task_id: str = typer.Option(None, help="Only runs of this task"),
+    agent_url: str = typer.Option(None, help="Only runs against this white agent URL"),
+    model: str = typer.Option(None, help="Only runs of this model"),
+    category: str = typer.Option(None, help="Only runs in this category"),
+    since_days: float = typer.Option(None, help="Only runs from the last N days"),
+    bootstrap: int = typer.Option(2000, help="Bootstrap samples for confidence intervals"),
+    confidence: float = typer.Option(0.95, help="Confidence level of the intervals"),
+    seed: int = typer.Option(0, help="Random seed for the bootstrap"),
+    json_output: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+):
+    """Summarize stored evaluation results: success rates, steps, latency percentiles and bootstrap CIs."""
+    import os
+    import time
+    from src.green_agent.reporting import build_report, format_report, load_result_arrays, report_json
+    from src.green_agent.results_store import DEFAULT_RESULTS_PATH
+
+    path = db or os.getenv("RESULTS_DB_PATH") or DEFAULT_RESULTS_PATH
+    if not os.path.exists(path):
+        raise typer.BadParameter(f"No results database at {path}")
+    since = time.time() - since_days * 86400 if since_days is not None else None
+    arrays = load_result_arrays(
+        path, task_id=task_id, agent_url=agent_url, model=model, category=category, since=since
+    )
+    try:
+        result = build_report(arrays, by=by, n_boot=bootstrap, confidence=confidence, seed=seed)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    print(report_json(result) if json_output else format_report(result))
+
+
+@app.command()
+def fleet(
+    white: int = typer.Option(2, help="Number of white agents, on consecutive ports from --white-port"),
+    model: list[str] = typer.Option(None, help="Model per white agent (repeatable, cycled over the agents)"),
+    green_port: int = typer.Option(None, help="Green agent port (default: the green_port setting, 9001)"),
+    white_port: int = typer.Option(None, help="First white agent port (default: the white_port setting, 9002)"),
+    task_ids: str = typer.Option("all", help="Comma-separated task ids, or all"),
+    category: str = typer.Option(None, help="Only tasks in this category"),
+    mode: str = typer.Option("split", help="split: deal the tasks across the white agents; each: every agent runs every task"),
+    rounds: int = typer.Option(1, help="Suite evaluations to run on the same fleet"),
+    max_steps: int = typer.Option(None, help="Step limit per task (default: the max_steps setting, 30)"),
+    concurrency: int = typer.Option(8, help="Concurrent tasks per white agent"),
+    serve: bool = typer.Option(False, help="Keep the fleet running after the rounds until interrupted"),
+):
+    """Start a green agent and N white agents in parallel and run suites across them."""
+    import asyncio
+    from src.launcher import DISTRIBUTION_MODES, run_fleet
+
+    if mode not in DISTRIBUTION_MODES:
+        raise typer.BadParameter(f"--mode must be one of {', '.join(DISTRIBUTION_MODES)}")
+    asyncio.run(run_fleet(
+        white_count=white, models=model, green_port=green_port, white_port=white_port,
+        task_ids=task_ids if task_ids == "all" else task_ids.split(","), category=category, mode=mode,
+        rounds=rounds, max_steps=max_steps, concurrency=concurrency, serve=serve,
+    ))
 
 
 @app.command()
 def launch():
     """Launch the complete evaluation workflow."""
+    import asyncio
+    from src.launcher import launch_evaluation
+
     asyncio.run(launch_evaluation())
 
 
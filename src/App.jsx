@@ -57,37 +57,55 @@ function EvaluationDemo({ greenAgentUrl, whiteAgentUrl }) {
     }
   }, [selectedTestCase])
 
-  // Parse step-by-step interactions from white agent output
+  // Step-by-step interactions from the result's recorded transcript
   useEffect(() => {
-    if (evaluationResult && evaluationResult.white_agent_output) {
-      const steps = evaluationResult.white_agent_output.split('\n').filter(line => line.trim())
-      const parsedSteps = steps.map((step, idx) => {
-        const trimmed = step.trim()
-        let actionType = 'unknown'
-        let actionData = trimmed
-        
-        if (trimmed.startsWith('GET')) {
-          actionType = 'GET'
-          actionData = trimmed.substring(3).trim()
-        } else if (trimmed.startsWith('POST')) {
-          actionType = 'POST'
-          actionData = trimmed.substring(4).trim()
-        } else if (trimmed.startsWith('finish')) {
-          actionType = 'finish'
-          actionData = trimmed
-        }
-        
-        return {
-          step: idx + 1,
-          actionType,
-          actionData: trimmed,
-          timestamp: new Date()
-        }
-      })
-      setStepByStepInteractions(parsedSteps)
+    const steps = evaluationResult && evaluationResult.transcript && evaluationResult.transcript.steps
+    if (steps && steps.length > 0) {
+      const recordedSteps = steps.map(step => ({
+        step: step.step,
+        actionType: step.action.kind || 'unknown',
+        actionData: step.white_text,
+        toolResult: step.tool_result,
+        timestamp: new Date()
+      }))
+      // Steps streamed live take precedence over the recorded ones
+      setStepByStepInteractions(prev => prev.length > 0 ? prev : recordedSteps)
     }
   }, [evaluationResult])
 
+  // Parse one streamed evaluation result text into the result object
+  const parseEvaluationResponse = (responseText) => {
+    try {
+      // Extract JSON from the response text
+      const jsonMatch = (responseText || '').match(/\{[\s\S]*\}/)
+      if (jsonMatch) {
+        return JSON.parse(jsonMatch[0])
+      }
+      return { raw_response: responseText }
+    } catch (e) {
+      return { raw_response: responseText }
+    }
+  }
+
+  // Handle one "progress" event: a white agent step with its tool result and running metrics
+  const handleProgressEvent = (event) => {
+    if (event.type !== 'step') return
+    const action = event.action || {}
+    setStepByStepInteractions(prev => [...prev, {
+      step: event.step,
+      actionType: action.kind || 'unknown',
+      actionData: event.white_text,
+      toolResult: event.tool_result,
+      metrics: event.metrics,
+      timestamp: new Date()
+    }])
+    setInteractionLog(prev => [...prev, {
+      type: event.format_errors && event.format_errors.length > 0 ? 'error' : 'info',
+      message: `Step ${event.step}: ${action.kind || 'invalid response'}${action.url ? ' ' + action.url : ''}`,
+      timestamp: new Date()
+    }])
+  }
+
   const runEvaluation = async () => {
     if (!greenAgentUrl || !whiteAgentUrl) {
       alert('Please set both agent URLs')
@@ -96,59 +114,79 @@ function EvaluationDemo({ greenAgentUrl, whiteAgentUrl }) {
 
     setIsRunning(true)
     setEvaluationResult(null)
+    setStepByStepInteractions([])
     setInteractionLog([{ type: 'info', message: 'Starting evaluation...', timestamp: new Date() }])
 
+    const fail = (message) => {
+      setInteractionLog(prev => [...prev, {
+        type: 'error',
+        message: `Error: ${message}`,
+        timestamp: new Date()
+      }])
+      setEvaluationResult({ success: false, error: message })
+    }
+
     try {
       const response = await fetch('/api/run-evaluation', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
         body: JSON.stringify({
           green_agent_url: greenAgentUrl,
           white_agent_url: whiteAgentUrl,
           task_description: taskDescription,
-          max_steps: 30
+          max_steps: 30,
+          stream: true
         })
       })
 
-      const data = await response.json()
-      
-      if (data.error) {
-        setInteractionLog(prev => [...prev, {
-          type: 'error',
-          message: `Error: ${data.error}`,
-          timestamp: new Date()
-        }])
-        setEvaluationResult({ success: false, error: data.error })
-      } else {
-        // Try to parse the response as JSON
-        let result = null
-        try {
-          // Extract JSON from the response text
-          const responseText = data.response || ''
-          const jsonMatch = responseText.match(/\{[\s\S]*\}/)
-          if (jsonMatch) {
-            result = JSON.parse(jsonMatch[0])
-          } else {
-            result = { raw_response: responseText }
+      if (!response.ok) {
+        const data = await response.json()
+        fail(data.error || `HTTP ${response.status}`)
+        return
+      }
+
+      // Read the server-sent event stream: "progress" per step, then "result" or "error"
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      let finished = false
+      while (!finished) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, '\n')
+        let boundary
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const raw = buffer.slice(0, boundary)
+          buffer = buffer.slice(boundary + 2)
+          let eventName = 'message'
+          const dataLines = []
+          for (const line of raw.split('\n')) {
+            if (line.startsWith('event:')) eventName = line.slice(6).trim()
+            else if (line.startsWith('data:')) dataLines.push(line.slice(5).trimStart())
+          }
+          if (dataLines.length === 0) continue
+          const payload = JSON.parse(dataLines.join('\n'))
+          if (eventName === 'progress') {
+            handleProgressEvent(payload)
+          } else if (eventName === 'result') {
+            setEvaluationResult(parseEvaluationResponse(payload.response))
+            setInteractionLog(prev => [...prev, {
+              type: 'success',
+              message: 'Evaluation completed',
+              timestamp: new Date()
+            }])
+            finished = true
+          } else if (eventName === 'error') {
+            fail(payload.error)
+            finished = true
           }
-        } catch (e) {
-          result = { raw_response: data.response }
         }
-        
-        setEvaluationResult(result)
-        setInteractionLog(prev => [...prev, {
-          type: 'success',
-          message: 'Evaluation completed',
-          timestamp: new Date()
-        }])
+      }
+      if (!finished) {
+        fail('Evaluation stream ended without a result')
       }
     } catch (error) {
-      setInteractionLog(prev => [...prev, {
-        type: 'error',
-        message: `Error: ${error.message}`,
-        timestamp: new Date()
-      }])
-      setEvaluationResult({ success: false, error: error.message })
+      fail(error.message)
     } finally {
       setIsRunning(false)
     }
@@ -329,7 +367,7 @@ function EvaluationDemo({ greenAgentUrl, whiteAgentUrl }) {
           disabled={isRunning || !greenAgentUrl || !whiteAgentUrl}
           className="btn-run-evaluation"
         >
-          {isRunning ? 'Running Evaluation...' : 'Run Evaluation'}
+          {isRunning ? `Running Evaluation...${stepByStepInteractions.length ? ` (step ${stepByStepInteractions.length})` : ''}` : 'Run Evaluation'}
         </button>
       </div>
 
@@ -351,6 +389,12 @@ function EvaluationDemo({ greenAgentUrl, whiteAgentUrl }) {
                       <strong>Green Agent:</strong> Simulates API call and returns medical data
                     </div>
                   )}
+                  {step.toolResult && (
+                    <details className="step-explanation">
+                      <summary>Tool Result</summary>
+                      <pre className="action-data">{step.toolResult}</pre>
+                    </details>
+                  )}
                   {step.actionType === 'finish' && (
                     <div className="step-explanation">
                       <strong>Green Agent:</strong> Evaluates answer correctness against ground truth
@@ -433,10 +477,12 @@ function EvaluationDemo({ greenAgentUrl, whiteAgentUrl }) {
               </div>
             )}
 
-            {evaluationResult.white_agent_output && (
+            {evaluationResult.transcript && evaluationResult.transcript.steps.length > 0 && (
               <details className="result-detail">
                 <summary>White Agent Output</summary>
-                <pre className="agent-output">{evaluationResult.white_agent_output}</pre>
+                <pre className="agent-output">
+                  {evaluationResult.transcript.steps.map(step => step.white_text).join('\n')}
+                </pre>
               </details>
             )}
 
@@ -453,14 +499,56 @@ function EvaluationDemo({ greenAgentUrl, whiteAgentUrl }) {
   )
 }
 
-function AgentPanel({ agentName, agentColor, agentUrl, defaultPort, onUrlChange }) {
+// Agents are polled together through the server's cached health monitor
+const HEALTH_POLL_INTERVAL_MS = 5000
+
+function useAgentsHealth(urls) {
+  const [health, setHealth] = useState({})
+  const key = urls.join('\n')
+
+  useEffect(() => {
+    let cancelled = false
+    const poll = async () => {
+      try {
+        const query = urls.map(url => `url=${encodeURIComponent(url)}`).join('&')
+        const response = await fetch(`/api/agents-health?${query}`)
+        const data = await response.json()
+        if (!cancelled && data.agents) {
+          setHealth(data.agents)
+        }
+      } catch (error) {
+        if (!cancelled) {
+          setHealth({})
+        }
+      }
+    }
+    poll()
+    const timer = setInterval(poll, HEALTH_POLL_INTERVAL_MS)
+    return () => {
+      cancelled = true
+      clearInterval(timer)
+    }
+  }, [key])
+
+  return health
+}
+
+function AgentPanel({ agentName, agentColor, agentUrl, defaultPort, onUrlChange, health }) {
   const [messages, setMessages] = useState([])
   const [input, setInput] = useState('')
   const [isLoading, setIsLoading] = useState(false)
   const [isConnected, setIsConnected] = useState(false)
+  const [latencyMs, setLatencyMs] = useState(null)
   const [url, setUrl] = useState(agentUrl || `http://localhost:${defaultPort}`)
   const messagesEndRef = useRef(null)
 
+  useEffect(() => {
+    if (health) {
+      setIsConnected(health.ready || false)
+      setLatencyMs(health.latency_ms)
+    }
+  }, [health])
+
   useEffect(() => {
     if (onUrlChange) {
       onUrlChange(url)
@@ -477,11 +565,14 @@ function AgentPanel({ agentName, agentColor, agentUrl, defaultPort, onUrlChange
 
   const checkConnection = async () => {
     try {
-      const response = await fetch(`/api/check-agent?url=${encodeURIComponent(url)}`)
+      // The Check button always probes the agent instead of reading the cache
+      const response = await fetch(`/api/check-agent?url=${encodeURIComponent(url)}&fresh=1`)
       const data = await response.json()
       setIsConnected(data.ready || false)
+      setLatencyMs(data.latency_ms)
     } catch (error) {
       setIsConnected(false)
+      setLatencyMs(null)
     }
   }
 
@@ -547,6 +638,7 @@ function AgentPanel({ agentName, agentColor, agentUrl, defaultPort, onUrlChange
           <div className={`connection-status ${isConnected ? 'connected' : 'disconnected'}`}>
             <span className="status-dot"></span>
             {isConnected ? 'Connected' : 'Disconnected'}
+            {isConnected && latencyMs != null && ` · ${Math.round(latencyMs)} ms`}
           </div>
         </div>
         <div className="agent-controls">
@@ -631,6 +723,7 @@ function App() {
   const [greenAgentUrl, setGreenAgentUrl] = useState('http://localhost:9001')
   const [whiteAgentUrl, setWhiteAgentUrl] = useState('http://localhost:9002')
   const [activeTab, setActiveTab] = useState('demo') // 'demo' or 'chat'
+  const agentsHealth = useAgentsHealth([greenAgentUrl, whiteAgentUrl])
 
   useEffect(() => {
     console.log('App component mounted')
@@ -670,12 +763,14 @@ function App() {
               agentColor="#10b981"
               defaultPort={9001}
               onUrlChange={setGreenAgentUrl}
+              health={agentsHealth[greenAgentUrl]}
             />
             <AgentPanel
               agentName="White Agent"
               agentColor="#3b82f6"
               defaultPort={9002}
               onUrlChange={setWhiteAgentUrl}
+              health={agentsHealth[whiteAgentUrl]}
             />
           </div>
         </div>
@@ -686,12 +781,14 @@ function App() {
             agentColor="#10b981"
             defaultPort={9001}
             onUrlChange={setGreenAgentUrl}
+            health={agentsHealth[greenAgentUrl]}
           />
           <AgentPanel
             agentName="White Agent"
             agentColor="#3b82f6"
             defaultPort={9002}
             onUrlChange={setWhiteAgentUrl}
+            health={agentsHealth[whiteAgentUrl]}
           />
         </div>
       )}
@@ -1,6 +1,12 @@
 """Green agent module - responsible for managing medical assessments."""
 
-from .agent import start_green_agent
-
 __all__ = ["start_green_agent"]
 
+
+def __getattr__(name):
+    # Importing the package (e.g. for a submodule) does not load the agent server stack
+    if name == "start_green_agent":
+        from .agent import start_green_agent
+        return start_green_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
@@ -0,0 +1,250 @@
+"""Action parser - single-pass parsing and validation of white agent GET/POST/finish responses."""
+
+import json
+import re
+from urllib.parse import unquote_plus
+
+# One compiled pattern recognises the action header; the rest is scanned by hand
+_HEADER_RE = re.compile(r"(?:(GET|POST)\s+(\S+)|finish\s*\(\s*\[)")
+_WS_RE = re.compile(r"\s*")
+_JSON = json.JSONDecoder()
+
+_CLOSERS = {"[": "]", "{": "}"}
+
+
+class ActionError:
+    """A validation error at a character offset of the (stripped) response"""
+
+    __slots__ = ("position", "message")
+
+    def __init__(self, position: int, message: str):
+        self.position = position
+        self.message = message
+
+    def to_dict(self) -> dict:
+        return {"position": self.position, "message": self.message}
+
+    def __repr__(self):
+        return f"ActionError({self.position}, {self.message!r})"
+
+
+class Action:
+    """
+    A parsed white agent response.
+    `kind` is "GET", "POST", "finish" or None when no action could be recognised;
+    `errors` lists format violations even when the action itself is usable.
+    """
+
+    __slots__ = ("kind", "url", "query", "payload", "items", "errors", "text")
+
+    def __init__(self, text: str):
+        self.kind = None
+        self.url = None
+        self.query = None
+        self.payload = None
+        self.items = None
+        self.errors = []
+        self.text = text
+
+    @property
+    def valid(self) -> bool:
+        return self.kind is not None and not self.errors
+
+    def error(self, position: int, message: str):
+        self.errors.append(ActionError(position, message))
+
+    def legacy_tuple(self):
+        """Return the (action_type, action_data) shape of parse_white_agent_response"""
+        if self.kind == "GET":
+            return ("GET", self.url)
+        if self.kind == "POST":
+            return ("POST", {"url": self.url, "payload": self.payload})
+        if self.kind == "finish":
+            return ("finish", self.items)
+        return (None, None)
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    return _WS_RE.match(text, pos).end()
+
+
+def _parse_query(url: str) -> dict:
+    """Split a URL query string into a dict (last value wins, like the EHR)"""
+    query = url.partition("?")[2]
+    if not query:
+        return {}
+    query = query.partition("#")[0]
+    params = {}
+    for pair in query.split("&"):
+        if not pair:
+            continue
+        key, _, value = pair.partition("=")
+        if "%" in pair or "+" in pair:
+            key = unquote_plus(key)
+            value = unquote_plus(value)
+        params[key] = value
+    return params
+
+
+def _scan_bare(text: str, pos: int) -> int:
+    """Scan an unquoted list item up to the next top-level ',' or ']'"""
+    depth = []
+    quote = None
+    n = len(text)
+    while pos < n:
+        ch = text[pos]
+        if quote:
+            if ch == "\\":
+                pos += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch in _CLOSERS:
+            depth.append(_CLOSERS[ch])
+        elif depth and ch == depth[-1]:
+            depth.pop()
+        elif not depth and ch in ",]":
+            return pos
+        pos += 1
+    return pos
+
+
+def _scan_single_quoted(text: str, pos: int):
+    """Parse a '...' string starting at pos; returns (value, end) or (None, pos)"""
+    out = []
+    i = pos + 1
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch == "\\" and i + 1 < n:
+            out.append(text[i + 1])
+            i += 2
+            continue
+        if ch == "'":
+            return "".join(out), i + 1
+        out.append(ch)
+        i += 1
+    return None, pos
+
+
+def _parse_finish_items(action: Action, text: str, pos: int) -> int:
+    """Parse list items after 'finish([' ; returns the offset after the closing ']' or -1"""
+    items = []
+    n = len(text)
+    while True:
+        pos = _skip_ws(text, pos)
+        if pos >= n:
+            action.error(pos, "unterminated finish([...]) list")
+            return -1
+        ch = text[pos]
+        if ch == "]":
+            action.items = items
+            return pos + 1
+
+        if ch == '"':
+            try:
+                value, end = _JSON.raw_decode(text, pos)
+            except json.JSONDecodeError as e:
+                action.error(e.pos, f"invalid string literal: {e.msg}")
+                return -1
+        elif ch == "'":
+            value, end = _scan_single_quoted(text, pos)
+            if value is None:
+                action.error(pos, "unterminated string literal")
+                return -1
+        else:
+            end = _scan_bare(text, pos)
+            token = text[pos:end].strip()
+            if not token:
+                action.error(pos, "empty list item")
+                return -1
+            try:
+                value = json.loads(token)
+            except ValueError:
+                value = token
+        items.append(value)
+
+        pos = _skip_ws(text, end)
+        if pos < n and text[pos] == ",":
+            pos += 1
+        elif pos < n and text[pos] == "]":
+            continue
+        else:
+            action.error(pos, "expected ',' or ']' in finish([...]) list")
+            return -1
+
+
+def parse_action(response_text: str) -> Action:
+    """Parse and validate a white agent response in a single pass"""
+    text = response_text.strip()
+    action = Action(text)
+    match = _HEADER_RE.match(text)
+    if match is None:
+        action.error(0, "expected GET <url>, POST <url> <json> or finish([...])")
+        return action
+
+    verb = match.group(1)
+    pos = match.end()
+    n = len(text)
+
+    if verb == "GET":
+        action.kind = "GET"
+        action.url = match.group(2)
+        action.query = _parse_query(action.url)
+        rest = _skip_ws(text, pos)
+        if rest < n:
+            action.error(rest, "unexpected text after GET URL")
+        return action
+
+    if verb == "POST":
+        url = match.group(2)
+        body = _skip_ws(text, pos)
+        if body == pos or body >= n:
+            action.error(body, "POST requires a JSON body after the URL")
+            return action
+        action.kind = "POST"
+        action.url = url
+        action.query = _parse_query(url)
+        try:
+            payload, end = _JSON.raw_decode(text, body)
+        except json.JSONDecodeError as e:
+            action.payload = text[body:]
+            action.error(e.pos, f"invalid JSON body: {e.msg}")
+            return action
+        action.payload = payload
+        end = _skip_ws(text, end)
+        if end < n:
+            action.error(end, "unexpected text after POST body")
+        return action
+
+    # finish([...]): well-formed JSON lists decode in one call, anything else is tokenized
+    try:
+        items, end = _JSON.raw_decode(text, pos - 1)
+        action.items = items
+    except json.JSONDecodeError:
+        end = _parse_finish_items(action, text, pos)
+        if end < 0:
+            return action
+    end = _skip_ws(text, end)
+    if end >= n or text[end] != ")":
+        action.error(end, "expected ')' to close finish(")
+        return action
+    action.kind = "finish"
+    end = _skip_ws(text, end + 1)
+    if end < n:
+        action.error(end, "unexpected text after finish(...)")
+    return action
+
+
+def parse_white_agent_response(response_text: str):
+    """
+    Parse white agent response to extract GET/POST/finish calls.
+    Returns tuple: (action_type, action_data)
+    """
+    return parse_action(response_text).legacy_tuple()
+
+
+def validate_response_format(response_text: str) -> bool:
+    """Validate that response follows strict formatting rules"""
+    return parse_action(response_text).valid
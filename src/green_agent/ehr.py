@@ -0,0 +1,488 @@
+"""Simulated EHR backend - indexed in-memory patient vitals and labs behind the task API."""
+
+import json
+import os
+import random
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+
+VITALS = "vitals"
+LABS = "labs"
+
+DEFAULT_SYNTHETIC_PATIENTS = 1000
+DEFAULT_READINGS_PER_SERIES = 20
+
+# Canonical observation name -> (unit, decimals, aliases)
+VITAL_TYPES = {
+    "BP": ("mmHg", 0, ("bp", "blood pressure", "blood_pressure", "bloodpressure")),
+    "HR": ("bpm", 0, ("hr", "heart rate", "heart_rate", "heartrate", "pulse")),
+    "TEMP": ("C", 1, ("temp", "temperature", "body temperature")),
+    "SPO2": ("%", 0, ("spo2", "o2 sat", "oxygen saturation", "o2sat")),
+    "RR": ("breaths/min", 0, ("rr", "respiratory rate", "resp rate")),
+    "WEIGHT": ("kg", 1, ("weight", "wt", "body weight")),
+}
+LAB_TYPES = {
+    "hemoglobin": ("g/dL", 1, ("hemoglobin", "hgb", "hb", "haemoglobin")),
+    "glucose": ("mg/dL", 0, ("glucose", "blood glucose", "blood sugar", "glu")),
+    "potassium": ("mmol/L", 1, ("potassium", "k")),
+    "sodium": ("mmol/L", 0, ("sodium", "na")),
+    "creatinine": ("mg/dL", 2, ("creatinine", "cr", "creat")),
+    "wbc": ("10^3/uL", 1, ("wbc", "white blood cells", "white blood cell count")),
+}
+
+# Synthetic value generators: canonical name -> (mean, spread[, second mean, second spread])
+_SYNTHETIC_RANGES = {
+    "BP": (122.0, 14.0, 79.0, 9.0),
+    "HR": (74.0, 10.0),
+    "TEMP": (36.8, 0.4),
+    "SPO2": (97.0, 1.5),
+    "RR": (16.0, 2.5),
+    "WEIGHT": (78.0, 15.0),
+    "hemoglobin": (13.8, 1.4),
+    "glucose": (98.0, 15.0),
+    "potassium": (4.2, 0.4),
+    "sodium": (140.0, 2.5),
+    "creatinine": (0.95, 0.2),
+    "wbc": (7.0, 1.8),
+}
+
+# Fixed reference patient used by the bundled task corpus
+REFERENCE_PATIENT = {
+    "mrn": "S1234567",
+    VITALS: [
+        ("BP", "2023-11-02T09:15:00Z", "124/81"),
+        ("BP", "2023-12-20T14:05:00Z", "121/79"),
+        ("BP", "2024-01-15T10:30:00Z", "118/77"),
+        ("HR", "2023-12-20T14:05:00Z", "76"),
+        ("HR", "2024-01-15T10:30:00Z", "72"),
+        ("TEMP", "2024-01-15T10:30:00Z", "36.7"),
+        ("SPO2", "2024-01-15T10:30:00Z", "98"),
+    ],
+    LABS: [
+        ("hemoglobin", "2023-10-05T08:00:00Z", "13.9"),
+        ("hemoglobin", "2024-01-15T10:30:00Z", "14.2"),
+        ("glucose", "2023-10-05T08:00:00Z", "101"),
+        ("glucose", "2024-01-15T10:30:00Z", "95"),
+        ("potassium", "2024-01-15T10:30:00Z", "4.1"),
+    ],
+}
+
+_SYNTHETIC_START = int(datetime(2022, 1, 1, tzinfo=timezone.utc).timestamp())
+_SYNTHETIC_END = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+def _build_alias_map(types: dict) -> dict:
+    aliases = {}
+    for name, (_, _, names) in types.items():
+        aliases[name.lower()] = name
+        for alias in names:
+            aliases[alias] = name
+    return aliases
+
+
+_ALIASES = {VITALS: _build_alias_map(VITAL_TYPES), LABS: _build_alias_map(LAB_TYPES)}
+_TYPES = {VITALS: VITAL_TYPES, LABS: LAB_TYPES}
+
+
+def parse_timestamp(value: str) -> int:
+    """Parse an ISO-8601 timestamp or date into epoch seconds (UTC)"""
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def format_timestamp(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class EHRError(Exception):
+    """Request error surfaced to the white agent as an API error response"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class Series:
+    """
+    Time-ordered readings for one (patient, observation) pair.
+    Timestamps and values live in typed arrays; compound values such as
+    blood pressure keep their second component in `values2`.
+    """
+
+    __slots__ = ("times", "values", "values2", "unit", "decimals")
+
+    def __init__(self, unit: str, decimals: int, compound: bool = False):
+        self.times = array("q")
+        self.values = array("d")
+        self.values2 = array("d") if compound else None
+        self.unit = unit
+        self.decimals = decimals
+
+    def copy(self) -> "Series":
+        clone = Series(self.unit, self.decimals, self.values2 is not None)
+        clone.times = array("q", self.times)
+        clone.values = array("d", self.values)
+        if self.values2 is not None:
+            clone.values2 = array("d", self.values2)
+        return clone
+
+    def append(self, epoch: int, value: float, value2: float = 0.0):
+        """Insert a reading keeping timestamps sorted (O(1) when appending in order)"""
+        if not self.times or epoch >= self.times[-1]:
+            index = len(self.times)
+        else:
+            index = bisect_right(self.times, epoch)
+        self.times.insert(index, epoch)
+        self.values.insert(index, value)
+        if self.values2 is not None:
+            self.values2.insert(index, value2)
+
+    def format_value(self, index: int) -> str:
+        value = f"{self.values[index]:.{self.decimals}f}"
+        if self.values2 is not None:
+            value = f"{value}/{self.values2[index]:.{self.decimals}f}"
+        return value
+
+    def latest(self):
+        return len(self.times) - 1 if self.times else None
+
+    def range(self, start: int | None, end: int | None) -> range:
+        """Indexes of readings with start <= timestamp <= end"""
+        lo = 0 if start is None else bisect_left(self.times, start)
+        hi = len(self.times) if end is None else bisect_right(self.times, end)
+        return range(lo, hi)
+
+
+def _parse_value(raw, compound: bool):
+    """Parse a posted value; compound values are 'a/b'"""
+    text = str(raw).strip()
+    if compound:
+        first, sep, second = text.partition("/")
+        if not sep:
+            raise EHRError(400, f"Expected a value like '120/80', got '{text}'")
+        return float(first), float(second)
+    return float(text), 0.0
+
+
+class SimulatedEHR:
+    """
+    Immutable base dataset: per-MRN, per-observation time-ordered series.
+    Lookups are a dict hit for the patient/observation and a bisect over the
+    series, so "latest" and range queries stay O(log n) at millions of records.
+    Evaluations read and write through `view()`.
+    """
+
+    def __init__(self):
+        self._data = {VITALS: {}, LABS: {}}
+        self._record_count = 0
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _series(self, kind: str, mrn: str, name: str, create: bool = False):
+        patient = self._data[kind].get(mrn)
+        if patient is None:
+            if not create:
+                return None
+            patient = self._data[kind][mrn] = {}
+        series = patient.get(name)
+        if series is None and create:
+            unit, decimals, _ = _TYPES[kind][name]
+            series = patient[name] = Series(unit, decimals, compound=name == "BP")
+        return series
+
+    def add_reading(self, kind: str, mrn: str, name: str, timestamp: str, value: str):
+        """Add one reading to the base dataset (loading only; views are copy-on-write)"""
+        name = canonical_name(kind, name)
+        series = self._series(kind, mrn, name, create=True)
+        first, second = _parse_value(value, series.values2 is not None)
+        series.append(parse_timestamp(timestamp), first, second)
+        self._record_count += 1
+
+    def add_patient(self, mrn: str):
+        self._data[VITALS].setdefault(mrn, {})
+        self._data[LABS].setdefault(mrn, {})
+
+    def load_reference_patient(self):
+        mrn = REFERENCE_PATIENT["mrn"]
+        self.add_patient(mrn)
+        for kind in (VITALS, LABS):
+            for name, timestamp, value in REFERENCE_PATIENT[kind]:
+                self.add_reading(kind, mrn, name, timestamp, value)
+
+    def generate_synthetic(
+        self,
+        num_patients: int,
+        readings_per_series: int = DEFAULT_READINGS_PER_SERIES,
+        seed: int = 0,
+    ):
+        """Generate deterministic synthetic patients with every vital and lab type"""
+        rng = random.Random(seed)
+        span = _SYNTHETIC_END - _SYNTHETIC_START
+        for i in range(num_patients):
+            mrn = f"P{i:07d}"
+            self.add_patient(mrn)
+            for kind in (VITALS, LABS):
+                for name in _TYPES[kind]:
+                    series = self._series(kind, mrn, name, create=True)
+                    params = _SYNTHETIC_RANGES[name]
+                    times = sorted(
+                        _SYNTHETIC_START + rng.randrange(span)
+                        for _ in range(readings_per_series)
+                    )
+                    series.times = array("q", times)
+                    series.values = array(
+                        "d",
+                        (round(rng.gauss(params[0], params[1]), series.decimals) for _ in times),
+                    )
+                    if series.values2 is not None:
+                        series.values2 = array(
+                            "d",
+                            (round(rng.gauss(params[2], params[3]), series.decimals) for _ in times),
+                        )
+                    self._record_count += readings_per_series
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    @property
+    def record_count(self) -> int:
+        return self._record_count
+
+    @property
+    def patient_count(self) -> int:
+        return len(self._data[VITALS])
+
+    def view(self) -> "EHRView":
+        return EHRView(self)
+
+
+def canonical_name(kind: str, name: str) -> str:
+    canonical = _ALIASES[kind].get(name.strip().lower().replace("-", " "))
+    if canonical is None:
+        known = ", ".join(sorted(_TYPES[kind]))
+        raise EHRError(404, f"Unknown {kind[:-1]} '{name}'. Known: {known}")
+    return canonical
+
+
+# Every vital/lab alias as a whole word, longest first so "blood pressure" beats "bp"
+_OBSERVATION_RE = re.compile(
+    r"\b(" + "|".join(
+        re.escape(alias)
+        for alias in sorted({a for aliases in _ALIASES.values() for a in aliases}, key=len, reverse=True)
+    ) + r")\b",
+    re.IGNORECASE,
+)
+
+
+def find_observation(text: str):
+    """Return (kind, canonical name) of the first vital or lab mentioned in free text, or None"""
+    match = _OBSERVATION_RE.search(text)
+    if match is None:
+        return None
+    alias = match.group(1).lower()
+    for kind in (VITALS, LABS):
+        if alias in _ALIASES[kind]:
+            return kind, _ALIASES[kind][alias]
+    return None
+
+
+class EHRView:
+    """
+    Per-evaluation view over a SimulatedEHR.
+    Writes copy the affected series into a private overlay on first touch, so
+    concurrent evaluations never observe each other's POSTs.
+    """
+
+    def __init__(self, base: SimulatedEHR):
+        self._base = base
+        self._overlay = {}
+        self.writes = 0
+
+    def _get_series(self, kind: str, mrn: str, name: str):
+        key = (kind, mrn, name)
+        series = self._overlay.get(key)
+        if series is None:
+            series = self._base._series(kind, mrn, name)
+        return series
+
+    def _patient_exists(self, mrn: str) -> bool:
+        return mrn in self._base._data[VITALS]
+
+    def _writable_series(self, kind: str, mrn: str, name: str) -> Series:
+        key = (kind, mrn, name)
+        series = self._overlay.get(key)
+        if series is None:
+            base = self._base._series(kind, mrn, name)
+            if base is not None:
+                series = base.copy()
+            else:
+                unit, decimals, _ = _TYPES[kind][name]
+                series = Series(unit, decimals, compound=name == "BP")
+            self._overlay[key] = series
+        return series
+
+    def _names(self, kind: str, mrn: str) -> list:
+        names = set(self._base._data[kind].get(mrn, {}))
+        names.update(key[2] for key in self._overlay if key[0] == kind and key[1] == mrn)
+        return sorted(names)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _reading(self, kind: str, mrn: str, name: str, series: Series, index: int) -> dict:
+        name_key = "vital_name" if kind == VITALS else "test_name"
+        return {
+            "mrn": mrn,
+            name_key: name,
+            "value": series.format_value(index),
+            "unit": series.unit,
+            "timestamp": format_timestamp(series.times[index]),
+        }
+
+    def search(self, kind: str, query: dict) -> dict:
+        """Run a vitals/labs search; returns the response payload"""
+        mrn = query.get("mrn", "").strip()
+        if not mrn:
+            raise EHRError(400, "Missing required parameter 'mrn'")
+        if not self._patient_exists(mrn):
+            raise EHRError(404, f"Patient {mrn} not found")
+
+        raw_name = query.get("name" if kind == VITALS else "test") or query.get("code")
+        names = [canonical_name(kind, raw_name)] if raw_name else self._names(kind, mrn)
+
+        start = parse_timestamp(query["from"]) if query.get("from") else None
+        end = parse_timestamp(query["to"]) if query.get("to") else None
+        is_range = start is not None or end is not None or query.get("latest", "").lower() in ("false", "0", "all")
+
+        if not is_range:
+            # Latest reading: a single dict when one observation was requested
+            latest = []
+            for name in names:
+                series = self._get_series(kind, mrn, name)
+                index = series.latest() if series is not None else None
+                if index is not None:
+                    latest.append(self._reading(kind, mrn, name, series, index))
+            if raw_name:
+                if not latest:
+                    return {"status": "not_found", "data": None, "message": f"No {raw_name} readings for {mrn}"}
+                return {"status": "success", "data": latest[0]}
+            return {"status": "success", "data": latest}
+
+        limit = int(query["_count"]) if query.get("_count") else None
+        newest_first = query.get("_sort", "").lower() in ("desc", "-date", "-timestamp")
+        readings = []
+        for name in names:
+            series = self._get_series(kind, mrn, name)
+            if series is None:
+                continue
+            indexes = series.range(start, end)
+            if newest_first:
+                indexes = reversed(indexes)
+            readings.extend(self._reading(kind, mrn, name, series, i) for i in indexes)
+        if len(names) > 1:
+            readings.sort(key=lambda r: r["timestamp"], reverse=newest_first)
+        if limit is not None:
+            readings = readings[:limit]
+        return {"status": "success", "count": len(readings), "data": readings}
+
+    def create_vital(self, payload: dict) -> dict:
+        """Apply a vital.create POST to this view"""
+        if not isinstance(payload, dict):
+            raise EHRError(400, "Request body must be a JSON object")
+        mrn = str(payload.get("mrn", "")).strip()
+        if not mrn:
+            raise EHRError(400, "Missing required field 'mrn'")
+        if "value" not in payload:
+            raise EHRError(400, "Missing required field 'value'")
+        if not self._patient_exists(mrn):
+            raise EHRError(404, f"Patient {mrn} not found")
+
+        raw_name = payload.get("name") or payload.get("vital_name")
+        if not raw_name:
+            raise EHRError(400, "Missing required field 'name'")
+        name = canonical_name(VITALS, str(raw_name))
+        series = self._writable_series(VITALS, mrn, name)
+        unit = payload.get("unit")
+        if unit and str(unit).strip().lower() != series.unit.lower():
+            raise EHRError(400, f"Unit '{unit}' does not match {name} unit '{series.unit}'")
+        try:
+            first, second = _parse_value(payload["value"], series.values2 is not None)
+        except ValueError:
+            raise EHRError(400, f"Invalid value '{payload['value']}'")
+        epoch = parse_timestamp(payload["timestamp"]) if payload.get("timestamp") else int(datetime.now(timezone.utc).timestamp())
+        series.append(epoch, first, second)
+        self.writes += 1
+        index = bisect_right(series.times, epoch) - 1
+        return {
+            "status": "success",
+            "message": "Data created/updated successfully",
+            "data": self._reading(VITALS, mrn, name, series, index),
+        }
+
+    # ------------------------------------------------------------------
+    # HTTP-style entry points used by the evaluation loop
+    # ------------------------------------------------------------------
+
+    def handle_get(self, url: str, query: dict | None = None) -> str:
+        """Serve a GET request; returns the JSON response text"""
+        parts = urlsplit(url)
+        endpoint = parts.path.rstrip("/").rsplit("/", 1)[-1]
+        if query is None:
+            query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        try:
+            if endpoint == "vitals.search":
+                return json.dumps(self.search(VITALS, query))
+            if endpoint == "labs.search":
+                return json.dumps(self.search(LABS, query))
+            raise EHRError(404, f"Unknown endpoint: GET {parts.path or url}")
+        except EHRError as e:
+            return json.dumps({"status": "error", "code": e.code, "message": e.message})
+        except ValueError as e:
+            return json.dumps({"status": "error", "code": 400, "message": f"Invalid parameter: {e}"})
+
+    def handle_post(self, url: str, payload) -> str:
+        """Serve a POST request; returns the JSON response text"""
+        parts = urlsplit(url)
+        endpoint = parts.path.rstrip("/").rsplit("/", 1)[-1]
+        try:
+            if endpoint == "vital.create":
+                return json.dumps(self.create_vital(payload))
+            raise EHRError(404, f"Unknown endpoint: POST {parts.path or url}")
+        except EHRError as e:
+            return json.dumps({"status": "error", "code": e.code, "message": e.message})
+        except ValueError as e:
+            return json.dumps({"status": "error", "code": 400, "message": f"Invalid field: {e}"})
+
+
+def build_ehr(num_patients: int | None = None, seed: int = 0) -> SimulatedEHR:
+    """Build the reference patient plus `num_patients` synthetic ones (EHR_SYNTHETIC_PATIENTS)"""
+    if num_patients is None:
+        num_patients = int(os.getenv("EHR_SYNTHETIC_PATIENTS", DEFAULT_SYNTHETIC_PATIENTS))
+    ehr = SimulatedEHR()
+    ehr.load_reference_patient()
+    ehr.generate_synthetic(num_patients, seed=seed)
+    return ehr
+
+
+_ehr: SimulatedEHR | None = None
+
+
+def get_ehr() -> SimulatedEHR:
+    """Return the process-wide simulated EHR, building it on first use"""
+    global _ehr
+    if _ehr is None:
+        _ehr = build_ehr()
+    return _ehr
@@ -0,0 +1,279 @@
+"""Unit-aware answer grading - parses answers into values plus canonical units and compares with tolerances."""
+
+import re
+from functools import lru_cache
+
+from .ehr import find_observation
+from .tasks import normalize_tokens
+
+# Unit dimension -> canonical unit -> aliases, each alias -> (scale, offset) into the canonical unit
+MASS_CONCENTRATION = "mass_concentration"
+SUBSTANCE_CONCENTRATION = "substance_concentration"
+
+_UNIT_TABLE = {
+    "pressure": ("mmHg", {
+        "mmHg": (1.0, 0.0), "mm Hg": (1.0, 0.0),
+        "kPa": (7.50062, 0.0), "cmH2O": (0.735559, 0.0),
+    }),
+    MASS_CONCENTRATION: ("g/dL", {
+        "g/dL": (1.0, 0.0), "g/L": (0.1, 0.0), "mg/dL": (0.001, 0.0),
+        "mg/L": (0.0001, 0.0), "ug/dL": (1e-6, 0.0), "ug/mL": (1e-4, 0.0), "mg/mL": (0.1, 0.0),
+    }),
+    SUBSTANCE_CONCENTRATION: ("mmol/L", {
+        "mmol/L": (1.0, 0.0), "umol/L": (0.001, 0.0), "mol/L": (1000.0, 0.0),
+        # Milliequivalents equal millimoles for the monovalent electrolytes in the corpus
+        "mEq/L": (1.0, 0.0),
+    }),
+    "rate": ("/min", {
+        "bpm": (1.0, 0.0), "/min": (1.0, 0.0), "per min": (1.0, 0.0), "beats/min": (1.0, 0.0),
+        "beats per minute": (1.0, 0.0), "breaths/min": (1.0, 0.0), "breaths per minute": (1.0, 0.0),
+        "rpm": (1.0, 0.0),
+    }),
+    "temperature": ("C", {
+        "C": (1.0, 0.0), "°C": (1.0, 0.0), "degC": (1.0, 0.0), "celsius": (1.0, 0.0),
+        "F": (5 / 9, -32 * 5 / 9), "°F": (5 / 9, -32 * 5 / 9), "degF": (5 / 9, -32 * 5 / 9),
+        "fahrenheit": (5 / 9, -32 * 5 / 9),
+    }),
+    "fraction": ("%", {"%": (1.0, 0.0), "percent": (1.0, 0.0)}),
+    "mass": ("kg", {
+        "kg": (1.0, 0.0), "g": (0.001, 0.0), "lb": (0.45359237, 0.0), "lbs": (0.45359237, 0.0),
+    }),
+    "cell_count": ("10^9/L", {
+        "10^9/L": (1.0, 0.0), "x10^9/L": (1.0, 0.0), "10^3/uL": (1.0, 0.0), "x10^3/uL": (1.0, 0.0),
+        "K/uL": (1.0, 0.0), "10^3/mm3": (1.0, 0.0), "/uL": (0.001, 0.0), "cells/uL": (0.001, 0.0),
+    }),
+}
+
+# Molar masses (g/mol) that convert between mass and substance concentrations of an analyte
+MOLAR_MASS = {
+    "glucose": 180.156,
+    "creatinine": 113.12,
+    "potassium": 39.098,
+    "sodium": 22.990,
+    # Hemoglobin is reported per monomer when given in mmol/L
+    "hemoglobin": 16114.5,
+}
+
+
+def _unit_key(unit: str) -> str:
+    """Case- and spacing-insensitive lookup key of a unit spelling"""
+    return re.sub(r"\s+", "", unit.replace("µ", "u").replace("μ", "u")).lower()
+
+
+# Lookup key -> (dimension, scale, offset), shared by every unit spelling
+UNITS = {}
+# Lookup key -> spelling in the unit table
+UNIT_NAMES = {}
+for _dimension, (_canonical, _aliases) in _UNIT_TABLE.items():
+    for _alias, (_scale, _offset) in _aliases.items():
+        UNITS[_unit_key(_alias)] = (_dimension, _scale, _offset)
+        UNIT_NAMES[_unit_key(_alias)] = _alias
+
+_NUMBER = r"[-+]?(?:\d+(?:\.\d*)?|\.\d+)"
+# Longest spellings first so "mg/dL" beats "mg" and "mmHg" beats "mm"
+_UNIT_ALTERNATION = "|".join(
+    re.escape(alias).replace(r"\ ", r"\s*")
+    for alias in sorted({a for _, aliases in _UNIT_TABLE.values() for a in aliases}, key=len, reverse=True)
+)
+_QUANTITY_RE = re.compile(
+    rf"(?<![\w.^/])({_NUMBER})(?:\s*/\s*({_NUMBER}))?(?:\s*({_UNIT_ALTERNATION}))?(?!\w|\.\d)",
+    re.IGNORECASE,
+)
+# Dates and times are not measurements
+_DATETIME_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?"
+    r"|\b\d{1,2}/\d{1,2}/\d{2,4}\b"
+    r"|\b\d{1,2}:\d{2}(?::\d{2})?\b"
+)
+
+
+class Quantity:
+    """A parsed measurement: one value (or systolic/diastolic pair) and an optional unit"""
+
+    __slots__ = ("values", "unit", "decimals")
+
+    def __init__(self, values: tuple, unit: str | None, decimals: tuple):
+        self.values = values
+        self.unit = unit
+        # Digits after the decimal point of each value, for default tolerances
+        self.decimals = decimals
+
+    def __repr__(self):
+        value = "/".join(f"{v:g}" for v in self.values)
+        return f"Quantity({value}{' ' + self.unit if self.unit else ''})"
+
+
+def _decimals(number: str) -> int:
+    return len(number.split(".", 1)[1]) if "." in number else 0
+
+
+@lru_cache(maxsize=65536)
+def parse_quantities(text: str) -> tuple:
+    """Every measurement in free text, in order; dates and times are skipped"""
+    text = _DATETIME_RE.sub(" ", text)
+    quantities = []
+    for match in _QUANTITY_RE.finditer(text):
+        numbers = [n for n in match.group(1, 2) if n is not None]
+        unit = match.group(3)
+        quantities.append(Quantity(
+            tuple(float(n) for n in numbers),
+            UNIT_NAMES[_unit_key(unit)] if unit else None,
+            tuple(_decimals(n) for n in numbers),
+        ))
+    return tuple(quantities)
+
+
+def convert(values: tuple, unit: str | None, target: str | None, analyte: str | None = None):
+    """Convert values from `unit` to `target`; None if the units are incompatible"""
+    if unit is None or target is None or unit == target:
+        return values
+    # Convert through the dimension's canonical unit (scale and offset from the unit table)
+    source_dim, source_scale, source_offset = UNITS[_unit_key(unit)]
+    target_dim, target_scale, target_offset = UNITS[_unit_key(target)]
+    scale, offset = source_scale, source_offset
+    if source_dim != target_dim:
+        molar_mass = MOLAR_MASS.get(analyte)
+        if molar_mass is None or {source_dim, target_dim} != {MASS_CONCENTRATION, SUBSTANCE_CONCENTRATION}:
+            return None
+        # mmol/L -> g/dL: x * M / 10000; g/dL -> mmol/L: x * 10000 / M
+        factor = molar_mass / 10000 if source_dim == SUBSTANCE_CONCENTRATION else 10000 / molar_mass
+        scale, offset = scale * factor, offset * factor
+    return tuple(((v * scale + offset) - target_offset) / target_scale for v in values)
+
+
+def _answer_text(answer) -> str:
+    return " ".join(str(item) for item in answer) if isinstance(answer, (list, tuple)) else str(answer)
+
+
+class Grade:
+    """Outcome of grading one answer"""
+
+    __slots__ = ("success", "reason", "matched")
+
+    def __init__(self, success: bool, reason: str, matched: str | None = None):
+        self.success = success
+        self.reason = reason
+        self.matched = matched
+
+    def to_dict(self) -> dict:
+        return {"success": self.success, "reason": self.reason, "matched": self.matched}
+
+
+class AnswerSpec:
+    """
+    Compiled expected answer: quantities (any of which may match) with their
+    tolerances, plus token phrases for non-numeric answers.
+    `tolerance` is an absolute tolerance, or {"abs": a, "rel": r}; the default
+    is half a unit in the last decimal place of the more precise of the
+    expected value and the answer, so "14" matches "14.0" but not "14.2".
+    A converted answer is held to the expected value's precision only.
+    """
+
+    __slots__ = ("quantities", "phrases", "tolerance", "analyte", "source")
+
+    def __init__(self, expected, tolerance=None, analyte: str | None = None):
+        items = expected if isinstance(expected, (list, tuple)) else [expected]
+        self.source = [str(item) for item in items]
+        self.quantities = []
+        self.phrases = []
+        for item in self.source:
+            quantities = parse_quantities(item)
+            if quantities:
+                self.quantities.append((item, quantities[0]))
+            elif normalize_tokens(item):
+                self.phrases.append((item, tuple(normalize_tokens(item))))
+        if isinstance(tolerance, dict):
+            self.tolerance = (float(tolerance.get("abs", 0.0)), float(tolerance.get("rel", 0.0)))
+        elif tolerance is not None:
+            self.tolerance = (float(tolerance), 0.0)
+        else:
+            self.tolerance = None
+        self.analyte = analyte
+
+    def _within(self, actual: tuple, expected: Quantity, actual_decimals: tuple | None = None) -> bool:
+        for i, (a, e) in enumerate(zip(actual, expected.values)):
+            if self.tolerance is None:
+                decimals = expected.decimals[i]
+                if actual_decimals is not None:
+                    decimals = max(decimals, actual_decimals[i])
+                allowed = 0.5 * 10 ** -decimals
+            else:
+                allowed = max(self.tolerance[0], self.tolerance[1] * abs(e))
+            # Absorb float noise from unit conversions
+            if abs(a - e) > allowed + 1e-9 * max(1.0, abs(e)):
+                return False
+        return True
+
+    def grade(self, answer) -> Grade:
+        text = _answer_text(answer)
+        if self.quantities:
+            found = parse_quantities(text)
+            for item, expected in self.quantities:
+                # The first measurement that can be expressed in the expected unit is the answer;
+                # listing several candidate values does not earn credit for any of them
+                for quantity in found:
+                    if len(quantity.values) != len(expected.values):
+                        continue
+                    values = convert(quantity.values, quantity.unit, expected.unit, self.analyte)
+                    if values is None:
+                        continue
+                    # Decimals of an answer in another unit say nothing about precision in this one
+                    converted = quantity.unit not in (None, expected.unit) and expected.unit is not None
+                    if self._within(values, expected, None if converted else quantity.decimals):
+                        return Grade(True, "value within tolerance", item)
+                    break
+            if not self.phrases:
+                return Grade(False, "no matching value" if found else "no value in answer")
+        tokens = normalize_tokens(text)
+        for item, phrase in self.phrases:
+            n = len(phrase)
+            if any(tuple(tokens[i:i + n]) == phrase for i in range(len(tokens) - n + 1)):
+                return Grade(True, "text match", item)
+        return Grade(False, "no matching text")
+
+
+def task_analyte(task: dict) -> str | None:
+    """Canonical observation a task asks about (e.g. "glucose"), used for molar conversions"""
+    if "analyte" in task:
+        return task["analyte"]
+    observation = find_observation(task.get("description", ""))
+    return observation[1] if observation else None
+
+
+def compile_task(task: dict) -> AnswerSpec:
+    """AnswerSpec of a task's expected_answer, tolerance and analyte"""
+    return AnswerSpec(task.get("expected_answer") or [], task.get("tolerance"), task_analyte(task))
+
+
+def grade_answer(answer, expected, tolerance=None, analyte: str | None = None) -> Grade:
+    """Grade one answer against expected values (see AnswerSpec)"""
+    return AnswerSpec(expected, tolerance, analyte).grade(answer)
+
+
+def grade_task(task: dict, answer) -> Grade:
+    """Grade one answer to a task"""
+    return compile_task(task).grade(answer)
+
+
+def grade_many(tasks, answers) -> list:
+    """
+    Grade many answers at once; `tasks` is one task for all answers or one per answer.
+    Specs are compiled once per task id and each distinct (task, answer) pair
+    is graded once, so re-grading large result sets costs little more than
+    one regex scan per distinct answer.
+    """
+    if isinstance(tasks, dict):
+        tasks = [tasks] * len(answers)
+    specs = {}
+    grades = {}
+    results = []
+    for task, answer in zip(tasks, answers):
+        key = (task["task_id"], _answer_text(answer))
+        success = grades.get(key)
+        if success is None:
+            spec = specs.get(key[0])
+            if spec is None:
+                spec = specs[key[0]] = compile_task(task)
+            success = grades[key] = spec.grade(key[1]).success
+        results.append(success)
+    return results
@@ -0,0 +1,253 @@
+"""LLM judge for tasks without an expected answer - cached verdicts, coalesced and batched calls."""
+
+import asyncio
+import os
+import re
+from pathlib import Path
+
+from src.my_util.completion_cache import MODE_READWRITE, CompletionCache, make_cache_key
+from src.my_util.llm import get_llm_client
+from src.my_util.settings import get_settings, get_settings_manager
+from src.my_util.usage import empty_usage
+from .grading import parse_quantities
+
+# Offline stand-in judge: deterministic, no LLM call
+LOCAL_JUDGE = "local"
+DEFAULT_JUDGE_CACHE_PATH = Path(__file__).parent.parent.parent / ".cache" / "judge_verdicts.sqlite"
+DEFAULT_BATCH_SIZE = 8
+# How long a judgement waits for others to share its call
+DEFAULT_BATCH_WINDOW = 0.02
+# Bump when the prompts change so stale verdicts are not reused
+PROMPT_VERSION = 1
+
+JUDGE_PROMPT = """
+Evaluate if this medical answer is correct for the task:
+Task: {description}
+Answer: {answer}
+
+Respond with only "CORRECT" or "INCORRECT".
+"""
+
+BATCH_JUDGE_PROMPT = """
+Evaluate if each medical answer is correct for its task:
+{items}
+
+Respond with one line per item, "<number>. CORRECT" or "<number>. INCORRECT", and nothing else.
+"""
+
+_BATCH_VERDICT_RE = re.compile(r"^\s*(\d+)[.):]\s*(CORRECT|INCORRECT)\b", re.IGNORECASE | re.MULTILINE)
+# Answers the local judge treats as giving up
+_NON_ANSWERS = frozenset({"", "-1", "none", "null", "n/a", "na", "unknown", "not found", "error", "no data"})
+
+
+def normalize_answer(answer) -> str:
+    """Answer text as judged and cached: items joined, lowercased, whitespace collapsed"""
+    text = " ".join(str(item) for item in answer) if isinstance(answer, (list, tuple)) else str(answer)
+    return " ".join(text.lower().split())
+
+
+def local_verdict(description: str, answer: str) -> bool:
+    """Stand-in judge for offline runs: any measurement, or any real answer text, counts as correct"""
+    if answer in _NON_ANSWERS:
+        return False
+    return bool(parse_quantities(answer)) or len(answer) > 2
+
+
+class _Judgement:
+    __slots__ = ("key", "description", "answer", "future")
+
+    def __init__(self, key, description, answer, future):
+        self.key = key
+        self.description = description
+        self.answer = answer
+        self.future = future
+
+
+class JudgeService:
+    """
+    Judges answers to tasks without an expected answer.
+
+    - Verdicts are cached persistently, keyed on (task description,
+      normalized answer, judge model); failed calls are not cached.
+    - Concurrent judgements of the same key share one call.
+    - Judgements arriving within `batch_window` seconds of each other (as in
+      suite runs) are sent as one prompt of up to `batch_size` items; items
+      the batched reply does not cover are judged one by one.
+    - `model="local"` uses a deterministic stand-in judge and no LLM.
+    """
+
+    def __init__(self, model: str | None = None, cache: CompletionCache | None = None, llm_client=None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, batch_window: float = DEFAULT_BATCH_WINDOW):
+        self.model = model or get_settings().judge_model
+        self.cache = cache or CompletionCache(DEFAULT_JUDGE_CACHE_PATH, mode=MODE_READWRITE)
+        self.llm_client = llm_client or get_llm_client()
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._pending: list[_Judgement] = []
+        self._flush_handle = None
+        # Running batches, referenced until done so the loop cannot collect them mid-call
+        self._batches = set()
+        self._stats = {
+            "judgements": 0, "cache_hits": 0, "coalesced": 0, "llm_calls": 0,
+            "batches": 0, "batched_items": 0, "fallbacks": 0, "errors": 0,
+        }
+
+    def _usage(self, **flags) -> dict:
+        return {**empty_usage(), "model": self.model, **flags}
+
+    async def judge(self, description: str, answer) -> tuple:
+        """(correct, usage) for one answer; usage is this judgement's share of any LLM call"""
+        self._stats["judgements"] += 1
+        answer = normalize_answer(answer)
+        key = make_cache_key(self.model, [{"task": description, "answer": answer}], prompt_version=PROMPT_VERSION)
+        # The verdict cache is SQLite; reads and writes wait in a thread, not on the loop
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            self._stats["cache_hits"] += 1
+            return cached["correct"], self._usage(judge_cache_hit=True)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+            correct, _ = await asyncio.shield(inflight)
+            return correct, self._usage(judge_coalesced=True)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._pending.append(_Judgement(key, description, answer, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    # ------------------------------------------------------------------
+    # Batching
+    # ------------------------------------------------------------------
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: list):
+        try:
+            if self.model == LOCAL_JUDGE:
+                verdicts = {j.key: (local_verdict(j.description, j.answer), self._usage()) for j in batch}
+            else:
+                verdicts = await self._llm_verdicts(batch)
+        except Exception as e:
+            print(f"Judge call failed: {type(e).__name__}: {e}")
+            self._stats["errors"] += 1
+            verdicts = {}
+        # Failed verdicts are not cached, so a later evaluation asks again
+        cached = [(j.key, {"correct": verdicts[j.key][0], "model": self.model}) for j in batch if j.key in verdicts]
+        if cached:
+            try:
+                await asyncio.to_thread(self._cache_many, cached)
+            except Exception as e:
+                print(f"Judge cache write failed: {type(e).__name__}: {e}")
+        for judgement in batch:
+            if not judgement.future.done():
+                judgement.future.set_result(verdicts.get(judgement.key, (False, {})))
+
+    def _cache_many(self, entries: list):
+        for key, value in entries:
+            self.cache.put(key, value)
+
+    def _missing_credentials(self) -> list:
+        from litellm import validate_environment
+        return validate_environment(model=self.model).get("missing_keys", [])
+
+    async def _complete(self, prompt: str, items: int):
+        response, usage = await self.llm_client.complete_with_usage(
+            [{"role": "user", "content": prompt}], self.model, temperature=0.0
+        )
+        self._stats["llm_calls"] += 1
+        # Each item is charged an equal share of the tokens and cost; the call is counted once
+        share = {k: v / items if isinstance(v, (int, float)) and k != "calls" else v for k, v in usage.items()}
+        return response.choices[0].message.content or "", share
+
+    async def _judge_one(self, judgement: _Judgement) -> tuple:
+        text, usage = await self._complete(
+            JUDGE_PROMPT.format(description=judgement.description, answer=judgement.answer), 1
+        )
+        return "CORRECT" in text.upper() and "INCORRECT" not in text.upper(), usage
+
+    async def _llm_verdicts(self, batch: list) -> dict:
+        missing = self._missing_credentials()
+        if missing:
+            raise RuntimeError(f"missing credentials for {self.model}: {', '.join(missing)}")
+        if len(batch) == 1:
+            return {batch[0].key: await self._judge_one(batch[0])}
+
+        self._stats["batches"] += 1
+        self._stats["batched_items"] += len(batch)
+        items = "\n".join(
+            f"{i}. Task: {j.description}\n   Answer: {j.answer}" for i, j in enumerate(batch, 1)
+        )
+        text, usage = await self._complete(BATCH_JUDGE_PROMPT.format(items=items), len(batch))
+        parsed = {int(n): v.upper() == "CORRECT" for n, v in _BATCH_VERDICT_RE.findall(text)}
+        verdicts = {}
+        leftovers = []
+        for i, judgement in enumerate(batch, 1):
+            if i in parsed:
+                verdicts[judgement.key] = (parsed[i], usage if i == 1 else {**usage, "calls": 0})
+            else:
+                leftovers.append(judgement)
+        if leftovers:
+            self._stats["fallbacks"] += len(leftovers)
+            singles = await asyncio.gather(*(self._judge_one(j) for j in leftovers), return_exceptions=True)
+            for judgement, verdict in zip(leftovers, singles):
+                if not isinstance(verdict, BaseException):
+                    verdicts[judgement.key] = verdict
+        return verdicts
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "model": self.model,
+            "batch_size": self.batch_size,
+            "batch_window": self.batch_window,
+            "pending": len(self._pending),
+            "cache": self.cache.stats(),
+        }
+
+
+def judge_from_env() -> JudgeService:
+    """
+    Build a judge for the judge_model setting ("local" for the offline stand-in)
+    from JUDGE_CACHE_MODE / JUDGE_CACHE_PATH, JUDGE_BATCH_SIZE and JUDGE_BATCH_WINDOW_MS
+    """
+    cache = CompletionCache(
+        os.getenv("JUDGE_CACHE_PATH") or DEFAULT_JUDGE_CACHE_PATH,
+        mode=os.getenv("JUDGE_CACHE_MODE", MODE_READWRITE),
+    )
+    return JudgeService(
+        model=get_settings().judge_model,
+        cache=cache,
+        batch_size=int(os.getenv("JUDGE_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+        batch_window=float(os.getenv("JUDGE_BATCH_WINDOW_MS", DEFAULT_BATCH_WINDOW * 1000)) / 1000,
+    )
+
+
+_judge: JudgeService | None = None
+
+
+def get_judge() -> JudgeService:
+    """Return the process-wide judge, creating it on first use"""
+    global _judge
+    if _judge is None:
+        _judge = judge_from_env()
+        # Verdicts are cached per model, so rerouting the judge never reuses another model's answers
+        get_settings_manager().on_reload(lambda settings: setattr(_judge, "model", settings.judge_model))
+    return _judge
@@ -0,0 +1,291 @@
+"""Reporting - vectorized aggregation and bootstrap confidence intervals over stored evaluation results."""
+
+import json
+import sqlite3
+
+import numpy as np
+
+from .results_store import DEFAULT_RESULTS_PATH, ResultsStore
+
+DEFAULT_BOOTSTRAP = 2000
+DEFAULT_CONFIDENCE = 0.95
+LATENCY_PERCENTILES = (50, 95, 99)
+# Group-by dimensions a report can break results down by
+DIMENSIONS = ("category", "agent", "task", "model")
+
+_DIMENSION_COLUMNS = {
+    "category": "category",
+    "agent": "agent_url",
+    "task": "task_id",
+    "model": "model",
+}
+
+
+class ResultArrays:
+    """
+    Column-oriented view of many results.
+    String columns are dictionary-encoded: `codes[dim]` indexes into `labels[dim]`.
+    """
+
+    __slots__ = ("success", "steps", "time_used", "format_compliance", "safety_score", "cost_usd", "codes", "labels")
+
+    def __init__(self, success, steps, time_used, format_compliance, safety_score, cost_usd, codes, labels):
+        self.success = success
+        self.steps = steps
+        self.time_used = time_used
+        self.format_compliance = format_compliance
+        self.safety_score = safety_score
+        self.cost_usd = cost_usd
+        self.codes = codes
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.success)
+
+
+def _encode(dimension_values) -> tuple:
+    """Dictionary-encode a sequence of labels into (codes, labels)"""
+    labels = {}
+    codes = np.fromiter(
+        (labels.setdefault(value, len(labels)) for value in dimension_values),
+        dtype=np.int32,
+        count=len(dimension_values),
+    )
+    return codes, [str(label) if label is not None else "(none)" for label in labels]
+
+
+def load_result_arrays(path=DEFAULT_RESULTS_PATH, **filters) -> ResultArrays:
+    """Load stored runs (optionally filtered like ResultsStore.query) into NumPy columns"""
+    where, params = ResultsStore._where(filters)
+    dimension_columns = ", ".join(_DIMENSION_COLUMNS.values())
+    conn = sqlite3.connect(path)
+    try:
+        # One scan; the row tuples are transposed into columns once
+        rows = conn.execute(
+            "SELECT success, COALESCE(steps, 0), COALESCE(time_used, 'nan'), COALESCE(format_compliance, 0),"
+            f" COALESCE(safety_score, 0), COALESCE(cost_usd, 0), {dimension_columns} FROM runs{where}",
+            params,
+        ).fetchall()
+    finally:
+        conn.close()
+    columns = list(zip(*rows)) or [()] * (6 + len(_DIMENSION_COLUMNS))
+    del rows
+    codes = {}
+    labels = {}
+    for i, dimension in enumerate(_DIMENSION_COLUMNS, start=6):
+        codes[dimension], labels[dimension] = _encode(columns[i])
+    return ResultArrays(
+        success=np.array(columns[0], dtype=bool),
+        steps=np.array(columns[1], dtype=np.int64),
+        time_used=np.array(columns[2], dtype=np.float64),
+        format_compliance=np.array(columns[3], dtype=np.float64),
+        safety_score=np.array(columns[4], dtype=np.float64),
+        cost_usd=np.array(columns[5], dtype=np.float64),
+        codes=codes,
+        labels=labels,
+    )
+
+
+def result_arrays_from_dicts(results: list) -> ResultArrays:
+    """Build NumPy columns from in-memory result dicts (e.g. a suite reply)"""
+    n = len(results)
+    metrics = [r.get("metrics", {}) for r in results]
+    codes = {}
+    labels = {}
+    for dimension, key in _DIMENSION_COLUMNS.items():
+        codes[dimension], labels[dimension] = _encode([r.get(key) for r in results])
+    return ResultArrays(
+        success=np.fromiter((bool(r.get("success")) for r in results), dtype=bool, count=n),
+        steps=np.fromiter((r.get("steps") or 0 for r in results), dtype=np.int64, count=n),
+        time_used=np.fromiter(
+            (r["time_used"] if r.get("time_used") is not None else np.nan for r in results), dtype=np.float64, count=n
+        ),
+        format_compliance=np.fromiter((m.get("format_compliance", 0.0) for m in metrics), dtype=np.float64, count=n),
+        safety_score=np.fromiter((m.get("safety_score", 0.0) for m in metrics), dtype=np.float64, count=n),
+        cost_usd=np.fromiter(
+            (r.get("usage", {}).get("total", {}).get("cost_usd", 0.0) for r in results), dtype=np.float64, count=n
+        ),
+        codes=codes,
+        labels=labels,
+    )
+
+
+# ----------------------------------------------------------------------
+# Vectorized statistics
+# ----------------------------------------------------------------------
+
+
+def bootstrap_rate_ci(successes, totals, n_boot: int = DEFAULT_BOOTSTRAP,
+                      confidence: float = DEFAULT_CONFIDENCE, rng=None):
+    """
+    Percentile bootstrap CI of success rates for many groups at once.
+    Resampling n Bernoulli outcomes with replacement gives Binomial(n, p_hat)
+    successes, so each group's bootstrap distribution is drawn directly
+    instead of resampling rows.
+    """
+    rng = rng or np.random.default_rng()
+    totals = np.asarray(totals, dtype=np.int64)
+    rates = np.divide(successes, totals, out=np.zeros(len(totals)), where=totals > 0)
+    draws = rng.binomial(totals[:, None], rates[:, None], size=(len(totals), n_boot))
+    boot = draws / np.maximum(totals, 1)[:, None]
+    alpha = (1.0 - confidence) / 2
+    low, high = np.quantile(boot, [alpha, 1.0 - alpha], axis=1)
+    return low, high
+
+
+def bootstrap_mean_ci(codes, values, n_groups: int, n_boot: int = DEFAULT_BOOTSTRAP,
+                      confidence: float = DEFAULT_CONFIDENCE, rng=None):
+    """
+    Percentile bootstrap CI of per-group means of a small non-negative integer
+    column (step counts). Resampling rows equals drawing a multinomial over
+    each group's value histogram; the multinomials of all groups are drawn
+    together as a chain of conditional binomials, one per distinct value.
+    """
+    rng = rng or np.random.default_rng()
+    values = np.asarray(values, dtype=np.int64)
+    hist = step_distribution(codes, values, n_groups)
+    totals = hist.sum(axis=1)
+    remaining = np.broadcast_to(totals[:, None], (n_groups, n_boot)).copy()
+    remaining_mass = np.broadcast_to(totals[:, None], (n_groups, n_boot)).astype(np.float64)
+    sums = np.zeros((n_groups, n_boot))
+    for value in np.flatnonzero(hist.any(axis=0)):
+        count = hist[:, value][:, None]
+        p = np.divide(count, remaining_mass, out=np.zeros_like(remaining_mass), where=remaining_mass > 0)
+        draws = rng.binomial(remaining, np.clip(p, 0.0, 1.0))
+        sums += draws * value
+        remaining -= draws
+        remaining_mass -= count
+    means = sums / np.maximum(totals, 1)[:, None]
+    alpha = (1.0 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1.0 - alpha], axis=1)
+    empty = totals == 0
+    low[empty] = np.nan
+    high[empty] = np.nan
+    return low, high
+
+
+def group_percentiles(codes, values, n_groups: int, percentiles=LATENCY_PERCENTILES,
+                      value_order=None) -> np.ndarray:
+    """
+    Per-group percentiles (rows: groups, columns: percentiles), ignoring NaNs.
+    `value_order` (an argsort of `values`) can be shared across groupings;
+    a stable sort of the integer codes then groups the already-sorted values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if value_order is None:
+        value_order = np.argsort(values, kind="stable")
+    value_order = value_order[~np.isnan(values[value_order])]
+    order = value_order[np.argsort(codes[value_order], kind="stable")]
+    codes = codes[order]
+    values = values[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    out = np.full((n_groups, len(percentiles)), np.nan)
+    has = counts > 0
+    for j, q in enumerate(percentiles):
+        # Linear interpolation between closest ranks, like np.percentile
+        position = (counts[has] - 1) * (q / 100.0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, counts[has] - 1)
+        fraction = position - lower
+        base = starts[has]
+        out[has, j] = values[base + lower] * (1 - fraction) + values[base + upper] * fraction
+    return out
+
+
+def step_distribution(codes, steps, n_groups: int) -> np.ndarray:
+    """Per-group histogram of step counts (rows: groups, columns: 0..max steps)"""
+    steps = np.asarray(steps, dtype=np.int64)
+    width = int(steps.max()) + 1 if len(steps) else 1
+    return np.bincount(codes * width + steps, minlength=n_groups * width).reshape(n_groups, width)
+
+
+# ----------------------------------------------------------------------
+# Reports
+# ----------------------------------------------------------------------
+
+
+def _summarize(arrays: ResultArrays, codes, labels, n_boot, confidence, rng, time_order) -> list:
+    n_groups = len(labels)
+    totals = np.bincount(codes, minlength=n_groups)
+    successes = np.bincount(codes, weights=arrays.success, minlength=n_groups)
+    steps_sum = np.bincount(codes, weights=arrays.steps, minlength=n_groups)
+    fmt_sum = np.bincount(codes, weights=arrays.format_compliance, minlength=n_groups)
+    safety_sum = np.bincount(codes, weights=arrays.safety_score, minlength=n_groups)
+    cost_sum = np.bincount(codes, weights=arrays.cost_usd, minlength=n_groups)
+    safe_totals = np.maximum(totals, 1)
+
+    rate_low, rate_high = bootstrap_rate_ci(successes, totals, n_boot, confidence, rng)
+    steps_low, steps_high = bootstrap_mean_ci(codes, arrays.steps, n_groups, n_boot, confidence, rng)
+    latency = group_percentiles(codes, arrays.time_used, n_groups, value_order=time_order)
+    histogram = step_distribution(codes, arrays.steps, n_groups)
+
+    rows = []
+    for g in np.argsort(-(successes / safe_totals), kind="stable"):
+        if totals[g] == 0:
+            continue
+        rows.append({
+            "group": labels[g],
+            "runs": int(totals[g]),
+            "success_rate": float(successes[g] / totals[g]),
+            "success_rate_ci": [float(rate_low[g]), float(rate_high[g])],
+            "mean_steps": float(steps_sum[g] / totals[g]),
+            "mean_steps_ci": [float(steps_low[g]), float(steps_high[g])],
+            "step_distribution": {str(k): int(v) for k, v in enumerate(histogram[g]) if v},
+            "format_compliance": float(fmt_sum[g] / totals[g]),
+            "safety_score": float(safety_sum[g] / totals[g]),
+            "total_cost_usd": float(cost_sum[g]),
+            "latency": {
+                f"p{q}": (None if np.isnan(latency[g, j]) else float(latency[g, j]))
+                for j, q in enumerate(LATENCY_PERCENTILES)
+            },
+        })
+    return rows
+
+
+def build_report(arrays: ResultArrays, by=("category", "agent"), n_boot: int = DEFAULT_BOOTSTRAP,
+                 confidence: float = DEFAULT_CONFIDENCE, seed: int | None = 0) -> dict:
+    """Overall and per-dimension success rates, step distributions, latency percentiles and bootstrap CIs"""
+    for dimension in by:
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension '{dimension}', expected one of {', '.join(DIMENSIONS)}")
+    rng = np.random.default_rng(seed)
+    # Latencies are sorted once and reused by every grouping
+    time_order = np.argsort(arrays.time_used, kind="stable")
+    overall_codes = np.zeros(len(arrays), dtype=np.int32)
+    report = {
+        "runs": len(arrays),
+        "confidence": confidence,
+        "bootstrap_samples": n_boot,
+        "overall": _summarize(arrays, overall_codes, ["all"], n_boot, confidence, rng, time_order),
+    }
+    for dimension in by:
+        report[f"by_{dimension}"] = _summarize(
+            arrays, arrays.codes[dimension], arrays.labels[dimension], n_boot, confidence, rng, time_order
+        )
+    return report
+
+
+def format_report(report: dict) -> str:
+    """Render a report as plain-text tables"""
+    lines = [f"{report['runs']} runs, {report['confidence']:.0%} bootstrap CIs ({report['bootstrap_samples']} samples)"]
+    header = f"{'group':<32} {'runs':>8} {'success':>8} {'CI':>15} {'steps':>6} {'CI':>13} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7}"
+    for key, rows in report.items():
+        if key not in ("overall",) and not key.startswith("by_"):
+            continue
+        lines.append("")
+        lines.append(key.replace("_", " "))
+        lines.append(header)
+        for row in rows:
+            latency = row["latency"]
+            lines.append(
+                f"{row['group'][:32]:<32} {row['runs']:>8} {row['success_rate']:>8.1%} "
+                f"{'[%.1f%%, %.1f%%]' % (row['success_rate_ci'][0] * 100, row['success_rate_ci'][1] * 100):>15} "
+                f"{row['mean_steps']:>6.2f} {'[%.2f, %.2f]' % tuple(row['mean_steps_ci']):>13} "
+                + " ".join(f"{latency[p]:>7.2f}" if latency[p] is not None else f"{'-':>7}" for p in ("p50", "p95", "p99"))
+            )
+    return "\n".join(lines)
+
+
+def report_json(report: dict) -> str:
+    return json.dumps(report, indent=2)
@@ -0,0 +1,383 @@
+"""Results store - durable, indexed SQLite history of evaluation results with filtered queries and leaderboards."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+DEFAULT_RESULTS_PATH = Path(__file__).parent.parent.parent / ".cache" / "results.sqlite"
+DEFAULT_QUERY_LIMIT = 100
+MAX_QUERY_LIMIT = 10000
+# stored_runs() re-reads the total (which other workers also add to) at most this often
+STORED_RUNS_REFRESH = 30.0
+
+# Columns that can be filtered on, mapped to their SQL comparison
+FILTERS = {
+    "task_id": "task_id = ?",
+    "category": "category = ?",
+    "agent_url": "agent_url = ?",
+    "model": "model = ?",
+    "suite_id": "suite_id = ?",
+    "success": "success = ?",
+    "since": "created_at >= ?",
+    "until": "created_at < ?",
+}
+
+# Leaderboard groupings
+GROUP_BY = {
+    "agent": ("agent_url", "agent_name", "agent_version"),
+    "model": ("model",),
+    "task": ("task_id",),
+    "category": ("category",),
+    "agent_model": ("agent_url", "model"),
+}
+
+_SUMMARY_COLUMNS = (
+    "run_id", "suite_id", "created_at", "task_id", "category", "agent_url", "agent_name",
+    "agent_version", "model", "success", "format_compliance", "tool_use_efficiency",
+    "safety_score", "steps", "time_used", "prompt_tokens", "completion_tokens", "cost_usd", "notes",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    suite_id TEXT,
+    created_at REAL NOT NULL,
+    task_id TEXT NOT NULL,
+    category TEXT,
+    agent_url TEXT NOT NULL,
+    agent_name TEXT,
+    agent_version TEXT,
+    model TEXT,
+    success INTEGER NOT NULL,
+    format_compliance REAL,
+    tool_use_efficiency REAL,
+    safety_score REAL,
+    steps INTEGER,
+    time_used REAL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cost_usd REAL,
+    notes TEXT,
+    transcript TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_task ON runs(task_id, created_at);
+CREATE INDEX IF NOT EXISTS runs_by_agent ON runs(agent_url, model, created_at);
+CREATE INDEX IF NOT EXISTS runs_by_suite ON runs(suite_id);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs(created_at);
+"""
+
+# Running totals per leaderboard group, updated in the same transaction as
+# each insert, so unfiltered leaderboards never scan the runs table.
+# Each sum has the count of non-NULL values it covers, so means skip
+# missing values like SQL AVG does
+_ROLLUPS_TABLE = """
+CREATE TABLE IF NOT EXISTS rollups (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    successes INTEGER NOT NULL,
+    steps_sum REAL NOT NULL,
+    steps_count INTEGER NOT NULL,
+    time_sum REAL NOT NULL,
+    time_count INTEGER NOT NULL,
+    cost_sum REAL NOT NULL,
+    cost_count INTEGER NOT NULL,
+    last_run_at REAL NOT NULL,
+    PRIMARY KEY (dimension, key)
+)
+"""
+
+_ROLLUP_COLUMNS = (
+    "dimension", "key", "runs", "successes", "steps_sum", "steps_count",
+    "time_sum", "time_count", "cost_sum", "cost_count", "last_run_at",
+)
+
+_UPSERT_ROLLUP = """
+INSERT INTO rollups (dimension, key, runs, successes, steps_sum, steps_count,
+                     time_sum, time_count, cost_sum, cost_count, last_run_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (dimension, key) DO UPDATE SET
+    runs = runs + excluded.runs,
+    successes = successes + excluded.successes,
+    steps_sum = steps_sum + excluded.steps_sum,
+    steps_count = steps_count + excluded.steps_count,
+    time_sum = time_sum + excluded.time_sum,
+    time_count = time_count + excluded.time_count,
+    cost_sum = cost_sum + excluded.cost_sum,
+    cost_count = cost_count + excluded.cost_count,
+    last_run_at = MAX(last_run_at, excluded.last_run_at)
+"""
+
+_COLUMN_INDEX = {name: i for i, name in enumerate(_SUMMARY_COLUMNS)}
+
+
+def _rollup_rows(rows: list) -> list:
+    """Fold inserted rows into per-(dimension, key) totals for the rollups table"""
+    totals = {}
+    for row in rows:
+        success = row[_COLUMN_INDEX["success"]]
+        values = [row[_COLUMN_INDEX[c]] for c in ("steps", "time_used", "cost_usd")]
+        created_at = row[_COLUMN_INDEX["created_at"]]
+        for dimension, columns in GROUP_BY.items():
+            key = json.dumps([row[_COLUMN_INDEX[c]] for c in columns])
+            total = totals.setdefault((dimension, key), [0, 0, 0.0, 0, 0.0, 0, 0.0, 0, 0.0])
+            total[0] += 1
+            total[1] += success
+            # (sum, non-NULL count) pairs for steps, time and cost
+            for i, value in enumerate(values):
+                if value is not None:
+                    total[2 + 2 * i] += value
+                    total[3 + 2 * i] += 1
+            total[8] = max(total[8], created_at)
+    return [(dimension, key, *total) for (dimension, key), total in totals.items()]
+
+
+def _reported_model(result: dict):
+    """The model the white agent reported in its usage metadata, if any"""
+    for entry in result.get("usage", {}).get("steps", []):
+        if entry.get("source") == "white" and entry.get("model"):
+            return entry["model"]
+    return None
+
+
+class ResultsStore:
+    """
+    Append-only store of evaluation results in SQLite (WAL mode).
+
+    Each run keeps the task, white agent URL/name/card version, model, the
+    metrics, step count, timings, token usage and the full result JSON
+    (including the white agent transcript). Indexes on task, agent and suite
+    (run) make filtered queries and leaderboards index-only scans.
+    """
+
+    def __init__(self, path=DEFAULT_RESULTS_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate_rollups()
+        # Runs appended by this process
+        self._recorded = 0
+        # Total stored runs and when it was last read from the rollups
+        self._stored = 0
+        self._counted_at = None
+
+    def _migrate_rollups(self, chunk: int = 10000):
+        """Rebuild a rollups table from an older schema (sums without non-NULL counts) from the runs"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = tuple(row[1] for row in self._conn.execute("PRAGMA table_info(rollups)"))
+            if columns != _ROLLUP_COLUMNS:
+                self._conn.execute("DROP TABLE IF EXISTS rollups")
+                self._conn.execute(_ROLLUPS_TABLE)
+                cursor = self._conn.execute(f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM runs")
+                while rows := cursor.fetchmany(chunk):
+                    self._conn.executemany(_UPSERT_ROLLUP, _rollup_rows([tuple(row) for row in rows]))
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _row(result: dict, agent_url: str, agent_name=None, agent_version=None, model=None,
+             suite_id=None, category=None, created_at=None) -> tuple:
+        metrics = result.get("metrics", {})
+        usage = result.get("usage", {}).get("total", {})
+        return (
+            result.get("run_id") or uuid.uuid4().hex,
+            suite_id,
+            created_at or time.time(),
+            result.get("task_id", "unknown"),
+            category if category is not None else result.get("category"),
+            agent_url,
+            agent_name,
+            agent_version,
+            model if model is not None else _reported_model(result),
+            1 if result.get("success") else 0,
+            metrics.get("format_compliance"),
+            metrics.get("tool_use_efficiency"),
+            metrics.get("safety_score"),
+            result.get("steps"),
+            result.get("time_used"),
+            usage.get("prompt_tokens"),
+            usage.get("completion_tokens"),
+            usage.get("cost_usd"),
+            result.get("notes"),
+            json.dumps(result, ensure_ascii=False),
+        )
+
+    def record(self, result: dict, agent_url: str, **fields) -> str:
+        """Append one result; returns its run_id (also set on the result dict)"""
+        return self.record_many([result], agent_url, **fields)[0]
+
+    def record_many(self, results: list, agent_url: str, **fields) -> list:
+        """Append many results in one transaction; `fields` (agent_name, model, suite_id, ...) apply to all"""
+        for result in results:
+            result.setdefault("run_id", uuid.uuid4().hex)
+        rows = [self._row(result, agent_url, **fields) for result in results]
+        placeholders = ", ".join("?" * len(_SUMMARY_COLUMNS + ("transcript",)))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(f"INSERT INTO runs VALUES ({placeholders})", rows)
+                self._conn.executemany(_UPSERT_ROLLUP, _rollup_rows(rows))
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            self._recorded += len(rows)
+            self._stored += len(rows)
+        return [row[0] for row in rows]
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _where(filters: dict):
+        clauses = []
+        params = []
+        for name, value in filters.items():
+            if value is None or value == "":
+                continue
+            if name not in FILTERS:
+                raise ValueError(f"Unknown filter '{name}', expected one of {', '.join(FILTERS)}")
+            if name == "success":
+                value = 1 if str(value).lower() in ("1", "true", "yes") else 0
+            elif name in ("since", "until"):
+                value = float(value)
+            clauses.append(FILTERS[name])
+            params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit: int = DEFAULT_QUERY_LIMIT, offset: int = 0,
+              include_transcript: bool = False, **filters) -> list:
+        """Return matching runs, newest first"""
+        where, params = self._where(filters)
+        columns = ", ".join(_SUMMARY_COLUMNS + (("transcript",) if include_transcript else ()))
+        limit = max(1, min(int(limit), MAX_QUERY_LIMIT))
+        sql = f"SELECT {columns} FROM runs{where} ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit, int(offset))).fetchall()
+        out = []
+        for row in rows:
+            record = dict(row)
+            record["success"] = bool(record["success"])
+            if include_transcript:
+                record["transcript"] = json.loads(record["transcript"])
+            out.append(record)
+        return out
+
+    def get(self, run_id: str) -> dict | None:
+        """Return the full stored result of one run"""
+        with self._lock:
+            row = self._conn.execute("SELECT transcript FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row["transcript"]) if row else None
+
+    def count(self, **filters) -> int:
+        where, params = self._where(filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM runs{where}", params).fetchone()[0]
+
+    def stored_runs(self) -> int:
+        """
+        Total stored runs for gauges: summed from one dimension of the rollups
+        (a row per category, never a scan of the runs) at most every
+        STORED_RUNS_REFRESH seconds, and advanced by this process's inserts in between
+        """
+        now = time.monotonic()
+        if self._counted_at is None or now - self._counted_at >= STORED_RUNS_REFRESH:
+            with self._lock:
+                self._stored = self._conn.execute(
+                    "SELECT COALESCE(SUM(runs), 0) FROM rollups WHERE dimension = 'category'"
+                ).fetchone()[0]
+            self._counted_at = now
+        return self._stored
+
+    def leaderboard(self, group_by: str = "agent", limit: int = DEFAULT_QUERY_LIMIT, **filters) -> list:
+        """
+        Aggregate runs per group (agent, model, task, category or agent_model),
+        ranked by success rate, then fewer mean steps
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"Unknown group_by '{group_by}', expected one of {', '.join(GROUP_BY)}")
+        where, params = self._where(filters)
+        if not params:
+            return self._leaderboard_from_rollups(group_by, limit)
+        keys = ", ".join(GROUP_BY[group_by])
+        sql = f"""
+            SELECT {keys},
+                   COUNT(*) AS runs,
+                   SUM(success) AS successes,
+                   AVG(success) AS success_rate,
+                   AVG(steps) AS mean_steps,
+                   AVG(time_used) AS mean_time_used,
+                   SUM(cost_usd) AS total_cost_usd,
+                   MAX(created_at) AS last_run_at
+            FROM runs{where}
+            GROUP BY {keys}
+            ORDER BY success_rate DESC, mean_steps ASC
+            LIMIT ?
+        """
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, max(1, int(limit)))).fetchall()
+        return [dict(row) for row in rows]
+
+    def _leaderboard_from_rollups(self, group_by: str, limit: int) -> list:
+        sql = """
+            SELECT key, runs, successes,
+                   CAST(successes AS REAL) / runs AS success_rate,
+                   CASE WHEN steps_count > 0 THEN steps_sum / steps_count END AS mean_steps,
+                   CASE WHEN time_count > 0 THEN time_sum / time_count END AS mean_time_used,
+                   CASE WHEN cost_count > 0 THEN cost_sum END AS total_cost_usd,
+                   last_run_at
+            FROM rollups
+            WHERE dimension = ?
+            ORDER BY success_rate DESC, mean_steps ASC
+            LIMIT ?
+        """
+        with self._lock:
+            rows = self._conn.execute(sql, (group_by, max(1, int(limit)))).fetchall()
+        out = []
+        for row in rows:
+            record = dict(zip(GROUP_BY[group_by], json.loads(row["key"])))
+            record.update({name: row[name] for name in row.keys() if name != "key"})
+            out.append(record)
+        return out
+
+    def stats(self) -> dict:
+        """Constant-time stats for /status; `count()` gives the number of stored runs"""
+        return {"recorded": self._recorded, "path": str(self.path)}
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def results_store_from_env() -> ResultsStore:
+    """Build a store at RESULTS_DB_PATH (default .cache/results.sqlite)"""
+    return ResultsStore(os.getenv("RESULTS_DB_PATH") or DEFAULT_RESULTS_PATH)
+
+
+_results_store: ResultsStore | None = None
+
+
+def get_results_store() -> ResultsStore:
+    """Return the process-wide results store, opening it on first use"""
+    global _results_store
+    if _results_store is None:
+        _results_store = results_store_from_env()
+    return _results_store
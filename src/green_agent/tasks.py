@@ -0,0 +1,247 @@
+"""Task registry - file-backed medical task corpus with precomputed lookup indexes."""
+
+import json
+import os
+import re
+import tomllib
+from pathlib import Path
+
+from src.my_util.settings import get_settings
+
+DEFAULT_TASKS_PATH = Path(__file__).parent / "medical_tasks.jsonl"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_tokens(text: str) -> list:
+    """Lowercase and split text into alphanumeric tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _load_file(path: Path) -> list:
+    """Load task records from a .jsonl or .toml file"""
+    if path.suffix == ".toml":
+        with open(path, "rb") as f:
+            return list(tomllib.load(f).get("tasks", []))
+
+    records = []
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid task record: {e}") from e
+    return records
+
+
+def _expected_answer(task_id: str, value) -> list | None:
+    """A task's expected answer as a list of strings; a single value becomes a one-item list"""
+    if value is None or value == "" or value == []:
+        return None
+    items = value if isinstance(value, (list, tuple)) else [value]
+    for item in items:
+        if isinstance(item, bool) or not isinstance(item, (str, int, float)):
+            raise ValueError(
+                f"Task {task_id}: expected_answer must be a string, a number or a list of them, got {value!r}"
+            )
+    return [str(item) for item in items]
+
+
+class TaskRegistry:
+    """
+    In-memory task corpus indexed by task id, category and description tokens.
+
+    `resolve` maps a free-text task description to a task deterministically:
+    exact normalized match, then phrase containment (either direction), then
+    keyword phrases. Ties go to the task that appears first in the corpus,
+    except for keyword matches, where a tie means the description is
+    ambiguous and nothing is returned.
+    """
+
+    def __init__(self, tasks: list):
+        self._tasks = []
+        self._by_id = {}
+        self._by_category = {}
+        self._by_normalized = {}
+        self._normalized = []
+        self._token_counts = []
+        self._postings = {}
+        self._keywords = {}
+        self._max_keyword_len = 0
+
+        for record in tasks:
+            self._add(dict(record))
+
+    def _add(self, task: dict):
+        if "task_id" not in task or "description" not in task:
+            raise ValueError(f"Task record needs task_id and description: {task!r}")
+        task_id = str(task["task_id"])
+        if task_id in self._by_id:
+            raise ValueError(f"Duplicate task id: {task_id}")
+
+        task["task_id"] = task_id
+        task.setdefault("name", task_id)
+        task.setdefault("category", "uncategorized")
+        task["expected_answer"] = _expected_answer(task_id, task.get("expected_answer"))
+        task.setdefault("api_base", get_settings().ehr_api_base)
+
+        ordinal = len(self._tasks)
+        self._tasks.append(task)
+        self._by_id[task_id] = task
+        self._by_category.setdefault(task["category"].lower(), []).append(task)
+
+        tokens = normalize_tokens(task["description"])
+        normalized = " ".join(tokens)
+        self._normalized.append(f" {normalized} ")
+        self._by_normalized.setdefault(normalized, ordinal)
+        distinct = set(tokens)
+        self._token_counts.append(len(distinct))
+        for token in distinct:
+            self._postings.setdefault(token, []).append(ordinal)
+
+        for keyword in task.get("keywords", []):
+            phrase = tuple(normalize_tokens(keyword))
+            if not phrase:
+                continue
+            self._keywords.setdefault(phrase, set()).add(ordinal)
+            self._max_keyword_len = max(self._max_keyword_len, len(phrase))
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def all(self) -> list:
+        return list(self._tasks)
+
+    def get(self, task_id: str) -> dict | None:
+        return self._by_id.get(task_id)
+
+    def categories(self) -> list:
+        return sorted(self._by_category)
+
+    def by_category(self, category: str) -> list:
+        return list(self._by_category.get(category.lower(), []))
+
+    def select(self, task_ids=None, category=None) -> list:
+        """
+        Select tasks for a suite run.
+        `task_ids` of None/"all" and `category` of None/"all" select everything.
+        """
+        if category and category.lower() != "all":
+            tasks = self.by_category(category)
+        else:
+            tasks = self.all()
+        if task_ids and task_ids != "all":
+            allowed = {t["task_id"] for t in tasks}
+            missing = [tid for tid in task_ids if tid not in allowed]
+            if missing:
+                raise ValueError(f"Unknown task ids: {', '.join(missing)}")
+            tasks = [self._by_id[tid] for tid in task_ids]
+        return tasks
+
+    # ------------------------------------------------------------------
+    # Free-text resolution
+    # ------------------------------------------------------------------
+
+    def resolve(self, description: str) -> dict | None:
+        """Match a free-text description to a task, or return None"""
+        tokens = normalize_tokens(description)
+        if not tokens:
+            return None
+        normalized = " ".join(tokens)
+
+        ordinal = self._by_normalized.get(normalized)
+        if ordinal is not None:
+            return self._tasks[ordinal]
+
+        ordinal = self._resolve_containment(tokens, f" {normalized} ")
+        if ordinal is not None:
+            return self._tasks[ordinal]
+
+        ordinal = self._resolve_keywords(tokens)
+        if ordinal is not None:
+            return self._tasks[ordinal]
+        return None
+
+    def _resolve_containment(self, tokens: list, padded_query: str):
+        distinct = set(tokens)
+        postings = [self._postings.get(token, ()) for token in distinct]
+        best = None
+
+        # Task description contained in the query: every task token must be a query token
+        hits = {}
+        for posting in postings:
+            for ordinal in posting:
+                hits[ordinal] = hits.get(ordinal, 0) + 1
+        for ordinal, count in hits.items():
+            if count == self._token_counts[ordinal] and self._normalized[ordinal] in padded_query:
+                if best is None or ordinal < best:
+                    best = ordinal
+
+        # Query contained in a task description: intersect the query tokens' postings
+        if all(postings):
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    break
+            for ordinal in candidates:
+                if padded_query in self._normalized[ordinal]:
+                    if best is None or ordinal < best:
+                        best = ordinal
+        return best
+
+    def _resolve_keywords(self, tokens: list):
+        if not self._keywords:
+            return None
+        scores = {}
+        seen = set()
+        for start in range(len(tokens)):
+            for length in range(1, self._max_keyword_len + 1):
+                phrase = tuple(tokens[start:start + length])
+                if len(phrase) < length:
+                    break
+                if phrase in seen:
+                    continue
+                matched = self._keywords.get(phrase)
+                if matched:
+                    seen.add(phrase)
+                    for ordinal in matched:
+                        scores[ordinal] = scores.get(ordinal, 0) + 1
+        if not scores:
+            return None
+        top = max(scores.values())
+        winners = [ordinal for ordinal, score in scores.items() if score == top]
+        return winners[0] if len(winners) == 1 else None
+
+
+def load_task_registry(paths=None) -> TaskRegistry:
+    """
+    Build a registry from one or more .jsonl/.toml files.
+    Defaults to MEDICAL_TASKS_PATH (os.pathsep separated) or the bundled corpus.
+    """
+    if paths is None:
+        env_paths = os.getenv("MEDICAL_TASKS_PATH")
+        paths = env_paths.split(os.pathsep) if env_paths else [DEFAULT_TASKS_PATH]
+    records = []
+    for path in paths:
+        records.extend(_load_file(Path(path)))
+    return TaskRegistry(records)
+
+
+_registry: TaskRegistry | None = None
+
+
+def get_task_registry() -> TaskRegistry:
+    """Return the process-wide registry, loading it on first use"""
+    global _registry
+    if _registry is None:
+        _registry = load_task_registry()
+    return _registry
@@ -0,0 +1,160 @@
+"""Evaluation transcripts - one slotted record per white agent step, optionally streamed to a JSONL file."""
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+class TranscriptStep:
+    """One white agent step: its response, the parsed action, the tool result, latencies and tokens"""
+
+    __slots__ = ("step", "white_text", "elapsed", "a2a", "usage", "kind", "url", "payload", "items",
+                 "format_errors", "parse", "tool_result", "tool")
+
+    def __init__(self, step: int, white_text: str, elapsed: float, a2a: float | None, usage: dict | None):
+        self.step = step
+        self.white_text = white_text
+        self.elapsed = elapsed
+        self.a2a = a2a
+        self.usage = usage
+        self.kind = self.url = self.payload = self.items = None
+        self.format_errors = ()
+        self.parse = None
+        self.tool_result = None
+        self.tool = None
+
+    def set_action(self, action, format_errors: list, seconds: float):
+        self.kind = action.kind
+        self.url = action.url
+        self.payload = action.payload
+        self.items = action.items
+        self.format_errors = format_errors
+        self.parse = seconds
+
+    def set_tool_result(self, result, seconds: float):
+        self.tool_result = result
+        self.tool = seconds
+
+    def to_dict(self) -> dict:
+        usage = self.usage or {}
+        return {
+            "step": self.step,
+            "white_text": self.white_text,
+            "action": {"kind": self.kind, "url": self.url, "payload": self.payload, "items": self.items},
+            "format_errors": list(self.format_errors),
+            "tool_result": self.tool_result,
+            "elapsed_ms": _ms(self.elapsed),
+            "latency_ms": {"a2a": _ms(self.a2a), "parse": _ms(self.parse), "tool": _ms(self.tool)},
+            "usage": {
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+                "cost_usd": usage.get("cost_usd", 0.0),
+            },
+        }
+
+
+class Transcript:
+    """
+    Steps of one evaluation, in order.
+    Appending a step is O(1) and nothing is joined or copied until the
+    result is built. With a writer, finished steps are streamed out as the
+    run goes, so a run that is cancelled or crashes still leaves its steps on disk.
+    """
+
+    __slots__ = ("task_id", "context_id", "steps", "writer", "_written", "_started")
+
+    def __init__(self, task_id: str, context_id: str, writer=None):
+        self.task_id = task_id
+        self.context_id = context_id
+        self.steps = []
+        self.writer = writer
+        self._written = 0
+        self._started = time.perf_counter()
+
+    def add(self, white_text: str, a2a_seconds: float | None = None, usage: dict | None = None) -> TranscriptStep:
+        """Record the white agent's next response; fill in the rest with the returned step's setters"""
+        step = TranscriptStep(
+            len(self.steps) + 1, white_text, time.perf_counter() - self._started, a2a_seconds, usage
+        )
+        self.steps.append(step)
+        return step
+
+    def flush(self):
+        """Stream the steps recorded since the last flush to the writer, if any"""
+        if self.writer is None or self._written == len(self.steps):
+            return
+        pending = self.steps[self._written:]
+        self._written = len(self.steps)
+        self.writer.write(self.task_id, self.context_id, pending)
+
+    def responses(self) -> list:
+        return [step.white_text for step in self.steps]
+
+    def to_dict(self) -> dict:
+        return {
+            "context_id": self.context_id,
+            "path": str(self.writer.path) if self.writer is not None else None,
+            "steps": [step.to_dict() for step in self.steps],
+        }
+
+
+class TranscriptWriter:
+    """
+    Appends transcript steps to a JSONL file, one line per step tagged with
+    its task and context id. Several processes may share one file.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.written = 0
+        atexit.register(self.close)
+
+    def write(self, task_id: str, context_id: str, steps: list):
+        lines = "".join(
+            json.dumps({"task_id": task_id, "context_id": context_id, **step.to_dict()}, default=str) + "\n"
+            for step in steps
+        )
+        with self._lock:
+            if self._file.closed:
+                return
+            # One write per flush keeps lines whole when workers share the file
+            self._file.write(lines)
+            self._file.flush()
+            self.written += len(steps)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def stats(self) -> dict:
+        return {"path": str(self.path), "written": self.written}
+
+
+def transcript_writer_from_env() -> TranscriptWriter | None:
+    """Writer streaming steps to TRANSCRIPT_PATH (JSONL), or None to keep transcripts in the results only"""
+    path = os.getenv("TRANSCRIPT_PATH")
+    return TranscriptWriter(path) if path else None
+
+
+_writer: TranscriptWriter | None = None
+_writer_loaded = False
+
+
+def get_transcript_writer() -> TranscriptWriter | None:
+    """Return the process-wide transcript writer (None when streaming is off), creating it on first use"""
+    global _writer, _writer_loaded
+    if not _writer_loaded:
+        _writer = transcript_writer_from_env()
+        _writer_loaded = True
+    return _writer
@@ -1,39 +1,251 @@
 """Launcher module - initiates and coordinates the medical evaluation process."""
 
-import multiprocessing
+import asyncio
+import contextlib
 import json
-from src.green_agent.agent import start_green_agent
+import multiprocessing
+import signal
+import time
+from itertools import cycle, islice
+from src.green_agent.agent import DEFAULT_SUITE_CONCURRENCY, select_tasks, start_green_agent
 from src.white_agent.agent import start_white_agent
-from src.my_util import my_a2a
+from src.my_util import my_a2a, get_result_text, get_result_data
+from src.my_util.settings import get_settings
+
+DEFAULT_READY_TIMEOUT = 60.0
+# Seconds between readiness probes while agents start
+READY_POLL_INTERVAL = 0.25
+# Seconds a terminated agent gets to exit before it is killed
+STOP_TIMEOUT = 5.0
+
+# "split" spreads the tasks over the white agents, "each" runs every task on every white agent
+DISTRIBUTION_MODES = ("split", "each")
+SUITE_RESULT_PREFIX = "Suite Evaluation Result:"
+
+
+class AgentProcess:
+    """One agent server running in a child process"""
+
+    def __init__(self, name: str, url: str, process, model: str | None = None):
+        self.name = name
+        self.url = url
+        self.process = process
+        self.model = model
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """Poll the agent card until it is served; give up early if the process exits"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not self.process.is_alive():
+                return False
+            try:
+                if await my_a2a.get_agent_card(self.url, refresh=True) is not None:
+                    return True
+            except Exception:
+                pass
+            await asyncio.sleep(READY_POLL_INTERVAL)
+        return False
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(STOP_TIMEOUT)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class AgentFleet:
+    """
+    A green agent and `white_count` white agents on consecutive ports, started
+    in parallel and kept alive across evaluations until `stop()`.
+    `models` are assigned to the white agents in order (cycled), so one fleet
+    can compare several models on the same tasks.
+    Host, ports and the model default to the settings.
+    """
+
+    def __init__(self, white_count: int = 1, models=None, host: str | None = None,
+                 green_port: int | None = None, white_port: int | None = None,
+                 ready_timeout: float = DEFAULT_READY_TIMEOUT):
+        settings = get_settings()
+        self.white_count = max(1, white_count)
+        self.models = list(islice(cycle(models or [settings.white_model]), self.white_count))
+        self.host = host or settings.host
+        self.green_port = green_port or settings.green_port
+        self.white_port = white_port or settings.white_port
+        self.ready_timeout = ready_timeout
+        self.green = None
+        self.whites = []
+        # Agents are spawned, not forked, so they never inherit this process's event loop or sockets
+        self._mp = multiprocessing.get_context("spawn")
+
+    def _spawn(self, name, target, port, **kwargs) -> AgentProcess:
+        process = self._mp.Process(target=target, args=(name, self.host, port), kwargs=kwargs, daemon=True)
+        process.start()
+        return AgentProcess(name, f"http://{self.host}:{port}", process, kwargs.get("model"))
+
+    async def start(self):
+        """Start every agent at once and wait until all of them serve their agent card"""
+        started = time.perf_counter()
+        self.green = self._spawn("medical_green_agent", start_green_agent, self.green_port)
+        self.whites = [
+            self._spawn("medical_white_agent", start_white_agent, self.white_port + i, model=model)
+            for i, model in enumerate(self.models)
+        ]
+        agents = [self.green, *self.whites]
+        ready = await asyncio.gather(*(agent.wait_ready(self.ready_timeout) for agent in agents))
+        failed = [agent.url for agent, ok in zip(agents, ready) if not ok]
+        if failed:
+            self.stop()
+            raise RuntimeError(f"Agents not ready in time: {', '.join(failed)}")
+        print(f"Fleet ready in {time.perf_counter() - started:.1f}s: green {self.green.url}, "
+              + ", ".join(f"white {w.url} ({w.model})" for w in self.whites))
+
+    def stop(self):
+        for agent in [*self.whites, self.green]:
+            if agent is not None:
+                agent.stop()
+        self.whites = []
+        self.green = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+
+    def assign_tasks(self, task_ids="all", category=None, mode: str = "split") -> list:
+        """(white agent, task ids) pairs: tasks dealt round-robin ("split") or all tasks to every agent ("each")"""
+        if mode not in DISTRIBUTION_MODES:
+            raise ValueError(f"Unknown distribution mode '{mode}', expected one of {', '.join(DISTRIBUTION_MODES)}")
+        ids = [task["task_id"] for task in select_tasks(task_ids, category)]
+        if mode == "each":
+            return [(white, ids) for white in self.whites]
+        shares = [(white, ids[i::len(self.whites)]) for i, white in enumerate(self.whites)]
+        return [(white, share) for white, share in shares if share]
+
+    async def run_suite(self, white: AgentProcess, task_ids: list, max_steps: int | None = None,
+                        concurrency: int = DEFAULT_SUITE_CONCURRENCY, on_event=None) -> dict:
+        """Have the green agent evaluate one white agent on `task_ids`; returns the suite result"""
+        max_steps = max_steps or get_settings().max_steps
+        message = f"""
+Your task is to evaluate the medical agent located at:
+<white_agent_url>
+{white.url}/
+</white_agent_url>
+<task_ids>
+{json.dumps(task_ids)}
+</task_ids>
+<max_steps>
+{max_steps}
+</max_steps>
+<concurrency>
+{concurrency}
+</concurrency>
+"""
+        text = ""
+        async for result in my_a2a.stream_message(self.green.url, message):
+            if on_event is not None:
+                for event in get_result_data(result):
+                    on_event(white, event)
+            if getattr(result, "final", False) or getattr(result, "kind", None) == "message":
+                text = get_result_text(result)
+        if not text.startswith(SUITE_RESULT_PREFIX):
+            raise RuntimeError(f"Unexpected green agent response for {white.url}: {text[:200]}")
+        return json.loads(text[len(SUITE_RESULT_PREFIX):])
+
+    async def evaluate(self, task_ids="all", category=None, mode: str = "split", max_steps: int | None = None,
+                       concurrency: int = DEFAULT_SUITE_CONCURRENCY, on_event=None) -> list:
+        """Evaluate the fleet's white agents concurrently; one entry per white agent that got tasks"""
+        assignments = self.assign_tasks(task_ids, category, mode)
+        suites = await asyncio.gather(*(
+            self.run_suite(white, ids, max_steps, concurrency, on_event) for white, ids in assignments
+        ))
+        return [
+            {"white_agent_url": white.url, "model": white.model, **suite}
+            for (white, _), suite in zip(assignments, suites)
+        ]
+
+
+def print_fleet_results(results: list):
+    for entry in results:
+        aggregate = entry["aggregate"]
+        print(
+            f"  {entry['white_agent_url']:<24} {entry['model']:<28} "
+            f"tasks {aggregate['num_tasks']:>4}   success {aggregate['success_rate']:6.1%}   "
+            f"time {entry['time_used']:7.1f}s"
+        )
+
+
+async def _unless_stopped(coro, stop: asyncio.Event) -> bool:
+    """Run `coro` to completion unless `stop` is set first (then cancel it); True if it completed"""
+    task = asyncio.ensure_future(coro)
+    stopped = asyncio.ensure_future(stop.wait())
+    await asyncio.wait([task, stopped], return_when=asyncio.FIRST_COMPLETED)
+    stopped.cancel()
+    if not task.done():
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        return False
+    task.result()
+    return True
+
+
+async def run_fleet(white_count: int = 1, models=None, green_port: int | None = None,
+                    white_port: int | None = None, task_ids="all", category=None, mode: str = "split",
+                    rounds: int = 1, max_steps: int | None = None, concurrency: int = DEFAULT_SUITE_CONCURRENCY,
+                    serve: bool = False):
+    """
+    Start a fleet, run `rounds` suite evaluations on it and shut it down.
+    With `serve` the fleet stays up afterwards until SIGINT/SIGTERM.
+    Signals stop the fleet cleanly at any point.
+    """
+    fleet = AgentFleet(white_count, models, green_port=green_port, white_port=white_port)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    async def work():
+        for round_number in range(1, rounds + 1):
+            print(f"Round {round_number}/{rounds}: mode {mode}, tasks {task_ids}"
+                  + (f", category {category}" if category else ""))
+            results = await fleet.evaluate(task_ids, category, mode, max_steps, concurrency)
+            print_fleet_results(results)
+        if serve:
+            print("Fleet is serving; press Ctrl+C to stop.")
+            await stop.wait()
+
+    try:
+        if not await _unless_stopped(fleet.start(), stop):
+            print("Interrupted during startup.")
+        elif not await _unless_stopped(work(), stop):
+            print("Interrupted; running evaluations cancelled.")
+    finally:
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(signum)
+        print("Stopping fleet...")
+        fleet.stop()
+        await my_a2a.aclose()
+        print("Agents terminated.")
 
 
 async def launch_evaluation():
     """Launch the complete evaluation workflow"""
-    # Start green agent
-    print("Launching medical green agent...")
-    green_address = ("localhost", 9001)
-    green_url = f"http://{green_address[0]}:{green_address[1]}"
-    p_green = multiprocessing.Process(
-        target=start_green_agent, args=("medical_green_agent", *green_address)
-    )
-    p_green.start()
-    assert await my_a2a.wait_agent_ready(green_url), "Green agent not ready in time"
-    print("Green agent is ready.")
-    
-    # Start white agent
-    print("Launching medical white agent...")
-    white_address = ("localhost", 9002)
-    white_url = f"http://{white_address[0]}:{white_address[1]}"
-    p_white = multiprocessing.Process(
-        target=start_white_agent, args=("medical_white_agent", *white_address)
-    )
-    p_white.start()
-    assert await my_a2a.wait_agent_ready(white_url), "White agent not ready in time"
-    print("White agent is ready.")
-    
-    # Send the task description to green agent
-    print("Sending evaluation task to green agent...")
-    task_text = f"""
+    print("Launching medical green and white agents...")
+    async with AgentFleet(white_count=1) as fleet:
+        green_url = fleet.green.url
+        white_url = fleet.whites[0].url
+
+        # Send the task description to green agent
+        print("Sending evaluation task to green agent...")
+        task_text = f"""
 Your task is to evaluate the medical agent located at:
 <white_agent_url>
 {white_url}/
@@ -43,20 +255,21 @@ You should test it with the following medical task:
 Retrieve the blood pressure reading for patient MRN S1234567
 </task_description>
 <max_steps>
-30
+{get_settings().max_steps}
 </max_steps>
     """
-    print("Task description:")
-    print(task_text)
-    print("Sending...")
-    response = await my_a2a.send_message(green_url, task_text)
-    print("Response from green agent:")
-    print(response)
-    
-    print("Evaluation complete. Terminating agents...")
-    p_green.terminate()
-    p_green.join()
-    p_white.terminate()
-    p_white.join()
-    print("Agents terminated.")
+        print("Task description:")
+        print(task_text)
+        print("Sending...")
+        # Stream the evaluation so progress is printed step by step
+        async for result in my_a2a.stream_message(green_url, task_text):
+            for event in get_result_data(result):
+                if event.get("type") == "step":
+                    print(f"Step {event['step']}: {event['white_text']}")
+            if getattr(result, "final", False):
+                print("Response from green agent:")
+                print(get_result_text(result))
 
+        print("Evaluation complete. Terminating agents...")
+        await my_a2a.aclose()
+    print("Agents terminated.")
@@ -1,20 +1,31 @@
 import re
 from typing import Dict
-import httpx
-import asyncio
 import uuid
 
-from a2a.client import A2ACardResolver, A2AClient
 from a2a.types import (
     AgentCard,
     Part,
     TextPart,
+    DataPart,
     MessageSendParams,
     Message,
     Role,
     SendMessageRequest,
     SendMessageResponse,
+    SendStreamingMessageRequest,
+    Task,
+    TaskStatusUpdateEvent,
+    TaskArtifactUpdateEvent,
 )
+from .a2a_session import A2ASession
+from .health import HealthMonitor
+from .settings import get_settings
+from .tracing import TRACEPARENT, current_traceparent, get_tracer
+
+# Process-wide session shared by the green agent, launcher and API server
+a2a_session = A2ASession(timeout=get_settings().a2a_timeout)
+# Cached agent readiness over the same session
+health_monitor = HealthMonitor(a2a_session)
 
 
 def parse_tags(str_with_tags: str) -> Dict[str, str]:
@@ -23,66 +34,124 @@ def parse_tags(str_with_tags: str) -> Dict[str, str]:
     return {tag: content.strip() for tag, content in tags}
 
 
-async def get_agent_card(url: str) -> AgentCard | None:
-    httpx_client = httpx.AsyncClient()
-    resolver = A2ACardResolver(httpx_client=httpx_client, base_url=url)
-    card: AgentCard | None = await resolver.get_agent_card()
-    return card
+async def get_agent_card(url: str, refresh: bool = False) -> AgentCard | None:
+    return await a2a_session.get_agent_card(url, refresh=refresh)
 
 
 async def wait_agent_ready(url, timeout=10):
-    """Wait until the A2A server is ready, check by getting the agent card"""
-    retry_cnt = 0
-    while retry_cnt < timeout:
-        retry_cnt += 1
-        try:
-            card = await get_agent_card(url)
-            if card is not None:
-                return True
-            else:
-                print(
-                    f"Agent card not available yet..., retrying {retry_cnt}/{timeout}"
-                )
-        except Exception:
-            pass
-        await asyncio.sleep(1)
-    return False
-
+    """Wait up to `timeout` seconds until the agent answers /status or serves its card"""
+    return await health_monitor.wait_ready(url, timeout)
 
-async def send_message(
-    url, message, task_id=None, context_id=None
-) -> SendMessageResponse:
-    card = await get_agent_card(url)
-    httpx_client = httpx.AsyncClient(timeout=120.0)
-    client = A2AClient(httpx_client=httpx_client, agent_card=card)
 
-    message_id = uuid.uuid4().hex
-    params = MessageSendParams(
+def _message_params(message, task_id=None, context_id=None) -> MessageSendParams:
+    # Propagate the current trace so the receiving agent's spans join it
+    traceparent = current_traceparent()
+    return MessageSendParams(
         message=Message(
             role=Role.user,
             parts=[Part(TextPart(text=message))],
-            message_id=message_id,
+            message_id=uuid.uuid4().hex,
             task_id=task_id,
             context_id=context_id,
+            metadata={TRACEPARENT: traceparent} if traceparent else None,
         )
     )
-    request_id = uuid.uuid4().hex
-    req = SendMessageRequest(id=request_id, params=params)
-    response = await client.send_message(request=req)
+
+
+async def send_message(
+    url, message, task_id=None, context_id=None
+) -> SendMessageResponse:
+    with get_tracer().child("a2a.send", url=url):
+        params = _message_params(message, task_id, context_id)
+        request_id = uuid.uuid4().hex
+        req = SendMessageRequest(id=request_id, params=params)
+        response = await a2a_session.send(url, req)
     return response
 
 
+async def stream_message(url, message, task_id=None, context_id=None):
+    """
+    Send a message over A2A streaming and yield each result as it arrives:
+    Message, Task, TaskStatusUpdateEvent or TaskArtifactUpdateEvent
+    """
+    params = _message_params(message, task_id, context_id)
+    req = SendStreamingMessageRequest(id=uuid.uuid4().hex, params=params)
+    async for response in a2a_session.stream(url, req):
+        result = getattr(response.root, "result", None)
+        if result is None:
+            raise RuntimeError(f"A2A streaming error: {response.root.error}")
+        yield result
+
+
+def _parts_of(result) -> list:
+    """Parts carried by a streamed or returned A2A result"""
+    if isinstance(result, Message):
+        return result.parts
+    if isinstance(result, (Task, TaskStatusUpdateEvent)):
+        message = result.status.message
+        parts = list(message.parts) if message else []
+        if isinstance(result, Task):
+            for artifact in result.artifacts or []:
+                parts.extend(artifact.parts)
+        return parts
+    if isinstance(result, TaskArtifactUpdateEvent):
+        return result.artifact.parts
+    return []
+
+
+def get_result_text(result) -> str:
+    """Join the text parts of a Message, Task (status message and artifacts) or task event"""
+    return "\n".join(
+        part.root.text for part in _parts_of(result) if isinstance(part.root, TextPart)
+    )
+
+
+def get_result_data(result) -> list:
+    """Return the DataPart payloads (progress events) of a result"""
+    return [part.root.data for part in _parts_of(result) if isinstance(part.root, DataPart)]
+
+
 class MyA2A:
     """Wrapper class for A2A communication utilities"""
+
+    session = a2a_session
     
     @staticmethod
     async def send_message(url, message, task_id=None, context_id=None):
         return await send_message(url, message, task_id, context_id)
     
+    @staticmethod
+    def stream_message(url, message, task_id=None, context_id=None):
+        return stream_message(url, message, task_id, context_id)
+
     @staticmethod
     async def wait_agent_ready(url, timeout=10):
         return await wait_agent_ready(url, timeout)
 
+    @staticmethod
+    async def check_health(url, max_age=None):
+        return await health_monitor.check(url, max_age)
+
+    @staticmethod
+    async def check_health_many(urls, max_age=None):
+        return await health_monitor.check_many(urls, max_age)
+
+    @staticmethod
+    async def get_agent_card(url, refresh=False):
+        return await get_agent_card(url, refresh)
+
+    @staticmethod
+    def invalidate_card(url=None):
+        a2a_session.invalidate_card(url)
+
+    @staticmethod
+    def pool_stats():
+        return a2a_session.pool_stats()
+
+    @staticmethod
+    async def aclose():
+        await a2a_session.aclose()
+
 
 my_a2a = MyA2A()
 
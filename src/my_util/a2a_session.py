@@ -0,0 +1,329 @@
+"""Long-lived A2A client session with pooled connections and cached agent cards."""
+
+import asyncio
+import contextlib
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+from a2a.client import A2ACardResolver, A2AClient
+from a2a.types import AgentCard
+
+from .metrics import a2a_latency
+from .tracing import get_tracer
+
+
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_CARD_TTL = 300.0
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 20
+DEFAULT_MAX_KEEPALIVE_PER_HOST = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+def _origin(url: str) -> str:
+    """Return scheme://host[:port] for a URL, used as the pool key"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class _HostPool:
+    """One keep-alive httpx client bound to the event loop that created it"""
+
+    __slots__ = ("client", "loop", "requests", "created_at", "stale")
+
+    def __init__(self, client: httpx.AsyncClient, loop):
+        self.client = client
+        self.loop = loop
+        self.requests = 0
+        self.created_at = time.monotonic()
+        # Built with outdated limits and waiting for a loop to be closed on
+        self.stale = False
+
+
+class _CardEntry:
+    """Cached agent card plus the A2A client built for it"""
+
+    __slots__ = ("card", "fetched_at", "client")
+
+    def __init__(self, card: AgentCard, fetched_at: float):
+        self.card = card
+        self.fetched_at = fetched_at
+        # (httpx client, A2AClient) pair, rebuilt when the pool changes
+        self.client = None
+
+
+class _CardLock:
+    """Serializes card fetches for one URL; dropped once no coroutine holds or waits on it"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+async def _close_quietly(client: httpx.AsyncClient):
+    # Connections opened on a loop that has since closed may not shut down cleanly; they are dropped either way
+    with contextlib.suppress(Exception):
+        await client.aclose()
+
+
+class A2ASession:
+    """
+    Shared A2A client session.
+
+    Keeps one keep-alive httpx connection pool per host (with per-host
+    connection limits) and caches agent cards for `card_ttl` seconds so that
+    repeated messages to the same agent cost one round trip instead of a card
+    fetch plus a fresh TCP connect.
+
+    httpx clients cannot be shared across event loops, so pools are tracked
+    per loop and transparently rebuilt when used from a different one.
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        card_ttl: float = DEFAULT_CARD_TTL,
+        max_connections_per_host: int = DEFAULT_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_per_host: int = DEFAULT_MAX_KEEPALIVE_PER_HOST,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    ):
+        self.timeout = timeout
+        self.card_ttl = card_ttl
+        self.max_connections_per_host = max_connections_per_host
+        self.max_keepalive_per_host = max_keepalive_per_host
+        self.keepalive_expiry = keepalive_expiry
+        self._pools: dict[str, _HostPool] = {}
+        self._cards: dict[str, _CardEntry] = {}
+        # event loop -> url -> lock; a loop's locks go away with the loop
+        self._card_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # Closes of replaced pools still running on this session's loops
+        self._closing = set()
+        self._stats = {
+            "pools_created": 0,
+            "pools_rebuilt": 0,
+            "pools_closed": 0,
+            "card_hits": 0,
+            "card_misses": 0,
+            "card_invalidations": 0,
+            "messages_sent": 0,
+            "send_errors": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Connection pools
+    # ------------------------------------------------------------------
+
+    def set_host_limits(
+        self,
+        max_connections_per_host: int | None = None,
+        max_keepalive_per_host: int | None = None,
+    ):
+        """Change per-host limits; existing pools are closed and rebuilt on next use"""
+        if max_connections_per_host is not None:
+            self.max_connections_per_host = max_connections_per_host
+        if max_keepalive_per_host is not None:
+            self.max_keepalive_per_host = max_keepalive_per_host
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        for key, pool in list(self._pools.items()):
+            if loop is not None or (pool.loop.is_running() and not pool.loop.is_closed()):
+                self._retire(pool, loop)
+                del self._pools[key]
+            else:
+                # No loop to close it on right now; _client_for retires it on next use
+                pool.stale = True
+        for entry in self._cards.values():
+            entry.client = None
+
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        """Return the pooled client for the URL's host on the running loop"""
+        key = _origin(url)
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(key)
+        if pool is None or pool.loop is not loop or pool.client.is_closed or pool.stale:
+            if pool is not None:
+                self._stats["pools_rebuilt"] += 1
+                self._retire(pool, loop)
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections_per_host,
+                    max_keepalive_connections=self.max_keepalive_per_host,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+            pool = _HostPool(client, loop)
+            self._pools[key] = pool
+            self._stats["pools_created"] += 1
+        pool.requests += 1
+        return pool.client
+
+    def _retire(self, pool: _HostPool, loop):
+        """Close a replaced pool's client on its own loop while that loop runs, else on this one"""
+        if pool.client.is_closed:
+            return
+        self._stats["pools_closed"] += 1
+        if pool.loop is not loop and pool.loop.is_running() and not pool.loop.is_closed():
+            asyncio.run_coroutine_threadsafe(_close_quietly(pool.client), pool.loop)
+            return
+        task = loop.create_task(_close_quietly(pool.client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    # ------------------------------------------------------------------
+    # Agent cards
+    # ------------------------------------------------------------------
+
+    async def get_agent_card(self, url: str, refresh: bool = False) -> AgentCard | None:
+        """Return the agent card for `url`, served from cache within the TTL"""
+        key = url.rstrip("/")
+        entry = self._cards.get(key)
+        if not refresh and entry is not None and time.monotonic() - entry.fetched_at < self.card_ttl:
+            self._stats["card_hits"] += 1
+            return entry.card
+
+        requested_at = time.monotonic()
+        locks, card_lock = self._card_lock(key)
+        try:
+            async with card_lock.lock:
+                # Another coroutine may have fetched it while we waited; a card fetched
+                # after this call started also satisfies a refresh
+                entry = self._cards.get(key)
+                if entry is not None and (
+                    entry.fetched_at >= requested_at
+                    or (not refresh and time.monotonic() - entry.fetched_at < self.card_ttl)
+                ):
+                    self._stats["card_hits"] += 1
+                    return entry.card
+
+                self._stats["card_misses"] += 1
+                with get_tracer().child("a2a.card", url=url):
+                    resolver = A2ACardResolver(httpx_client=self._client_for(url), base_url=url)
+                    card: AgentCard | None = await resolver.get_agent_card()
+                if card is not None:
+                    self._cards[key] = _CardEntry(card, time.monotonic())
+                return card
+        finally:
+            card_lock.users -= 1
+            if card_lock.users == 0 and locks.get(key) is card_lock:
+                del locks[key]
+
+    def _card_lock(self, key: str) -> tuple:
+        """(this loop's lock table, the lock for `key`), counting the caller as a user"""
+        loop = asyncio.get_running_loop()
+        locks = self._card_locks.get(loop)
+        if locks is None:
+            # Loops that closed but are still referenced can never use their locks again
+            for closed in [other for other in self._card_locks if other.is_closed()]:
+                del self._card_locks[closed]
+            locks = self._card_locks[loop] = {}
+        card_lock = locks.get(key)
+        if card_lock is None:
+            card_lock = locks[key] = _CardLock()
+        card_lock.users += 1
+        return locks, card_lock
+
+    def invalidate_card(self, url: str | None = None):
+        """Drop one cached card (or all of them when url is None)"""
+        if url is None:
+            self._stats["card_invalidations"] += len(self._cards)
+            self._cards.clear()
+        elif self._cards.pop(url.rstrip("/"), None) is not None:
+            self._stats["card_invalidations"] += 1
+
+    async def _client_for_agent(self, url: str) -> A2AClient:
+        card = await self.get_agent_card(url)
+        if card is None:
+            raise RuntimeError(f"No agent card at {url}")
+        entry = self._cards.get(url.rstrip("/"))
+        httpx_client = self._client_for(card.url)
+        if entry is not None and entry.client is not None and entry.client[0] is httpx_client:
+            return entry.client[1]
+        client = A2AClient(httpx_client=httpx_client, agent_card=card)
+        if entry is not None:
+            entry.client = (httpx_client, client)
+        return client
+
+    # ------------------------------------------------------------------
+    # Messaging
+    # ------------------------------------------------------------------
+
+    async def send(self, url: str, request):
+        """Send a prepared SendMessageRequest to the agent at `url`"""
+        client = await self._client_for_agent(url)
+        started = time.perf_counter()
+        try:
+            response = await client.send_message(request=request)
+        except Exception:
+            # The agent may have restarted elsewhere; refetch its card next time
+            self._stats["send_errors"] += 1
+            a2a_latency.observe(time.perf_counter() - started, "error")
+            self.invalidate_card(url)
+            raise
+        self._stats["messages_sent"] += 1
+        a2a_latency.observe(time.perf_counter() - started, "ok")
+        return response
+
+    async def stream(self, url: str, request):
+        """
+        Send a prepared SendStreamingMessageRequest and yield each response as it arrives.
+        `timeout` bounds the wait for the next event, not the whole stream.
+        """
+        client = await self._client_for_agent(url)
+        try:
+            async for response in client.send_message_streaming(
+                request=request, http_kwargs={"timeout": self.timeout}
+            ):
+                yield response
+        except Exception:
+            self._stats["send_errors"] += 1
+            self.invalidate_card(url)
+            raise
+        self._stats["messages_sent"] += 1
+
+    async def get_status(self, url: str, timeout: float) -> dict:
+        """GET the agent's /status JSON over the pooled connection; raises on HTTP or network errors"""
+        response = await self._client_for(url).get(f"{url.rstrip('/')}/status", timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    # ------------------------------------------------------------------
+    # Introspection and shutdown
+    # ------------------------------------------------------------------
+
+    def pool_stats(self) -> dict:
+        """Return connection-pool and card-cache statistics"""
+        hosts = {}
+        for key, pool in self._pools.items():
+            connections = getattr(getattr(pool.client, "_transport", None), "_pool", None)
+            connections = getattr(connections, "connections", None) or []
+            hosts[key] = {
+                "requests": pool.requests,
+                "open_connections": len(connections),
+                "idle_connections": sum(1 for c in connections if c.is_idle()),
+                "max_connections": self.max_connections_per_host,
+                "max_keepalive_connections": self.max_keepalive_per_host,
+                "closed": pool.client.is_closed,
+            }
+        return {
+            **self._stats,
+            "cached_cards": len(self._cards),
+            "card_locks": sum(len(locks) for locks in self._card_locks.values()),
+            "card_ttl": self.card_ttl,
+            "hosts": hosts,
+        }
+
+    async def aclose(self):
+        """Close every pool that belongs to the running loop"""
+        loop = asyncio.get_running_loop()
+        for key, pool in list(self._pools.items()):
+            if pool.loop is loop:
+                await pool.client.aclose()
+                del self._pools[key]
+        for entry in self._cards.values():
+            entry.client = None
@@ -0,0 +1,175 @@
+"""Content-addressed LLM completion cache persisted in SQLite with size-based LRU eviction."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+MODE_OFF = "off"
+MODE_READWRITE = "readwrite"
+MODE_REPLAY = "replay"
+MODES = (MODE_OFF, MODE_READWRITE, MODE_REPLAY)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent.parent / ".cache" / "llm_completions.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# After exceeding the size cap, evict down to this fraction of it
+_EVICT_TARGET = 0.9
+
+
+class CacheMiss(Exception):
+    """Raised in replay mode when a completion is not in the cache"""
+
+
+def make_cache_key(model: str, messages: list, **params) -> str:
+    """Hash model, sampling parameters and the full message list into a cache key"""
+    canonical = json.dumps(
+        {"model": model, "params": params, "messages": messages},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """
+    Persistent completion cache keyed by `make_cache_key`.
+
+    Modes:
+    - "off": every lookup misses and nothing is stored
+    - "readwrite": hits are served from disk, misses are stored after the call
+    - "replay": read-only; a miss raises CacheMiss so offline runs fail loudly
+
+    Entries are evicted least-recently-used first once the stored payload
+    size exceeds `max_bytes`.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES, mode: str = MODE_READWRITE):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode '{mode}', expected one of {', '.join(MODES)}")
+        self.mode = mode
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._conn = None
+        # Size and row count are kept up to date on writes so stats() never scans the table
+        self._total_bytes = 0
+        self._entries = 0
+        if mode != MODE_OFF:
+            self._open()
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS completions_lru ON completions(last_access)")
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM completions").fetchone()
+        self._total_bytes, self._entries = row
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != MODE_OFF
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached value, None on a miss (CacheMiss in replay mode)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+                self._conn.execute(
+                    "UPDATE completions SET last_access = ? WHERE key = ?", (time.time(), key)
+                )
+        if row is None:
+            if self.mode == MODE_REPLAY:
+                raise CacheMiss(f"No cached completion for key {key[:16]}... (replay mode)")
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, value: dict):
+        """Store a value; a no-op unless the cache is in readwrite mode"""
+        if self.mode != MODE_READWRITE:
+            return
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM completions WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._entries += 0 if old else 1
+            self._stats["stores"] += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least-recently-used entries until under the target size (lock held)"""
+        target = int(self.max_bytes * _EVICT_TARGET)
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM completions ORDER BY last_access"):
+            if self._total_bytes - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", doomed)
+        self._total_bytes -= freed
+        self._entries -= len(doomed)
+        self._stats["evictions"] += len(doomed)
+
+    def clear(self):
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._total_bytes = 0
+            self._entries = 0
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "mode": self.mode,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            "entries": self._entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "path": str(self.path),
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def completion_cache_from_env(mode: str | None = None, path=None) -> CompletionCache:
+    """Build a cache from LLM_CACHE_MODE / LLM_CACHE_PATH / LLM_CACHE_MAX_MB, with explicit overrides"""
+    mode = mode or os.getenv("LLM_CACHE_MODE", MODE_READWRITE)
+    path = path or os.getenv("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH
+    max_mb = os.getenv("LLM_CACHE_MAX_MB")
+    max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+    return CompletionCache(path, max_bytes=max_bytes, mode=mode)
@@ -0,0 +1,265 @@
+"""Agent health monitor - cached readiness per URL, background probes and backoff with jitter."""
+
+import asyncio
+import contextlib
+import random
+import time
+from collections import OrderedDict
+
+import httpx
+
+DEFAULT_PROBE_TIMEOUT = 2.0
+# Cached results younger than this are served without probing
+DEFAULT_MAX_AGE = 2.0
+# Background re-probe interval for healthy registered agents
+DEFAULT_INTERVAL = 5.0
+# Backoff between probes of an unreachable agent: BASE * 2^failures, capped at MAX
+DEFAULT_BACKOFF_BASE = 0.1
+DEFAULT_BACKOFF_MAX = 10.0
+# Registered agents nobody asked about for this long stop being probed
+DEFAULT_REGISTRATION_TTL = 300.0
+# Unregistered agents are forgotten after this long without a check...
+DEFAULT_ENTRY_TTL = 300.0
+# ...or, least recently checked first, once more than this many are cached
+DEFAULT_MAX_ENTRIES = 1024
+# How often the background loop looks for due probes
+_TICK = 0.1
+
+
+def backoff_delay(failures: int, base: float = DEFAULT_BACKOFF_BASE, cap: float = DEFAULT_BACKOFF_MAX) -> float:
+    """Exponential backoff with equal jitter: a random delay in [d/2, d] for d = min(cap, base * 2^failures)"""
+    delay = min(cap, base * (2 ** failures))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class AgentHealth:
+    """Latest probe result for one agent URL"""
+
+    __slots__ = ("url", "ready", "latency", "source", "agent", "version", "error",
+                 "checked_at", "failures", "next_probe_at", "last_requested")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.ready = False
+        self.latency = None
+        # "status" (/status answered) or "card" (only the agent card did)
+        self.source = None
+        self.agent = None
+        self.version = None
+        self.error = None
+        self.checked_at = None
+        self.failures = 0
+        self.next_probe_at = 0.0
+        self.last_requested = time.monotonic()
+
+    def age(self) -> float:
+        return float("inf") if self.checked_at is None else time.monotonic() - self.checked_at
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "ready": self.ready,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 2),
+            "source": self.source,
+            "agent": self.agent,
+            "version": self.version,
+            "error": self.error,
+            "age_s": None if self.checked_at is None else round(self.age(), 3),
+            "failures": self.failures,
+        }
+
+
+class HealthMonitor:
+    """
+    Probes agents' /status (falling back to the agent card) over the shared
+    A2A session and caches readiness and latency per URL.
+
+    - `check` serves results younger than `max_age` from the cache; concurrent
+      checks of one URL share a single probe.
+    - Registered URLs are re-probed in the background every `interval`
+      seconds while healthy, and with exponential backoff plus jitter while
+      unreachable. Registrations lapse after `registration_ttl` seconds
+      without a check.
+    - Unregistered URLs are only cached: they are dropped after `entry_ttl`
+      seconds without a check, and the least recently checked go first once
+      more than `max_entries` are held.
+    - `wait_ready` polls with the same backoff until a deadline in seconds.
+    """
+
+    def __init__(self, session, probe_timeout: float = DEFAULT_PROBE_TIMEOUT, max_age: float = DEFAULT_MAX_AGE,
+                 interval: float = DEFAULT_INTERVAL, registration_ttl: float = DEFAULT_REGISTRATION_TTL,
+                 entry_ttl: float = DEFAULT_ENTRY_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.session = session
+        self.probe_timeout = probe_timeout
+        self.max_age = max_age
+        self.interval = interval
+        self.registration_ttl = registration_ttl
+        self.entry_ttl = entry_ttl
+        self.max_entries = max_entries
+        # Least recently checked first
+        self._health: OrderedDict[str, AgentHealth] = OrderedDict()
+        self._registered: set[str] = set()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._task = None
+        self._stats = {"checks": 0, "cache_hits": 0, "probes": 0, "probe_failures": 0, "coalesced": 0, "evicted": 0}
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return url.rstrip("/")
+
+    def _entry(self, url: str) -> AgentHealth:
+        key = self._key(url)
+        entry = self._health.get(key)
+        if entry is None:
+            entry = self._health[key] = AgentHealth(key)
+            self._prune()
+        else:
+            self._health.move_to_end(key)
+        return entry
+
+    def _prune(self):
+        """Drop unregistered entries that expired, then the least recently checked beyond `max_entries`"""
+        now = time.monotonic()
+        excess = len(self._health) - self.max_entries
+        for key, entry in list(self._health.items()):
+            if key in self._registered or key in self._inflight:
+                continue
+            if excess > 0 or now - entry.last_requested > self.entry_ttl:
+                del self._health[key]
+                excess -= 1
+                self._stats["evicted"] += 1
+            else:
+                # Later entries were checked more recently, so none of them has expired either
+                break
+
+    # ------------------------------------------------------------------
+    # Probing
+    # ------------------------------------------------------------------
+
+    async def _probe_once(self, entry: AgentHealth):
+        started = time.perf_counter()
+        try:
+            try:
+                status = await self.session.get_status(entry.url, self.probe_timeout)
+                entry.source = "status"
+                entry.agent = status.get("agent")
+                entry.version = status.get("version")
+            except (httpx.HTTPStatusError, ValueError):
+                # Reachable but without a usable /status: the agent card decides
+                card = await asyncio.wait_for(
+                    self.session.get_agent_card(entry.url, refresh=True), self.probe_timeout
+                )
+                if card is None:
+                    raise RuntimeError("agent card not available")
+                entry.source = "card"
+                entry.agent = card.name
+                entry.version = card.version
+        except Exception as e:
+            entry.ready = False
+            entry.error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            entry.failures += 1
+            entry.next_probe_at = time.monotonic() + backoff_delay(entry.failures)
+            self._stats["probe_failures"] += 1
+        else:
+            entry.ready = True
+            entry.error = None
+            entry.failures = 0
+            entry.next_probe_at = time.monotonic() + self.interval
+        entry.latency = time.perf_counter() - started
+        entry.checked_at = time.monotonic()
+        self._stats["probes"] += 1
+
+    async def probe(self, url: str) -> AgentHealth:
+        """Probe now, sharing an in-flight probe of the same URL"""
+        entry = self._entry(url)
+        inflight = self._inflight.get(entry.url)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+            await asyncio.shield(inflight)
+            return entry
+        future = asyncio.ensure_future(self._probe_once(entry))
+        self._inflight[entry.url] = future
+        try:
+            await asyncio.shield(future)
+        finally:
+            if self._inflight.get(entry.url) is future:
+                del self._inflight[entry.url]
+        return entry
+
+    async def check(self, url: str, max_age: float | None = None) -> dict:
+        """Health of one agent, probing only if the cached result is older than `max_age`"""
+        self._stats["checks"] += 1
+        entry = self._entry(url)
+        entry.last_requested = time.monotonic()
+        if entry.age() <= (self.max_age if max_age is None else max_age):
+            self._stats["cache_hits"] += 1
+            return entry.to_dict()
+        return (await self.probe(url)).to_dict()
+
+    async def check_many(self, urls, max_age: float | None = None) -> dict:
+        """url -> health for many agents in one call; stale entries are probed concurrently"""
+        urls = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.check(url, max_age) for url in urls))
+        return dict(zip(urls, results))
+
+    async def wait_ready(self, url: str, timeout: float = 10.0) -> bool:
+        """Probe until the agent is ready or `timeout` seconds pass, backing off between probes"""
+        deadline = time.monotonic() + timeout
+        failures = 0
+        while True:
+            entry = await self.probe(url)
+            if entry.ready:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            failures += 1
+            await asyncio.sleep(min(remaining, backoff_delay(failures, cap=1.0)))
+
+    # ------------------------------------------------------------------
+    # Background probing
+    # ------------------------------------------------------------------
+
+    def register(self, *urls):
+        """Keep these agents' health fresh in the background"""
+        for url in urls:
+            entry = self._entry(url)
+            entry.last_requested = time.monotonic()
+            self._registered.add(entry.url)
+
+    def unregister(self, *urls):
+        for url in urls:
+            self._registered.discard(self._key(url))
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            due = []
+            for key in list(self._registered):
+                entry = self._health[key]
+                if now - entry.last_requested > self.registration_ttl:
+                    self._registered.discard(key)
+                elif entry.next_probe_at <= now and key not in self._inflight:
+                    due.append(key)
+            if due:
+                await asyncio.gather(*(self.probe(key) for key in due), return_exceptions=True)
+            await asyncio.sleep(_TICK)
+
+    def start(self):
+        """Start background probing on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "registered": sorted(self._registered),
+            "agents": {key: entry.to_dict() for key, entry in self._health.items()},
+        }
@@ -0,0 +1,109 @@
+"""Async LLM client - non-blocking completions with an in-flight limit and per-request timeouts."""
+
+import asyncio
+import importlib
+import threading
+import time
+
+from .metrics import llm_latency
+from .settings import get_settings, get_settings_manager
+from .usage import add_usage, empty_usage, usage_from_response
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 60.0
+
+
+class LLMClient:
+    """
+    Wraps `litellm.acompletion` so agents never block the event loop.
+
+    At most `max_concurrency` requests are in flight per process; extra
+    callers wait on a semaphore. Each request is bounded by `timeout`
+    seconds and is aborted if the calling task is cancelled.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._stats = {"completed": 0, "timeouts": 0, "errors": 0, "cancelled": 0}
+        # Process-wide token/cost totals across every completed call
+        self._usage = empty_usage()
+
+    async def complete(self, messages: list, model: str, timeout: float | None = None, **params):
+        """Run one completion and return the litellm response object"""
+        response, _ = await self.complete_with_usage(messages, model, timeout, **params)
+        return response
+
+    async def complete_with_usage(self, messages: list, model: str, timeout: float | None = None, **params):
+        """Run one completion and return (response, usage) where usage is a `usage_from_response` dict"""
+        # LiteLLM takes seconds to import, so processes that never call an LLM never load it
+        from litellm import acompletion
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                acompletion(model=model, messages=messages, **params),
+                timeout=timeout or self.timeout,
+            )
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            llm_latency.observe(time.perf_counter() - started, model, "timeout")
+            raise
+        except asyncio.CancelledError:
+            self._stats["cancelled"] += 1
+            raise
+        except Exception:
+            self._stats["errors"] += 1
+            llm_latency.observe(time.perf_counter() - started, model, "error")
+            raise
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+        self._stats["completed"] += 1
+        latency = time.perf_counter() - started
+        llm_latency.observe(latency, model, "ok")
+        usage = usage_from_response(response, model, latency=latency)
+        add_usage(self._usage, usage)
+        return response, usage
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "timeout": self.timeout,
+            "usage": dict(self._usage),
+        }
+
+
+def preload_litellm():
+    """Import LiteLLM in a background thread so a server starts at once and its first LLM call does not stall"""
+    threading.Thread(target=importlib.import_module, args=("litellm",), name="litellm-preload", daemon=True).start()
+
+
+def llm_client_from_env() -> LLMClient:
+    """Build a client from the llm_max_concurrency / llm_timeout settings"""
+    settings = get_settings()
+    return LLMClient(max_concurrency=settings.llm_max_concurrency, timeout=settings.llm_timeout)
+
+
+_llm_client: LLMClient | None = None
+
+
+def get_llm_client() -> LLMClient:
+    """Return the process-wide LLM client, creating it on first use"""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = llm_client_from_env()
+        # The timeout follows settings reloads; the concurrency limit is fixed at startup
+        get_settings_manager().on_reload(lambda settings: setattr(_llm_client, "timeout", settings.llm_timeout))
+    return _llm_client
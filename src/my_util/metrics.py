@@ -0,0 +1,243 @@
+"""Prometheus text-format metrics - counters and histograms for hot paths, gauges read at scrape time."""
+
+import os
+import resource
+import time
+from bisect import bisect_left
+
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; covers sub-millisecond tool calls up to slow LLM completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter per label values.
+    Updates are plain dict arithmetic with no lock: agents update metrics
+    from their event loop thread only.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self._values = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label values (bucket lookup is one bisect)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series = {}
+
+    def observe(self, value: float, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self):
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket", _labels(self.labelnames, labels, le), cumulative
+            yield f"{self.name}_sum", _labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _labels(self.labelnames, labels), count
+
+
+class Gauge:
+    """
+    Value read when scraped: `collect()` returns a number, or a dict of
+    label values -> number. Nothing is updated on the hot path.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, collect, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self.collect = collect
+
+    def samples(self):
+        value = self.collect()
+        if value is None:
+            return
+        if not isinstance(value, dict):
+            value = {(): value}
+        for labels, sample in value.items():
+            if sample is not None:
+                labels = labels if isinstance(labels, tuple) else (labels,)
+                yield self.name, _labels(self.labelnames, labels), sample
+
+
+class MetricsRegistry:
+    """Named metrics of one process, rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None and type(existing) is type(metric) and metric.kind != "gauge":
+            # Counters and histograms are process-wide; registering one again returns the original
+            return existing
+        # Gauges are rebound, so an app rebuilt in the same process reports its own state
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, collect, labels: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, help, collect, labels))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                # A failing gauge must not take the whole scrape down
+                lines.append(f"# {metric.name} unavailable: {type(e).__name__}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "agent_http_requests_total", "HTTP requests served, by method, route and status", ("method", "path", "status")
+)
+_http_in_flight = {"value": 0}
+registry.gauge("agent_http_requests_in_flight", "HTTP requests being served", lambda: _http_in_flight["value"])
+executions = registry.counter("agent_executions_total", "A2A executions finished, by outcome", ("outcome",))
+_executions_in_flight = {"value": 0}
+registry.gauge("agent_executions_in_flight", "A2A executions running", lambda: _executions_in_flight["value"])
+llm_latency = registry.histogram(
+    "llm_call_duration_seconds", "LLM completion latency, by model and outcome", ("model", "outcome")
+)
+a2a_latency = registry.histogram(
+    "a2a_round_trip_seconds", "A2A message round trips to other agents, by outcome", ("outcome",)
+)
+
+_started = time.time()
+registry.gauge("process_start_time_seconds", "Start time of the process (Unix seconds)", lambda: _started)
+
+
+def _resident_memory() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # No procfs: fall back to the peak RSS (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+registry.gauge("process_resident_memory_bytes", "Resident memory of the process", _resident_memory)
+
+
+class track_execution:
+    """Count an A2A execution as in flight for the `with` block and record its outcome"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        _executions_in_flight["value"] += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        _executions_in_flight["value"] -= 1
+        executions.inc("error" if exc_type is not None else "ok")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting HTTP requests by method, route and status.
+    Paths outside `paths` are counted as "other" to keep label cardinality bounded.
+    """
+
+    def __init__(self, app, paths=()):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        _http_in_flight["value"] += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _http_in_flight["value"] -= 1
+            path = scope["path"] if scope["path"] in self.paths else "other"
+            http_requests.inc(scope["method"], path, str(status["code"]))
+
+
+def hit_ratio(stats: dict, hits: str = "hits", misses: str = "misses") -> float | None:
+    """hits / lookups from a stats dict, or None before the first lookup"""
+    lookups = stats.get(hits, 0) + stats.get(misses, 0)
+    return stats.get(hits, 0) / lookups if lookups else None
+
+
+def add_metrics_route(starlette_app):
+    """Serve the registry at /metrics and count every request to the app"""
+    async def metrics_endpoint(request):
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+    starlette_app.routes.append(Route("/metrics", metrics_endpoint, methods=["GET"]))
+    paths = [route.path for route in starlette_app.routes if "{" not in getattr(route, "path", "{")]
+    starlette_app.add_middleware(MetricsMiddleware, paths=paths)
@@ -0,0 +1,265 @@
+"""Typed settings - parsed once from a TOML file, .env and the environment, and reloaded when the files change."""
+
+import os
+import threading
+import time
+import tomllib
+from pathlib import Path
+
+import dotenv
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_SETTINGS_PATH = PROJECT_ROOT / "settings.toml"
+DEFAULT_ENV_PATH = PROJECT_ROOT / ".env"
+# Seconds between checks of the settings files for changes
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+
+def _public_url(value) -> str:
+    """CLOUDRUN_HOST as a base URL: scheme added if missing, no trailing slash"""
+    url = str(value).strip().rstrip("/")
+    return url if url.startswith(("http://", "https://")) else f"https://{url}"
+
+
+# setting -> (environment variable, type, default); TOML files use the setting names
+FIELDS = {
+    "host": ("HOST", str, "localhost"),
+    # Set by the AgentBeats controller; wins over the per-agent default ports
+    "agent_port": ("AGENT_PORT", int, None),
+    "green_port": ("GREEN_AGENT_PORT", int, 9001),
+    "white_port": ("WHITE_AGENT_PORT", int, 9002),
+    "api_host": ("API_HOST", str, "0.0.0.0"),
+    # 5001 avoids the macOS AirPlay receiver on 5000
+    "api_port": ("API_PORT", int, 5001),
+    "public_url": ("CLOUDRUN_HOST", _public_url, None),
+    "white_model": ("WHITE_AGENT_MODEL", str, "openai/gpt-4o"),
+    "judge_model": ("JUDGE_MODEL", str, "openai/gpt-4o-mini"),
+    "llm_timeout": ("LLM_TIMEOUT_SECONDS", float, 60.0),
+    "llm_max_concurrency": ("LLM_MAX_CONCURRENCY", int, 8),
+    "a2a_timeout": ("A2A_TIMEOUT_SECONDS", float, 120.0),
+    "max_steps": ("MAX_STEPS", int, 30),
+    "ehr_api_base": ("EHR_API_BASE", str, "https://api.medical.example.com"),
+}
+# Settings a reload applies to a running process; the others are read when a server starts
+RELOADABLE = ("white_model", "judge_model", "llm_timeout", "max_steps")
+# Model provider prefix -> variable holding its API key
+API_KEY_VARS = {"openai": "OPENAI_API_KEY", "anthropic": "ANTHROPIC_API_KEY", "gemini": "GEMINI_API_KEY"}
+
+
+class Settings:
+    """
+    One read-only snapshot of the configuration.
+    A reload builds a new snapshot, so a caller holding one sees consistent values.
+    `env` holds every variable from the settings files and the environment,
+    which is where API keys are looked up.
+    """
+
+    __slots__ = (*FIELDS, "env", "file_env")
+
+    def __init__(self, values: dict, env: dict, file_env: dict):
+        for name in FIELDS:
+            object.__setattr__(self, name, values[name])
+        object.__setattr__(self, "env", env)
+        object.__setattr__(self, "file_env", file_env)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings are read-only; use configure() or edit the settings files")
+
+    def port_for(self, role: str) -> int:
+        """Port of the "green" or "white" agent"""
+        return self.agent_port or getattr(self, f"{role}_port")
+
+    def agent_url(self, host: str, port: int) -> str:
+        """URL an agent advertises in its card: the public URL if set, else host:port"""
+        return self.public_url or f"http://{host}:{port}"
+
+    def missing_api_key(self, model: str) -> str | None:
+        """Name of the API key variable `model` needs but is not set, if its provider is known"""
+        provider = model.split("/", 1)[0] if "/" in model else "openai"
+        var = API_KEY_VARS.get(provider)
+        return var if var and not self.env.get(var) else None
+
+    def as_dict(self) -> dict:
+        """Setting values plus the names (never the values) of the API keys that are set"""
+        return {
+            **{name: getattr(self, name) for name in FIELDS},
+            "api_keys": sorted(k for k, v in self.env.items() if k.endswith("_API_KEY") and v),
+        }
+
+
+def _read_toml(path: Path) -> dict:
+    if not path.is_file():
+        return {}
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def read_settings_files(settings_path: Path, env_path: Path) -> dict:
+    """Variables set by the TOML file (settings and its [env] table), overridden by the .env file"""
+    data = _read_toml(settings_path)
+    file_env = {str(k): str(v) for k, v in data.get("env", {}).items()}
+    for name, (var, _, _) in FIELDS.items():
+        if name in data:
+            file_env[var] = str(data[name])
+    if env_path.is_file():
+        file_env.update({k: v for k, v in dotenv.dotenv_values(env_path).items() if v is not None})
+    return file_env
+
+
+def load_settings(file_env: dict, environ: dict, overrides: dict | None = None) -> Settings:
+    """Resolve every setting: defaults < settings files < environment < overrides"""
+    env = {**file_env, **environ}
+    values = {}
+    for name, (var, kind, default) in FIELDS.items():
+        raw = env.get(var)
+        try:
+            values[name] = kind(raw) if raw not in (None, "") else default
+        except ValueError:
+            raise ValueError(f"{var}={raw!r} is not a valid {kind.__name__}") from None
+    values.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    return Settings(values, env, file_env)
+
+
+class SettingsManager:
+    """
+    Holds the current settings of the process.
+
+    Files are read at startup and again only when `watch()`'s background
+    thread sees their modification time change, so requests never touch the
+    disk. Variables from the files are exported into `os.environ` at each
+    load, which is where LiteLLM reads API keys and the `*_from_env`
+    builders read their options. Listeners registered with `on_reload` run
+    after each reload; a reload that fails to parse keeps the old settings.
+    """
+
+    def __init__(self, settings_path=None, env_path=None):
+        self.settings_path = Path(settings_path or os.getenv("SETTINGS_PATH") or DEFAULT_SETTINGS_PATH)
+        self.env_path = Path(env_path or os.getenv("ENV_FILE") or DEFAULT_ENV_PATH)
+        self.overrides = {}
+        self._current: Settings | None = None
+        # Environment of the process before any file values were exported
+        self._environ: dict | None = None
+        self._exported = set()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._mtimes = None
+        self._stats = {"loads": 0, "reload_errors": 0, "last_load": None}
+
+    @property
+    def current(self) -> Settings:
+        if self._current is None:
+            self.reload()
+        return self._current
+
+    def configure(self, **overrides) -> Settings:
+        """Pin settings (e.g. from CLI options) above every other source, surviving reloads"""
+        self.overrides.update({k: v for k, v in overrides.items() if v is not None})
+        return self.reload()
+
+    def on_reload(self, listener):
+        """Call `listener(settings)` after every later reload"""
+        self._listeners.append(listener)
+
+    def reload(self) -> Settings:
+        with self._lock:
+            mtimes = self._file_mtimes()
+            file_env = read_settings_files(self.settings_path, self.env_path)
+            if self._environ is None:
+                # A variable equal to its file value was exported by a parent process, so the file stays in charge
+                self._environ = {k: v for k, v in os.environ.items() if file_env.get(k) != v}
+            settings = load_settings(file_env, self._environ, self.overrides)
+            self._export(file_env)
+            first = self._current is None
+            self._current = settings
+            self._mtimes = mtimes
+            self._stats["loads"] += 1
+            self._stats["last_load"] = time.time()
+        if not first:
+            for listener in list(self._listeners):
+                listener(settings)
+        return settings
+
+    def _export(self, file_env: dict):
+        for var in self._exported - file_env.keys():
+            if var not in self._environ:
+                os.environ.pop(var, None)
+        for var, value in file_env.items():
+            if var not in self._environ:
+                os.environ[var] = value
+        self._exported = set(file_env)
+
+    # ------------------------------------------------------------------
+    # Hot reload
+    # ------------------------------------------------------------------
+
+    def _file_mtimes(self) -> tuple:
+        mtimes = []
+        for path in (self.settings_path, self.env_path):
+            try:
+                mtimes.append(path.stat().st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def check(self) -> bool:
+        """Reload if a settings file changed since the last load; True if it did"""
+        if self._file_mtimes() == self._mtimes:
+            return False
+        try:
+            self.reload()
+        except (OSError, ValueError) as e:
+            self._stats["reload_errors"] += 1
+            # Don't retry until the file changes again
+            self._mtimes = self._file_mtimes()
+            print(f"Settings reload failed, keeping the previous settings: {e}")
+            return False
+        print(f"Settings reloaded from {self.settings_path.name} / {self.env_path.name}")
+        return True
+
+    def watch(self, interval: float | None = None):
+        """Start the background thread reloading changed files (once per process; interval <= 0 disables)"""
+        if interval is None:
+            interval = float(os.getenv("SETTINGS_RELOAD_INTERVAL", DEFAULT_RELOAD_INTERVAL))
+        if self._watcher is not None or interval <= 0:
+            return
+        # Load now so the first check compares against the files as they were read
+        self.current
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.check()
+
+        self._watcher = threading.Thread(target=run, name="settings-watcher", daemon=True)
+        self._watcher.start()
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "files": [str(p) for p in (self.settings_path, self.env_path) if p.is_file()],
+            "watching": self._watcher is not None,
+            "overrides": sorted(self.overrides),
+            "settings": self.current.as_dict(),
+        }
+
+
+_manager: SettingsManager | None = None
+
+
+def get_settings_manager() -> SettingsManager:
+    """Return the process-wide settings manager, creating it on first use"""
+    global _manager
+    if _manager is None:
+        _manager = SettingsManager()
+    return _manager
+
+
+def get_settings() -> Settings:
+    """Current settings of the process (loaded on first use, no I/O afterwards)"""
+    return get_settings_manager().current
+
+
+def configure_settings(**overrides) -> Settings:
+    """Pin settings from CLI options above the files and the environment"""
+    return get_settings_manager().configure(**overrides)
@@ -0,0 +1,145 @@
+"""A2A task store persisted in SQLite (WAL) so every worker process can serve every task."""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Task, TaskState
+
+DEFAULT_TASK_TTL = 3600.0
+# Tasks that never reach a final state (e.g. their worker died) are dropped after this long
+DEFAULT_MAX_IDLE = 86400.0
+# Expired tasks are swept at most this often
+SWEEP_INTERVAL = 30.0
+
+FINAL_STATES = frozenset({
+    TaskState.completed, TaskState.canceled, TaskState.failed, TaskState.rejected,
+})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    context_id TEXT,
+    state TEXT,
+    final INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_by_expiry ON tasks(final, updated_at);
+"""
+
+
+def open_shared_db(path) -> sqlite3.Connection:
+    """Open a SQLite database shared by worker processes (WAL, autocommit)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    TaskStore backed by one SQLite file shared by all worker processes.
+    Tasks in a final state are evicted `ttl` seconds after their last update,
+    and unfinished tasks after `max_idle` seconds. Queries run in a thread,
+    so a worker waiting on another's write lock never stalls its event loop.
+    """
+
+    def __init__(self, path, ttl: float = DEFAULT_TASK_TTL, max_idle: float = DEFAULT_MAX_IDLE):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._conn = open_shared_db(self.path)
+        self._conn.executescript(_SCHEMA)
+        self._last_sweep = 0.0
+        self._stats = {"saves": 0, "hits": 0, "misses": 0, "evicted": 0}
+        # (tasks, finished) as of the last sweep, so stats() never scans the table
+        with self._lock:
+            self._count()
+
+    async def save(self, task: Task, context=None) -> None:
+        await asyncio.to_thread(self._save, task)
+
+    async def get(self, task_id: str, context=None) -> Task | None:
+        return await asyncio.to_thread(self._get, task_id)
+
+    async def delete(self, task_id: str, context=None) -> None:
+        await asyncio.to_thread(self._delete, task_id)
+
+    def _save(self, task: Task):
+        state = task.status.state
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tasks (task_id, context_id, state, final, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (task.id, task.context_id, state.value, int(state in FINAL_STATES), now, task.model_dump_json()),
+            )
+            self._stats["saves"] += 1
+            if now - self._last_sweep >= SWEEP_INTERVAL:
+                self._sweep(now)
+
+    def _get(self, task_id: str) -> Task | None:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            self._stats["hits" if row else "misses"] += 1
+        return Task.model_validate_json(row[0]) if row else None
+
+    def _delete(self, task_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def _sweep(self, now: float):
+        """Delete expired tasks; callers hold the lock"""
+        self._last_sweep = now
+        cursor = self._conn.execute(
+            "DELETE FROM tasks WHERE (final = 1 AND updated_at < ?) OR updated_at < ?",
+            (now - self.ttl, now - self.max_idle),
+        )
+        self._stats["evicted"] += cursor.rowcount
+        self._count()
+
+    def _count(self):
+        """Recount the stored tasks; callers hold the lock"""
+        self._counts = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(final), 0) FROM tasks").fetchone()
+
+    def stats(self) -> dict:
+        """Constant-time stats; task counts are as of the last sweep (at most SWEEP_INTERVAL after a save)"""
+        tasks, finished = self._counts
+        return {
+            **self._stats,
+            "backend": "sqlite",
+            "path": str(self.path),
+            "tasks": tasks,
+            "finished": finished,
+            "ttl": self.ttl,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def task_store_from_env():
+    """
+    SQLiteTaskStore at TASK_STORE_PATH (with TASK_STORE_TTL), or a
+    per-process InMemoryTaskStore when the path is unset
+    """
+    path = os.getenv("TASK_STORE_PATH")
+    if not path:
+        return InMemoryTaskStore()
+    return SQLiteTaskStore(path, ttl=float(os.getenv("TASK_STORE_TTL", DEFAULT_TASK_TTL)))
+
+
+def task_store_stats(store) -> dict:
+    """`/status` summary of either task store backend"""
+    if isinstance(store, SQLiteTaskStore):
+        return store.stats()
+    return {"backend": "memory", "tasks": len(getattr(store, "tasks", {}))}
@@ -0,0 +1,237 @@
+"""Span tracing - W3C trace context carried in A2A metadata and an OTLP/JSON lines file exporter."""
+
+import atexit
+import contextlib
+import contextvars
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from pathlib import Path
+
+# A2A message metadata key carrying the W3C trace context
+TRACEPARENT = "traceparent"
+DEFAULT_SERVICE = "medical-agent"
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    One timed operation. Spans opened inside another span's `with` block (in
+    the same task, or in tasks it spawns) become its children. The outermost
+    span in a process is a local root: it collects every descendant that
+    finished, which is what gets exported and summarised.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "error",
+                 "start_ns", "end_ns", "_started", "_root", "finished")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, root, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._started = time.perf_counter_ns()
+        self._root = root or self
+        self.finished = [] if root is None else None
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end (or to now while the span is open)"""
+        end = self.end_ns if self.end_ns is not None else self.start_ns + time.perf_counter_ns() - self._started
+        return (end - self.start_ns) / 1e9
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Stands in for a span outside any trace"""
+
+    __slots__ = ()
+    duration = 0.0
+    traceparent = None
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def parse_traceparent(header) -> tuple | None:
+    """(trace_id, parent span id) from a W3C traceparent header, or None if it is malformed"""
+    match = _TRACEPARENT_RE.match(header.strip().lower()) if isinstance(header, str) else None
+    return match.groups() if match else None
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def current_traceparent() -> str | None:
+    """traceparent of the innermost open span, for propagation to another agent"""
+    span = _current_span.get()
+    return span.traceparent if span is not None else None
+
+
+class JsonlSpanExporter:
+    """
+    Appends each finished local trace to a file as one line of OTLP/JSON
+    (an ExportTraceServiceRequest), the format OpenTelemetry collectors read
+    with their file receiver. Several processes may share one file.
+    """
+
+    def __init__(self, path, service: str = DEFAULT_SERVICE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.service = service
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.exported = 0
+        atexit.register(self.close)
+
+    def export(self, spans: list):
+        line = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": self.service}},
+                {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+            ]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}],
+        }]}, separators=(",", ":"))
+        with self._lock:
+            if self._file.closed:
+                return
+            # One write per trace keeps lines whole when workers share the file
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.exported += len(spans)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class Tracer:
+    """Opens spans and hands each finished local trace to the exporter (if any)"""
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+        self._stats = {"traces": 0, "spans": 0}
+
+    @contextlib.contextmanager
+    def span(self, name: str, traceparent: str | None = None, new_trace: bool = False, **attributes):
+        """
+        Time the `with` block as a span.
+        The parent is the current span; without one (or with `new_trace`) the
+        span continues the remote trace in `traceparent`, else starts a new trace.
+        """
+        parent = None if new_trace else _current_span.get()
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id, parent._root, attributes)
+        else:
+            remote = parse_traceparent(traceparent)
+            trace_id, parent_id = remote if remote else (secrets.token_hex(16), None)
+            span = Span(name, trace_id, parent_id, None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            raise
+        finally:
+            span.end_ns = span.start_ns + time.perf_counter_ns() - span._started
+            _current_span.reset(token)
+            self._finish(span)
+
+    def child(self, name: str, **attributes):
+        """A span under the current one, or a no-op context outside any trace"""
+        if _current_span.get() is None:
+            return contextlib.nullcontext(_NOOP_SPAN)
+        return self.span(name, **attributes)
+
+    def _finish(self, span: Span):
+        self._stats["spans"] += 1
+        if span._root is not span:
+            span._root.finished.append(span)
+            return
+        self._stats["traces"] += 1
+        if self.exporter is not None:
+            self.exporter.export([*span.finished, span])
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "exporter": str(self.exporter.path) if self.exporter is not None else None,
+        }
+
+
+def phase_breakdown(root: Span) -> dict:
+    """span name -> count, total and max milliseconds over a local trace's finished spans"""
+    phases = {}
+    for span in root.finished:
+        seconds = span.duration
+        phase = phases.setdefault(span.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        phase["count"] += 1
+        phase["total_ms"] += seconds * 1000
+        phase["max_ms"] = max(phase["max_ms"], seconds * 1000)
+    for phase in phases.values():
+        phase["total_ms"] = round(phase["total_ms"], 3)
+        phase["max_ms"] = round(phase["max_ms"], 3)
+    return phases
+
+
+def tracer_from_env(service: str | None = None) -> Tracer:
+    """Tracer exporting to TRACE_PATH (JSONL, unset = keep spans in memory only) as OTEL_SERVICE_NAME"""
+    path = os.getenv("TRACE_PATH")
+    service = os.getenv("OTEL_SERVICE_NAME") or service or DEFAULT_SERVICE
+    return Tracer(JsonlSpanExporter(path, service) if path else None)
+
+
+_tracer: Tracer | None = None
+
+
+def get_tracer(service: str | None = None) -> Tracer:
+    """Return the process-wide tracer, creating it on first use"""
+    global _tracer
+    if _tracer is None:
+        _tracer = tracer_from_env(service)
+    return _tracer
@@ -0,0 +1,91 @@
+"""Token and cost ledger - per-call LLM usage aggregated per context and per evaluation."""
+
+USAGE_FIELDS = ("calls", "prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd", "latency")
+
+
+def empty_usage() -> dict:
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cached_tokens": 0,
+        "cost_usd": 0.0,
+        "latency": 0.0,
+    }
+
+
+def _get(obj, name, default=None):
+    """Read a field from a litellm object or a plain dict"""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def usage_from_response(response, model: str, latency: float = 0.0) -> dict:
+    """Extract prompt/completion/cached tokens and cost from a litellm completion response"""
+    usage = _get(response, "usage")
+    details = _get(usage, "prompt_tokens_details")
+    cached_tokens = _get(details, "cached_tokens") or _get(usage, "cache_read_input_tokens") or 0
+    try:
+        from litellm import completion_cost
+        cost = float(completion_cost(completion_response=response, model=model))
+    except Exception:
+        # Unknown model pricing (or a stubbed response): tokens are still recorded
+        cost = 0.0
+    return {
+        "model": model,
+        "calls": 1,
+        "prompt_tokens": int(_get(usage, "prompt_tokens") or 0),
+        "completion_tokens": int(_get(usage, "completion_tokens") or 0),
+        "cached_tokens": int(cached_tokens),
+        "cost_usd": cost,
+        "latency": latency,
+    }
+
+
+def add_usage(total: dict, usage: dict) -> dict:
+    """Add the counters of `usage` into `total` in place and return it"""
+    for field in USAGE_FIELDS:
+        total[field] += usage.get(field, 0)
+    return total
+
+
+def sum_usage(usages) -> dict:
+    total = empty_usage()
+    for usage in usages:
+        add_usage(total, usage)
+    return total
+
+
+class UsageLedger:
+    """
+    Records every LLM call made on behalf of one evaluation.
+    Entries are tagged with a `source` ("white", "judge") and the step they
+    belong to; `to_dict` gives totals, per-source totals and the step list.
+    """
+
+    def __init__(self):
+        self.entries = []
+
+    def record(self, source: str, usage: dict, step: int | None = None):
+        if not usage:
+            return
+        self.entries.append({"source": source, "step": step, **usage})
+
+    def totals(self) -> dict:
+        return sum_usage(self.entries)
+
+    def by_source(self) -> dict:
+        sources = {}
+        for entry in self.entries:
+            add_usage(sources.setdefault(entry["source"], empty_usage()), entry)
+        return sources
+
+    def to_dict(self) -> dict:
+        return {
+            "total": self.totals(),
+            "by_source": self.by_source(),
+            "steps": self.entries,
+        }
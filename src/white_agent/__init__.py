@@ -1,6 +1,12 @@
 """White agent module - the medical task agent being tested."""
 
-from .agent import start_white_agent
-
 __all__ = ["start_white_agent"]
 
+
+def __getattr__(name):
+    # Importing the package (e.g. for a submodule) does not load the agent server stack
+    if name == "start_white_agent":
+        from .agent import start_white_agent
+        return start_white_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
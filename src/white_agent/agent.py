@@ -1,7 +1,7 @@
 """White agent implementation - the medical task agent being tested."""
 
 import uvicorn
-import dotenv
+import asyncio
 from pathlib import Path
 from starlette.responses import JSONResponse
 from starlette.routing import Route
@@ -9,14 +9,19 @@ from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
-from a2a.server.tasks import InMemoryTaskStore
+from a2a.server.tasks import TaskUpdater
 from a2a.types import AgentSkill, AgentCard, AgentCapabilities
 from a2a.utils import new_agent_text_message
-from litellm import completion
+from src.my_util.llm import get_llm_client, preload_litellm
+from src.my_util.completion_cache import MODE_REPLAY, CacheMiss, completion_cache_from_env, make_cache_key
+from src.my_util.task_store import task_store_from_env, task_store_stats
+from src.my_util.settings import get_settings, get_settings_manager
+from src.my_util.metrics import add_metrics_route, hit_ratio, registry as metrics, track_execution
+from src.my_util.tracing import TRACEPARENT, get_tracer
+from src.my_util.usage import empty_usage
+from .context_store import conversation_store_from_env
 
-# Load .env file from project root
 project_root = Path(__file__).parent.parent.parent
-dotenv.load_dotenv(project_root / ".env")
 
 
 def load_system_prompt():
@@ -52,78 +57,94 @@ def prepare_white_agent_card(url):
 class MedicalWhiteAgentExecutor(AgentExecutor):
     """Executor for the medical white agent"""
     
-    def __init__(self):
-        self.ctx_id_to_messages = {}
+    def __init__(self, model=None, completion_cache=None, llm_client=None, conversations=None):
+        # Bounded per-context message histories (LRU/TTL eviction, token budget)
+        self.conversations = conversations if conversations is not None else conversation_store_from_env()
         self.system_prompt = load_system_prompt()
+        # None follows the white_model setting, so a settings reload reroutes the next call
+        self._model = model
+        self.completion_cache = completion_cache or completion_cache_from_env()
+        self.llm = llm_client or get_llm_client()
+        # task_id -> asyncio task running execute(), for cancel()
+        self._running = {}
+    
+    @property
+    def model(self) -> str:
+        return self._model or get_settings().white_model
     
     def reset_context(self, context_id):
         """Reset context for a new assessment"""
-        if context_id in self.ctx_id_to_messages:
-            del self.ctx_id_to_messages[context_id]
+        self.conversations.reset(context_id)
+    
+    async def _store(self, method, *args):
+        """Call a conversation store method, in a thread when the store waits on a shared database"""
+        if self.conversations.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
     
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         """Execute task assigned by green agent"""
+        self._running[context.task_id] = asyncio.current_task()
+        # Join the caller's trace when the message carries one
+        metadata = (context.message.metadata if context.message else None) or {}
+        try:
+            with track_execution(), get_tracer().span(
+                "white.step", traceparent=metadata.get(TRACEPARENT), new_trace=True, context_id=context.context_id
+            ):
+                await self._execute(context, event_queue)
+        finally:
+            self._running.pop(context.task_id, None)
+    
+    async def _execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         user_input = context.get_user_input()
         
-        # Check if this is a reset command
-        if "reset" in user_input.lower() or "ready, set" in user_input.lower():
-            self.reset_context(context.context_id)
+        # Check if this is a reset command (the whole message, not a tool result mentioning it)
+        command = user_input.strip().lower()
+        if command == "reset" or command.startswith("ready, set"):
+            await self._store(self.reset_context, context.context_id)
             await event_queue.enqueue_event(
                 new_agent_text_message("reset", context_id=context.context_id)
             )
             return
         
         # Initialize or retrieve message history for this context
-        if context.context_id not in self.ctx_id_to_messages:
-            self.ctx_id_to_messages[context.context_id] = [
-                {
-                    "role": "system",
-                    "content": self.system_prompt
-                }
-            ]
-        
-        messages = self.ctx_id_to_messages[context.context_id]
-        messages.append(
+        await self._store(self.conversations.get_or_create, context.context_id, self.system_prompt)
+        await self._store(
+            self.conversations.append,
+            context.context_id,
             {
                 "role": "user",
                 "content": user_input,
             }
         )
+        # Compact old turns to the token budget before sending
+        messages = await self._store(self.conversations.prepare, context.context_id)
         
-        # Get response from LLM
+        # Get response from LLM (or the completion cache)
         try:
-            import os
-            # Reload dotenv to ensure API key is loaded
-            dotenv.load_dotenv(project_root / ".env")
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                raise ValueError("OPENAI_API_KEY environment variable is not set. Please check your .env file.")
-            
-            # Ensure API key is in environment for LiteLLM
-            os.environ["OPENAI_API_KEY"] = api_key
-            
-            response = completion(
-                messages=messages,
-                model="openai/gpt-4o",
-                temperature=0.0,
-            )
-            next_message = response.choices[0].message.content.strip()
+            next_message, usage = await self._complete(messages)
             
             # Validate that response follows GET/POST/finish format
             # The system prompt should enforce this, but we can add additional validation
-            messages.append(
+            await self._store(
+                self.conversations.append,
+                context.context_id,
                 {
                     "role": "assistant",
                     "content": next_message,
                 }
             )
             
-            await event_queue.enqueue_event(
-                new_agent_text_message(
-                    next_message, context_id=context.context_id
-                )
-            )
+            # Report this step's token/cost usage (and the context running total) to the caller
+            message = new_agent_text_message(next_message, context_id=context.context_id)
+            message.metadata = {
+                "usage": usage,
+                "context_usage": await self._store(self.conversations.record_usage, context.context_id, usage),
+            }
+            await event_queue.enqueue_event(message)
         except Exception as e:
+            if isinstance(e, CacheMiss):
+                print(f"Completion cache miss in replay mode: {e}")
             # On error, return finish with error indicator
             error_response = f"finish([-1])"
             await event_queue.enqueue_event(
@@ -132,38 +153,76 @@ class MedicalWhiteAgentExecutor(AgentExecutor):
                 )
             )
     
+    async def _complete(self, messages):
+        """Return (next assistant message, usage), serving identical requests from the cache"""
+        # One settings snapshot per call; keys and model routing change only when the settings files do
+        settings = get_settings()
+        model = self._model or settings.white_model
+        params = {"temperature": 0.0}
+        cache_key = make_cache_key(model, messages, **params)
+        cached = self.completion_cache.get(cache_key)
+        if cached is not None:
+            # Cache hits cost nothing; calls stays 0 so totals count real LLM calls only
+            return cached["content"], {**empty_usage(), "model": model, "completion_cache_hit": True}
+        
+        missing_key = settings.missing_api_key(model)
+        if missing_key:
+            raise ValueError(f"{missing_key} environment variable is not set. Please check your .env file.")
+        
+        with get_tracer().child("white.llm", model=model) as span:
+            response, usage = await self.llm.complete_with_usage(messages, model, **params)
+            span.set(prompt_tokens=usage["prompt_tokens"], completion_tokens=usage["completion_tokens"])
+        next_message = response.choices[0].message.content.strip()
+        self.completion_cache.put(cache_key, {"content": next_message, "model": model})
+        return next_message, usage
+    
     async def cancel(self, context, event_queue) -> None:
-        """Cancel execution"""
-        raise NotImplementedError
+        """Cancel execution, aborting any in-flight LLM call for the task"""
+        running = self._running.pop(context.task_id, None)
+        if running is not None and not running.done():
+            running.cancel()
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await updater.cancel()
+
+
+WORKER_STARTUP_TIMEOUT = 60
+DEFAULT_TASK_STORE_PATH = project_root / ".cache" / "white_agent_store.sqlite"
 
 
-def start_white_agent(agent_name="medical_white_agent", host=None, port=None):
-    """Start the white agent server"""
+def build_white_app(agent_name="medical_white_agent", host=None, port=None, cache_mode=None, cache_path=None,
+                    replay=None, model=None):
+    """
+    Build the white agent's Starlette app; `replay` answers from recorded transcripts instead of the LLM.
+    `model` pins the LLM; without it the white_model setting is used and follows reloads.
+    """
     import os
+    settings = get_settings()
     
-    # Use HOST and AGENT_PORT environment variables if set (for AgentBeats controller)
-    # Otherwise use provided defaults or fallback to localhost:9002
-    host = host or os.getenv("HOST", "localhost")
-    port = port or int(os.getenv("AGENT_PORT", "9002"))
-    
-    # Use CLOUDRUN_HOST environment variable if set (for external/public URL)
-    # Otherwise use the local host:port URL
-    public_url = os.getenv("CLOUDRUN_HOST")
-    if public_url:
-        # Remove trailing slash if present
-        public_url = public_url.rstrip("/")
-        # Ensure it starts with http:// or https://
-        if not public_url.startswith(("http://", "https://")):
-            public_url = f"https://{public_url}"
-        url = public_url
-    else:
-        url = f"http://{host}:{port}"
-    
+    # HOST and AGENT_PORT are set by the AgentBeats controller; CLOUDRUN_HOST is the public URL if any
+    host = host or settings.host
+    port = port or settings.port_for("white")
+    url = settings.agent_url(host, port)
     card = prepare_white_agent_card(url)
+    # Pick up edits to settings.toml / .env (API keys, model routing) without a restart
+    get_settings_manager().watch()
+    
+    if replay:
+        from .replay import ReplayWhiteAgentExecutor, load_transcripts
+        executor = ReplayWhiteAgentExecutor(load_transcripts(replay))
+        print(f"Replaying {len(executor.transcripts)} recorded task transcripts from {replay}")
+    else:
+        completion_cache = completion_cache_from_env(mode=cache_mode, path=cache_path)
+        executor = MedicalWhiteAgentExecutor(model=model, completion_cache=completion_cache)
+        if completion_cache.mode != MODE_REPLAY:
+            preload_litellm()
     
+    # In-memory per process, or SQLite shared by all workers when TASK_STORE_PATH is set
+    task_store = task_store_from_env()
+    # Spans export to TRACE_PATH under this agent's service name
+    get_tracer(agent_name)
     request_handler = DefaultRequestHandler(
-        agent_executor=MedicalWhiteAgentExecutor(),
-        task_store=InMemoryTaskStore(),
+        agent_executor=executor,
+        task_store=task_store,
     )
     
     app = A2AStarletteApplication(
@@ -176,15 +235,78 @@ def start_white_agent(agent_name="medical_white_agent", host=None, port=None):
     
     # Add /status endpoint for health checks
     async def status_endpoint(request):
-        return JSONResponse({
+        status = {
             "status": "ok",
             "agent": agent_name,
             "url": url,
-            "version": card.version
-        })
+            "version": card.version,
+            "pid": os.getpid(),
+            "task_store": task_store_stats(task_store),
+            "tracing": get_tracer().stats(),
+            "settings": get_settings_manager().stats(),
+        }
+        if replay:
+            status["replay"] = executor.stats()
+        else:
+            status["model"] = executor.model
+            status["completion_cache"] = completion_cache.stats()
+            status["llm"] = executor.llm.stats()
+            status["contexts"] = executor.conversations.stats()
+        return JSONResponse(status)
     
     # Add the status route to the app
     starlette_app.routes.append(Route("/status", status_endpoint, methods=["GET"]))
     
-    uvicorn.run(starlette_app, host=host, port=port)
+    # Prometheus metrics; these gauges are read only when scraped
+    metrics.gauge("task_store_tasks", "Tasks held by the A2A task store", lambda: task_store_stats(task_store)["tasks"])
+    if not replay:
+        metrics.gauge("white_live_contexts", "Conversations held in memory", lambda: len(executor.conversations))
+        metrics.gauge("white_stored_tokens", "Estimated tokens of the conversations held in memory",
+                      lambda: executor.conversations.stored_tokens)
+        metrics.gauge("llm_requests_in_flight", "LLM calls running or waiting, by state",
+                      lambda: {("running",): executor.llm.stats()["in_flight"],
+                               ("waiting",): executor.llm.stats()["waiting"]}, ("state",))
+        metrics.gauge("cache_hit_ratio", "Hit ratio of each cache since startup",
+                      lambda: {("completion",): hit_ratio(completion_cache.stats())}, ("cache",))
+    add_metrics_route(starlette_app)
+    return starlette_app
 
+
+def create_white_app():
+    """App factory for uvicorn worker processes; options come from the environment"""
+    import os
+    return build_white_app(replay=os.getenv("WHITE_AGENT_REPLAY") or None)
+
+
+def start_white_agent(agent_name="medical_white_agent", host=None, port=None, cache_mode=None, cache_path=None,
+                      replay=None, workers=1, model=None):
+    """Start the white agent server, optionally as `workers` processes sharing one task/conversation store"""
+    import os
+    
+    settings = get_settings()
+    host = host or settings.host
+    port = port or settings.port_for("white")
+    if workers <= 1:
+        app = build_white_app(agent_name, host, port, cache_mode, cache_path, replay, model)
+        uvicorn.run(app, host=host, port=port)
+        return
+    
+    if replay:
+        # Replay position is tracked per process, so a context must stay on one worker
+        raise ValueError("Transcript replay runs in a single worker; drop --workers or --replay")
+    # Worker processes import the app factory, so every option travels through the environment
+    os.environ["HOST"] = host
+    os.environ["AGENT_PORT"] = str(port)
+    if cache_mode:
+        os.environ["LLM_CACHE_MODE"] = cache_mode
+    if cache_path:
+        os.environ["LLM_CACHE_PATH"] = cache_path
+    if model:
+        os.environ["WHITE_AGENT_MODEL"] = model
+    os.environ.setdefault("TASK_STORE_PATH", str(DEFAULT_TASK_STORE_PATH))
+    print(f"Starting {workers} workers sharing {os.environ['TASK_STORE_PATH']}")
+    # Workers build the app (and import LiteLLM) before answering health checks, so allow a slow start
+    uvicorn.run(
+        "src.white_agent.agent:create_white_app", factory=True, host=host, port=port, workers=workers,
+        timeout_worker_healthcheck=WORKER_STARTUP_TIMEOUT,
+    )
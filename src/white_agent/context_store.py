@@ -0,0 +1,450 @@
+"""Conversation store - bounded, token-aware per-context message history for the white agent."""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from src.my_util.task_store import SWEEP_INTERVAL, open_shared_db
+from src.my_util.usage import add_usage, empty_usage
+
+DEFAULT_MAX_CONTEXTS = 1000
+DEFAULT_CONTEXT_TTL = 3600.0
+DEFAULT_MEMORY_TOKENS = 2_000_000
+DEFAULT_HISTORY_TOKENS = 8000
+DEFAULT_KEEP_RECENT = 6
+
+# Old tool results are cut down to this many characters during compaction
+TRUNCATED_TOOL_RESULT_CHARS = 200
+TOOL_RESULT_PREFIX = "Tool call result:"
+# Summary notes list at most this many of the omitted actions
+SUMMARY_MAX_ACTIONS = 10
+# With a stable prefix, compaction goes down to this fraction of the budget
+# so it runs rarely and the compacted front is reused for many turns
+STABLE_PREFIX_COMPACT_TARGET = 0.5
+
+# Per-message overhead (role, separators) in the token estimate
+_MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for budgeting"""
+    return len(text) // 4 + _MESSAGE_OVERHEAD
+
+
+class _Conversation:
+    __slots__ = ("messages", "tokens", "last_access", "omitted_actions", "usage", "version")
+
+    def __init__(self, messages: list):
+        self.messages = messages
+        self.tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        self.last_access = time.monotonic()
+        # First line of every assistant action folded into the summary note
+        self.omitted_actions = []
+        # Token/cost totals of every LLM call made for this context
+        self.usage = empty_usage()
+        # Revision of the shared copy this history was loaded from or saved as
+        self.version = 0
+
+
+class ConversationStore:
+    """
+    LRU/TTL-evicting store of per-context message histories.
+
+    - At most `max_contexts` conversations are kept; the least recently used
+      is evicted first, and conversations idle for `ttl` seconds are dropped.
+    - `memory_tokens` caps the estimated tokens held across all contexts.
+    - `prepare` compacts a history to `history_tokens` before it is sent:
+      the system prompt and task preamble (first two messages) and the last
+      `keep_recent` messages are kept verbatim; older tool results are
+      truncated first, then the oldest turns are folded into a summary note.
+      Compaction rewrites the stored history, so later turns start from the
+      compacted form and the front of the history stays stable.
+    - `stable_prefix` compacts in batches down to half the budget, so the
+      history only changes at its tail between compactions and provider-side
+      prefix caching can hit on the system prompt, preamble and older turns.
+    """
+
+    # Whether calls do blocking I/O and should run off the event loop
+    blocking = False
+
+    def __init__(
+        self,
+        max_contexts: int = DEFAULT_MAX_CONTEXTS,
+        ttl: float = DEFAULT_CONTEXT_TTL,
+        memory_tokens: int = DEFAULT_MEMORY_TOKENS,
+        history_tokens: int = DEFAULT_HISTORY_TOKENS,
+        keep_recent: int = DEFAULT_KEEP_RECENT,
+        stable_prefix: bool = False,
+    ):
+        self.max_contexts = max_contexts
+        self.ttl = ttl
+        self.memory_tokens = memory_tokens
+        self.history_tokens = history_tokens
+        self.keep_recent = keep_recent
+        self.stable_prefix = stable_prefix
+        self._conversations: OrderedDict[str, _Conversation] = OrderedDict()
+        self._total_tokens = 0
+        self._stats = {
+            "evicted_lru": 0,
+            "evicted_ttl": 0,
+            "evicted_memory": 0,
+            "compactions": 0,
+            # Messages and usage reports for contexts evicted or reset while their LLM call was in flight
+            "dropped_messages": 0,
+            "dropped_usage": 0,
+            "turns": 0,
+            "tokens_sent_total": 0,
+            "tokens_sent_last": 0,
+            "tokens_sent_max": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def __contains__(self, context_id) -> bool:
+        return context_id in self._conversations
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    @property
+    def stored_tokens(self) -> int:
+        """Estimated tokens of the conversations held in memory"""
+        return self._total_tokens
+
+    def get_or_create(self, context_id, system_prompt: str) -> list:
+        """Return the history for a context, starting it with the system prompt if new"""
+        self._expire()
+        conversation = self._conversations.get(context_id)
+        if conversation is None:
+            conversation = _Conversation([{"role": "system", "content": system_prompt}])
+            self._conversations[context_id] = conversation
+            self._total_tokens += conversation.tokens
+            self._enforce_limits(keep=context_id)
+        else:
+            self._conversations.move_to_end(context_id)
+        conversation.last_access = time.monotonic()
+        return conversation.messages
+
+    def append(self, context_id, message: dict):
+        conversation = self._conversations.get(context_id)
+        if conversation is None:
+            # Without the rest of the history a lone message is no conversation to resume
+            self._stats["dropped_messages"] += 1
+            print(f"Dropped {message['role']} message for context {context_id}: evicted or reset mid-call")
+            return
+        tokens = estimate_tokens(message["content"])
+        conversation.messages.append(message)
+        conversation.tokens += tokens
+        self._total_tokens += tokens
+        self._enforce_limits(keep=context_id)
+
+    def record_usage(self, context_id, usage: dict) -> dict | None:
+        """Add one call's usage to the context totals and return the new totals"""
+        conversation = self._conversations.get(context_id)
+        if conversation is None:
+            self._stats["dropped_usage"] += 1
+            print(f"Dropped usage for context {context_id}: evicted or reset mid-call")
+            return None
+        return dict(add_usage(conversation.usage, usage))
+
+    def reset(self, context_id):
+        self._drop(context_id)
+
+    def _drop(self, context_id):
+        """Forget a conversation held in this process"""
+        conversation = self._conversations.pop(context_id, None)
+        if conversation is not None:
+            self._total_tokens -= conversation.tokens
+
+    def _expire(self):
+        """Drop conversations idle for longer than the TTL (oldest first)"""
+        if self.ttl is None:
+            return
+        cutoff = time.monotonic() - self.ttl
+        while self._conversations:
+            context_id, conversation = next(iter(self._conversations.items()))
+            if conversation.last_access > cutoff:
+                break
+            self._drop(context_id)
+            self._stats["evicted_ttl"] += 1
+
+    def _enforce_limits(self, keep=None):
+        while len(self._conversations) > self.max_contexts:
+            if not self._evict_oldest(keep, "evicted_lru"):
+                break
+        while self._total_tokens > self.memory_tokens and len(self._conversations) > 1:
+            if not self._evict_oldest(keep, "evicted_memory"):
+                break
+
+    def _evict_oldest(self, keep, counter: str) -> bool:
+        for context_id in self._conversations:
+            if context_id != keep:
+                self._drop(context_id)
+                self._stats[counter] += 1
+                return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def prepare(self, context_id) -> list:
+        """Compact the history to the token budget and return the messages to send"""
+        conversation = self._conversations[context_id]
+        if conversation.tokens > self.history_tokens:
+            self._compact(conversation)
+        self._stats["turns"] += 1
+        self._stats["tokens_sent_total"] += conversation.tokens
+        self._stats["tokens_sent_last"] = conversation.tokens
+        self._stats["tokens_sent_max"] = max(self._stats["tokens_sent_max"], conversation.tokens)
+        return conversation.messages
+
+    def _compact(self, conversation: _Conversation):
+        messages = conversation.messages
+        pinned = 2
+        first_recent = max(pinned, len(messages) - self.keep_recent)
+        before = conversation.tokens
+        target = self.history_tokens
+        if self.stable_prefix:
+            target = int(self.history_tokens * STABLE_PREFIX_COMPACT_TARGET)
+
+        # Pass 1: truncate old tool results in place, oldest first
+        for i in range(pinned, first_recent):
+            if conversation.tokens <= target:
+                break
+            content = messages[i]["content"]
+            if messages[i]["role"] == "user" and content.startswith(TOOL_RESULT_PREFIX) \
+                    and len(content) > TRUNCATED_TOOL_RESULT_CHARS:
+                omitted = len(content) - TRUNCATED_TOOL_RESULT_CHARS
+                truncated = f"{content[:TRUNCATED_TOOL_RESULT_CHARS]}... [truncated {omitted} chars]"
+                conversation.tokens += estimate_tokens(truncated) - estimate_tokens(content)
+                messages[i] = {**messages[i], "content": truncated}
+
+        # Pass 2: fold the oldest middle turns into one summary note
+        if conversation.tokens > target and first_recent > pinned:
+            dropped = []
+            end = pinned
+            tokens = conversation.tokens
+            while end < first_recent and tokens > target:
+                tokens -= estimate_tokens(messages[end]["content"])
+                dropped.append(messages[end])
+                end += 1
+            # An earlier summary note is among the dropped messages, so it is
+            # rebuilt from every omitted action rather than stacked
+            conversation.omitted_actions.extend(
+                (m["content"].splitlines() or [""])[0][:120]
+                for m in dropped
+                if m["role"] == "assistant"
+            )
+            actions = conversation.omitted_actions
+            listed = "; ".join(actions[-SUMMARY_MAX_ACTIONS:]) or "none"
+            if len(actions) > SUMMARY_MAX_ACTIONS:
+                listed = f"...; {listed}"
+            summary = {
+                "role": "user",
+                "content": f"[Earlier steps omitted to save context: {len(actions)} actions ({listed})]",
+            }
+            messages[pinned:end] = [summary]
+            conversation.tokens = sum(estimate_tokens(m["content"]) for m in messages)
+
+        self._total_tokens += conversation.tokens - before
+        self._stats["compactions"] += 1
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        turns = self._stats["turns"]
+        return {
+            **self._stats,
+            "live_contexts": len(self._conversations),
+            "stored_tokens": self._total_tokens,
+            "tokens_sent_mean": self._stats["tokens_sent_total"] / turns if turns else 0.0,
+            "max_contexts": self.max_contexts,
+            "memory_tokens": self.memory_tokens,
+            "history_tokens": self.history_tokens,
+            "stable_prefix": self.stable_prefix,
+        }
+
+
+_SHARED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    context_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    tokens INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS conversations_by_time ON conversations(updated_at);
+"""
+
+
+class SharedConversationStore(ConversationStore):
+    """
+    ConversationStore whose histories live in a SQLite file shared by worker
+    processes, so consecutive turns of one context can be served by different
+    workers. The in-memory dict is only this process's working set: a history
+    is reloaded whenever another worker has saved a newer version, and the
+    TTL, context and memory limits are enforced on the shared table.
+
+    Every call waits on the database, so callers on an event loop run them
+    in a thread (see `blocking`); one re-entrant lock serializes each call's
+    in-memory and database work.
+    """
+
+    blocking = True
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._conn = open_shared_db(self.path)
+        self._conn.executescript(_SHARED_SCHEMA)
+        self._last_sweep = 0.0
+        # Deletions from the shared table (the inherited counters cover this process's working set)
+        self._shared_stats = {"evicted_ttl": 0, "evicted_lru": 0, "evicted_memory": 0}
+        with self._lock:
+            self._count()
+
+    def _load(self, context_id):
+        """The current shared history of a context (None if absent), refreshing the local copy"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, data FROM conversations WHERE context_id = ?", (context_id,)
+            ).fetchone()
+        local = self._conversations.get(context_id)
+        if row is None:
+            # Reset or evicted by another worker
+            self._drop(context_id)
+            return None
+        if local is not None and local.version == row[0]:
+            return local
+        data = json.loads(row[1])
+        conversation = _Conversation(data["messages"])
+        conversation.omitted_actions = data["omitted_actions"]
+        conversation.usage = data["usage"]
+        conversation.version = row[0]
+        self._drop(context_id)
+        self._conversations[context_id] = conversation
+        self._total_tokens += conversation.tokens
+        return conversation
+
+    def _save(self, context_id):
+        conversation = self._conversations.get(context_id)
+        if conversation is None:
+            return
+        conversation.version += 1
+        data = json.dumps({
+            "messages": conversation.messages,
+            "omitted_actions": conversation.omitted_actions,
+            "usage": conversation.usage,
+        })
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO conversations (context_id, version, tokens, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (context_id, conversation.version, conversation.tokens, now, data),
+            )
+            if now - self._last_sweep >= SWEEP_INTERVAL:
+                self._sweep(now)
+
+    def _sweep(self, now: float):
+        """Apply the TTL, context and memory limits to the shared table; callers hold the lock"""
+        self._last_sweep = now
+        if self.ttl is not None:
+            cursor = self._conn.execute("DELETE FROM conversations WHERE updated_at < ?", (now - self.ttl,))
+            self._shared_stats["evicted_ttl"] += cursor.rowcount
+        cursor = self._conn.execute(
+            "DELETE FROM conversations WHERE context_id IN ("
+            "SELECT context_id FROM conversations ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_contexts,),
+        )
+        self._shared_stats["evicted_lru"] += cursor.rowcount
+        # Keep the most recently used histories whose running token total fits the budget
+        # (always at least the newest one)
+        cursor = self._conn.execute(
+            "DELETE FROM conversations WHERE context_id IN ("
+            "SELECT context_id FROM (SELECT context_id, tokens, "
+            "SUM(tokens) OVER (ORDER BY updated_at DESC ROWS UNBOUNDED PRECEDING) AS running "
+            "FROM conversations) WHERE running > ? AND running > tokens)",
+            (self.memory_tokens,),
+        )
+        self._shared_stats["evicted_memory"] += cursor.rowcount
+        self._count()
+
+    def _count(self):
+        """Recount the shared table; callers hold the lock"""
+        self._shared_counts = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM conversations"
+        ).fetchone()
+
+    def get_or_create(self, context_id, system_prompt: str) -> list:
+        with self._lock:
+            existing = self._load(context_id)
+            messages = super().get_or_create(context_id, system_prompt)
+            if existing is None:
+                self._save(context_id)
+            return messages
+
+    def append(self, context_id, message: dict):
+        with self._lock:
+            super().append(context_id, message)
+            self._save(context_id)
+
+    def record_usage(self, context_id, usage: dict) -> dict | None:
+        with self._lock:
+            totals = super().record_usage(context_id, usage)
+            self._save(context_id)
+            return totals
+
+    def reset(self, context_id):
+        with self._lock:
+            super().reset(context_id)
+            self._conn.execute("DELETE FROM conversations WHERE context_id = ?", (context_id,))
+
+    def prepare(self, context_id) -> list:
+        with self._lock:
+            compactions = self._stats["compactions"]
+            messages = super().prepare(context_id)
+            if self._stats["compactions"] != compactions:
+                self._save(context_id)
+            # A copy, since another thread may compact the stored list while the LLM call runs
+            return list(messages)
+
+    def stats(self) -> dict:
+        """Constant-time stats; shared counts are as of the last sweep of the table"""
+        with self._lock:
+            contexts, tokens = self._shared_counts
+            local = super().stats()
+        return {
+            **local,
+            "backend": "sqlite",
+            "shared_contexts": contexts,
+            "shared_tokens": tokens,
+            "shared_evictions": dict(self._shared_stats),
+        }
+
+
+def conversation_store_from_env() -> ConversationStore:
+    """
+    Build a store from the WHITE_AGENT_MAX_CONTEXTS/CONTEXT_TTL/MEMORY_TOKENS/HISTORY_TOKENS/STABLE_PREFIX
+    env vars; with TASK_STORE_PATH set, histories are shared through that SQLite file
+    """
+    options = dict(
+        max_contexts=int(os.getenv("WHITE_AGENT_MAX_CONTEXTS", DEFAULT_MAX_CONTEXTS)),
+        ttl=float(os.getenv("WHITE_AGENT_CONTEXT_TTL", DEFAULT_CONTEXT_TTL)),
+        memory_tokens=int(os.getenv("WHITE_AGENT_MEMORY_TOKENS", DEFAULT_MEMORY_TOKENS)),
+        history_tokens=int(os.getenv("WHITE_AGENT_HISTORY_TOKENS", DEFAULT_HISTORY_TOKENS)),
+        stable_prefix=os.getenv("WHITE_AGENT_STABLE_PREFIX", "").lower() in ("1", "true", "yes"),
+    )
+    path = os.getenv("TASK_STORE_PATH")
+    if path:
+        return SharedConversationStore(path, **options)
+    return ConversationStore(**options)
@@ -0,0 +1,159 @@
+"""Replay white agent - answers from recorded evaluation transcripts instead of calling the LLM."""
+
+import json
+from collections import OrderedDict
+from pathlib import Path
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.utils import new_agent_text_message
+from src.green_agent.tasks import get_task_registry
+from .context_store import DEFAULT_MAX_CONTEXTS
+from .scripted import scripted_response, task_description
+
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+
+def _results_from_json(data) -> list:
+    """Evaluation results from a result dict, a list of results or a suite output"""
+    if isinstance(data, list):
+        return [r for item in data for r in _results_from_json(item)]
+    if not isinstance(data, dict):
+        return []
+    if isinstance(data.get("results"), list):
+        return data["results"]
+    return [data] if "task_id" in data else []
+
+
+def _load_results(path: Path) -> list:
+    """Recorded results in chronological order (oldest first)"""
+    if path.suffix in SQLITE_SUFFIXES:
+        from src.green_agent.results_store import MAX_QUERY_LIMIT, ResultsStore
+
+        store = ResultsStore(path)
+        try:
+            results, offset = [], 0
+            while True:
+                page = store.query(limit=MAX_QUERY_LIMIT, offset=offset, include_transcript=True)
+                results.extend(run["transcript"] for run in page)
+                if len(page) < MAX_QUERY_LIMIT:
+                    break
+                offset += len(page)
+        finally:
+            store.close()
+        # query() is newest first
+        return results[::-1]
+
+    text = path.read_text()
+    if path.suffix == ".jsonl":
+        return [r for line in text.splitlines() if line.strip() for r in _results_from_json(json.loads(line))]
+    return _results_from_json(json.loads(text))
+
+
+def recorded_responses(result: dict) -> list:
+    """The white agent's response at every step of a recorded evaluation"""
+    transcript = result.get("transcript")
+    if isinstance(transcript, dict):
+        return [step["white_text"] for step in transcript.get("steps", [])]
+    # Results recorded before structured transcripts joined the responses with newlines
+    output = result.get("white_agent_output") or ""
+    return output.split("\n") if output else []
+
+
+def load_transcripts(path) -> dict:
+    """
+    Index recorded evaluations by task_id -> list of white agent responses.
+    `path` is a results database, a suite/result JSON file or a JSONL file of
+    results. Each task replays its most recent successful run, or its most
+    recent run if none succeeded.
+    """
+    transcripts, succeeded = {}, {}
+    for result in _load_results(Path(path)):
+        task_id = result.get("task_id")
+        responses = recorded_responses(result)
+        if not task_id or not responses:
+            continue
+        success = bool(result.get("success"))
+        if success or not succeeded.get(task_id):
+            transcripts[task_id] = responses
+            succeeded[task_id] = success
+    return transcripts
+
+
+class _Replay:
+    __slots__ = ("task_id", "responses", "step")
+
+    def __init__(self, task_id, responses):
+        self.task_id = task_id
+        self.responses = responses
+        self.step = 0
+
+
+class ReplayWhiteAgentExecutor(AgentExecutor):
+    """
+    Answers step N of a task with the response recorded at step N.
+    A context is bound to a task by the "Task:" line of its first message;
+    unknown tasks and steps past the end of a recording are answered by the
+    scripted policy, so every evaluation still runs to completion.
+    """
+
+    def __init__(self, transcripts: dict, max_contexts: int = DEFAULT_MAX_CONTEXTS, registry=None):
+        self.transcripts = transcripts
+        self.max_contexts = max_contexts
+        self.registry = registry or get_task_registry()
+        # context_id -> _Replay, least recently used first
+        self._contexts = OrderedDict()
+        self.replayed = 0
+        self.fallbacks = 0
+
+    def reset_context(self, context_id):
+        """Reset context for a new assessment"""
+        self._contexts.pop(context_id, None)
+
+    def _bind(self, context_id, description: str) -> _Replay:
+        task = self.registry.resolve(description)
+        task_id = task["task_id"] if task else None
+        replay = _Replay(task_id, self.transcripts.get(task_id, []))
+        self._contexts[context_id] = replay
+        while len(self._contexts) > self.max_contexts:
+            self._contexts.popitem(last=False)
+        return replay
+
+    def respond(self, context_id, message: str) -> str:
+        """Recorded response for the next step of `context_id`, or the scripted policy's"""
+        description = task_description(message)
+        replay = self._contexts.get(context_id)
+        if description is not None or replay is None:
+            replay = self._bind(context_id, description or message)
+        else:
+            self._contexts.move_to_end(context_id)
+
+        step = replay.step
+        replay.step += 1
+        if step < len(replay.responses):
+            self.replayed += 1
+            return replay.responses[step]
+        self.fallbacks += 1
+        return scripted_response(message)
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        """Execute task assigned by green agent"""
+        user_input = context.get_user_input()
+        command = user_input.strip().lower()
+        if command == "reset" or command.startswith("ready, set"):
+            self.reset_context(context.context_id)
+            response = "reset"
+        else:
+            response = self.respond(context.context_id, user_input)
+        await event_queue.enqueue_event(new_agent_text_message(response, context_id=context.context_id))
+
+    async def cancel(self, context, event_queue) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "tasks": len(self.transcripts),
+            "contexts": len(self._contexts),
+            "replayed": self.replayed,
+            "fallbacks": self.fallbacks,
+        }
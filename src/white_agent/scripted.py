@@ -0,0 +1,104 @@
+"""Scripted white agent - a deterministic, LLM-free stand-in used to benchmark and test the green agent."""
+
+import asyncio
+import json
+import re
+
+import uvicorn
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.utils import new_agent_text_message
+from src.green_agent.ehr import VITALS, find_observation
+from src.my_util.settings import get_settings
+from .agent import prepare_white_agent_card
+
+TOOL_RESULT_PREFIX = "Tool call result:"
+
+_API_BASE_RE = re.compile(r"GET\s+(\S+?)/vitals\.search")
+_MRN_RE = re.compile(r"\bMRN\s+([A-Za-z0-9]+)")
+_TASK_RE = re.compile(r"^Task:\s*(.+)$", re.MULTILINE)
+
+
+def _answer_from_tool_result(text: str) -> str:
+    """finish() with the value of a search result, or a 'not found' answer"""
+    body = text[len(TOOL_RESULT_PREFIX):].strip()
+    try:
+        payload, _ = json.JSONDecoder().raw_decode(body)
+    except ValueError:
+        return 'finish(["unknown"])'
+    data = payload.get("data") if isinstance(payload, dict) else None
+    if isinstance(data, list):
+        data = data[-1] if data else None
+    if isinstance(data, dict) and "value" in data:
+        return json.dumps([f"{data['value']} {data.get('unit', '')}".strip()]).join(("finish(", ")"))
+    return 'finish(["unknown"])'
+
+
+def task_description(message: str) -> str | None:
+    """The "Task: ..." line of a green agent task message, or None for other messages"""
+    task = _TASK_RE.search(message)
+    return task.group(1).strip() if task else None
+
+
+def scripted_response(message: str) -> str:
+    """
+    Deterministic policy: answer a task with one search for the observation it
+    names, then finish() with the value from the tool result
+    """
+    text = message.strip()
+    if text.startswith(TOOL_RESULT_PREFIX):
+        return _answer_from_tool_result(text)
+
+    description = task_description(text) or text
+    observation = find_observation(description)
+    mrn = _MRN_RE.search(description)
+    if observation is None or mrn is None:
+        return 'finish(["unknown"])'
+    base = _API_BASE_RE.search(text)
+    base = base.group(1) if base else get_settings().ehr_api_base
+    kind, name = observation
+    if kind == VITALS:
+        return f"GET {base}/vitals.search?mrn={mrn.group(1)}&name={name}"
+    return f"GET {base}/labs.search?mrn={mrn.group(1)}&test={name}"
+
+
+class ScriptedWhiteAgentExecutor(AgentExecutor):
+    """Answers with `scripted_response`, optionally after `delay` seconds of simulated thinking"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        user_input = context.get_user_input()
+        command = user_input.strip().lower()
+        if command == "reset" or command.startswith("ready, set"):
+            response = "reset"
+        else:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            response = scripted_response(user_input)
+        await event_queue.enqueue_event(new_agent_text_message(response, context_id=context.context_id))
+
+    async def cancel(self, context, event_queue) -> None:
+        pass
+
+
+def build_scripted_white_app(url: str, delay: float = 0.0):
+    """Build the Starlette app of a scripted white agent served at `url`"""
+    app = A2AStarletteApplication(
+        agent_card=prepare_white_agent_card(url),
+        http_handler=DefaultRequestHandler(
+            agent_executor=ScriptedWhiteAgentExecutor(delay),
+            task_store=InMemoryTaskStore(),
+        ),
+    )
+    return app.build()
+
+
+def start_scripted_white_agent(host="localhost", port=9002, delay: float = 0.0):
+    """Start a scripted white agent server"""
+    url = f"http://{host}:{port}"
+    uvicorn.run(build_scripted_white_app(url, delay), host=host, port=port)
@@ -0,0 +1,60 @@
+"""A2A session: pools replaced by new host limits are closed; a missing agent card is a clear error."""
+
+import asyncio
+
+import pytest
+
+from src.my_util.a2a_session import A2ASession
+
+
+def test_new_host_limits_close_open_pools():
+    session = A2ASession()
+
+    async def run():
+        old = session._client_for("http://agent-a:9001/")
+        session.set_host_limits(max_connections_per_host=4)
+        # The close runs as a task on this loop
+        await asyncio.sleep(0)
+        await asyncio.gather(*session._closing)
+        new = session._client_for("http://agent-a:9001/")
+        return old, new
+
+    old, new = asyncio.run(run())
+    assert old.is_closed
+    assert new is not old and not new.is_closed
+    assert session.pool_stats()["pools_closed"] == 1
+
+
+def test_limits_set_outside_a_loop_retire_pools_on_next_use():
+    session = A2ASession()
+
+    async def open_pool():
+        return session._client_for("http://agent-a:9001/")
+
+    loop = asyncio.new_event_loop()
+    try:
+        old = loop.run_until_complete(open_pool())
+        session.set_host_limits(max_keepalive_per_host=2)
+        assert not old.is_closed
+
+        async def reuse():
+            client = session._client_for("http://agent-a:9001/")
+            await asyncio.gather(*session._closing)
+            return client
+
+        new = loop.run_until_complete(reuse())
+    finally:
+        loop.close()
+    assert old.is_closed
+    assert new is not old
+
+
+def test_missing_agent_card_raises_a_clear_error(monkeypatch):
+    session = A2ASession()
+
+    async def no_card(url, refresh=False):
+        return None
+
+    monkeypatch.setattr(session, "get_agent_card", no_card)
+    with pytest.raises(RuntimeError, match="No agent card at http://agent-a:9001"):
+        asyncio.run(session._client_for_agent("http://agent-a:9001"))
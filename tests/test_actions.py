@@ -0,0 +1,59 @@
+"""Action parser: quoted commas in finish lists and invalid POST bodies."""
+
+import pytest
+
+from src.green_agent.actions import parse_action, parse_white_agent_response
+
+
+@pytest.mark.parametrize("text, items", [
+    ('finish(["120/80", "Smith, John"])', ["120/80", "Smith, John"]),
+    ("finish(['Smith, John', 42])", ["Smith, John", 42]),
+    ("finish(['it\\'s, fine', bare])", ["it's, fine", "bare"]),
+    ('finish([1, "a,b", 2.5])', [1, "a,b", 2.5]),
+    ("finish([])", []),
+])
+def test_finish_keeps_quoted_commas_inside_items(text, items):
+    action = parse_action(text)
+    assert action.valid, action.errors
+    assert action.kind == "finish"
+    assert action.items == items
+
+
+def test_post_body_with_commas_in_strings():
+    action = parse_action('POST http://ehr/api/Observation {"note": "stable, afebrile", "code": [1, 2]}')
+    assert action.valid, action.errors
+    assert action.url == "http://ehr/api/Observation"
+    assert action.payload == {"note": "stable, afebrile", "code": [1, 2]}
+
+
+@pytest.mark.parametrize("text", [
+    'POST http://ehr/api {"a": 1,}',
+    "POST http://ehr/api {'a': 1}",
+    'POST http://ehr/api {"a": 1',
+])
+def test_post_invalid_json_body_is_reported(text):
+    action = parse_action(text)
+    assert action.kind == "POST"
+    assert not action.valid
+    assert action.errors[0].message.startswith("invalid JSON body")
+    # The raw body is kept so the caller can show what the agent sent
+    assert action.payload == text.split(" ", 2)[2]
+
+
+def test_post_without_body_is_not_an_action():
+    action = parse_action("POST http://ehr/api")
+    assert action.kind is None
+    assert action.errors[0].message == "POST requires a JSON body after the URL"
+    assert parse_white_agent_response("POST http://ehr/api") == (None, None)
+
+
+def test_post_trailing_text_is_an_error_but_keeps_payload():
+    action = parse_action('POST http://ehr/api {"a": 1} thanks')
+    assert action.payload == {"a": 1}
+    assert [e.message for e in action.errors] == ["unexpected text after POST body"]
+
+
+def test_unterminated_finish_list():
+    action = parse_action("finish(['a', 'b'")
+    assert action.kind is None
+    assert not action.valid
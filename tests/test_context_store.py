@@ -0,0 +1,126 @@
+"""Conversation store: compaction, eviction accounting and the shared SQLite store."""
+
+import pytest
+
+from src.white_agent.context_store import (
+    TOOL_RESULT_PREFIX,
+    ConversationStore,
+    SharedConversationStore,
+    estimate_tokens,
+)
+
+
+def turn(store, context_id, action, result_chars=40):
+    store.append(context_id, {"role": "assistant", "content": action})
+    store.append(context_id, {"role": "user", "content": f"{TOOL_RESULT_PREFIX} " + "x" * result_chars})
+
+
+def start(store, context_id="c1"):
+    store.get_or_create(context_id, "system prompt")
+    store.append(context_id, {"role": "user", "content": "Task: find the latest blood pressure"})
+
+
+def test_stored_tokens_track_appends_and_drops():
+    store = ConversationStore()
+    start(store)
+    turn(store, "c1", "GET http://ehr/vitals.search?mrn=1")
+    messages = store.get_or_create("c1", "ignored")
+    assert store.stored_tokens == sum(estimate_tokens(m["content"]) for m in messages)
+    store.reset("c1")
+    assert store.stored_tokens == 0 and "c1" not in store
+
+
+def test_compaction_truncates_old_tool_results_first():
+    store = ConversationStore(history_tokens=300, keep_recent=2)
+    start(store)
+    for i in range(3):
+        turn(store, "c1", f"GET http://ehr/step{i}", result_chars=400)
+    messages = store.prepare("c1")
+    assert messages[0]["content"] == "system prompt"
+    assert messages[1]["content"].startswith("Task:")
+    assert "[truncated" in messages[3]["content"]
+    # The recent tail is kept verbatim
+    assert messages[-1]["content"] == f"{TOOL_RESULT_PREFIX} " + "x" * 400
+    assert store.stats()["compactions"] == 1
+
+
+def test_compaction_folds_old_turns_into_one_summary():
+    store = ConversationStore(history_tokens=120, keep_recent=2)
+    start(store)
+    for i in range(6):
+        turn(store, "c1", f"GET http://ehr/step{i}")
+    before = len(store.prepare("c1"))
+    turn(store, "c1", "GET http://ehr/step6")
+    messages = store.prepare("c1")
+    summaries = [m for m in messages if m["content"].startswith("[Earlier steps omitted")]
+    # Rebuilt rather than stacked when compaction runs again
+    assert len(summaries) == 1
+    assert "GET http://ehr/step0" in summaries[0]["content"]
+    assert messages[2] is summaries[0]
+    assert len(messages) < before + 2
+    assert messages[-2]["content"] == "GET http://ehr/step6"
+    assert store.stored_tokens == sum(estimate_tokens(m["content"]) for m in messages)
+
+
+def test_lru_eviction_is_counted():
+    store = ConversationStore(max_contexts=2)
+    for context_id in ("a", "b"):
+        start(store, context_id)
+    store.get_or_create("a", "system prompt")
+    start(store, "c")
+    assert "b" not in store and "a" in store and "c" in store
+    assert store.stats()["evicted_lru"] == 1
+
+
+def test_memory_budget_evicts_oldest_but_keeps_the_active_context():
+    store = ConversationStore(memory_tokens=100)
+    start(store, "a")
+    start(store, "b")
+    store.append("b", {"role": "user", "content": "y" * 400})
+    assert "a" not in store and "b" in store
+    assert store.stats()["evicted_memory"] == 1
+
+
+def test_ttl_expiry_is_counted(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.white_agent.context_store.time.monotonic", lambda: clock[0])
+    store = ConversationStore(ttl=60)
+    start(store, "old")
+    clock[0] += 61
+    start(store, "new")
+    assert "old" not in store
+    assert store.stats()["evicted_ttl"] == 1
+
+
+def test_reply_for_an_evicted_context_is_counted_as_dropped():
+    store = ConversationStore(max_contexts=1)
+    start(store, "a")
+    start(store, "b")
+    store.append("a", {"role": "assistant", "content": "GET http://ehr/x"})
+    assert store.record_usage("a", {"calls": 1, "prompt_tokens": 10}) is None
+    stats = store.stats()
+    assert stats["dropped_messages"] == 1 and stats["dropped_usage"] == 1
+
+
+def test_usage_totals_accumulate():
+    store = ConversationStore()
+    start(store)
+    store.record_usage("c1", {"calls": 1, "prompt_tokens": 10, "completion_tokens": 2, "cost_usd": 0.01})
+    totals = store.record_usage("c1", {"calls": 1, "prompt_tokens": 5, "completion_tokens": 1, "cost_usd": 0.02})
+    assert totals["calls"] == 2 and totals["prompt_tokens"] == 15
+    assert totals["cost_usd"] == pytest.approx(0.03)
+
+
+def test_shared_store_hands_contexts_between_workers(tmp_path):
+    path = tmp_path / "contexts.sqlite"
+    first, second = SharedConversationStore(path), SharedConversationStore(path)
+    start(first)
+    turn(first, "c1", "GET http://ehr/step0")
+    # The other worker continues the same context from the shared copy
+    messages = second.get_or_create("c1", "system prompt")
+    assert [m["content"] for m in messages][-2] == "GET http://ehr/step0"
+    second.append("c1", {"role": "assistant", "content": "finish([1])"})
+    assert first.get_or_create("c1", "system prompt")[-1]["content"] == "finish([1])"
+    first.reset("c1")
+    assert second.get_or_create("c1", "fresh prompt") == [{"role": "system", "content": "fresh prompt"}]
+    assert first.blocking and not ConversationStore.blocking
@@ -0,0 +1,109 @@
+"""Simulated EHR: latest and range queries, error responses and copy-on-write views."""
+
+import json
+
+import pytest
+
+from src.green_agent.ehr import build_ehr
+
+API = "https://api.example.com/api"
+MRN = "S1234567"
+
+
+@pytest.fixture(scope="module")
+def ehr():
+    return build_ehr(num_patients=3)
+
+
+def get(view, path):
+    return json.loads(view.handle_get(f"{API}/{path}"))
+
+
+def post(view, payload, path="vital.create"):
+    return json.loads(view.handle_post(f"{API}/{path}", payload))
+
+
+def test_latest_reading_by_alias(ehr):
+    data = get(ehr.view(), f"vitals.search?mrn={MRN}&name=blood%20pressure")["data"]
+    assert data == {"mrn": MRN, "vital_name": "BP", "value": "118/77", "unit": "mmHg",
+                    "timestamp": "2024-01-15T10:30:00Z"}
+    assert get(ehr.view(), f"labs.search?mrn={MRN}&test=hgb")["data"]["value"] == "14.2"
+
+
+def test_latest_of_every_observation(ehr):
+    data = get(ehr.view(), f"labs.search?mrn={MRN}")["data"]
+    assert [r["test_name"] for r in data] == ["glucose", "hemoglobin", "potassium"]
+
+
+def test_range_bounds_are_inclusive(ehr):
+    response = get(ehr.view(), f"vitals.search?mrn={MRN}&name=BP&from=2023-12-20T14:05:00Z&to=2024-01-15")
+    assert [r["value"] for r in response["data"]] == ["121/79"]
+    response = get(ehr.view(), f"vitals.search?mrn={MRN}&name=BP&from=2023-12-20T14:05:00Z")
+    assert response["count"] == 2
+
+
+def test_range_sort_and_count(ehr):
+    response = get(ehr.view(), f"vitals.search?mrn={MRN}&latest=all&_sort=desc&_count=2")
+    assert [r["timestamp"] for r in response["data"]] == ["2024-01-15T10:30:00Z"] * 2
+    response = get(ehr.view(), f"vitals.search?mrn={MRN}&name=HR&latest=false")
+    assert [r["value"] for r in response["data"]] == ["76", "72"]
+
+
+@pytest.mark.parametrize("path, code", [
+    ("vitals.search?name=BP", 400),
+    ("vitals.search?mrn=NOPE", 404),
+    (f"vitals.search?mrn={MRN}&name=colour", 404),
+    (f"vitals.search?mrn={MRN}&name=BP&from=yesterday", 400),
+    (f"patients.search?mrn={MRN}", 404),
+])
+def test_errors(ehr, path, code):
+    response = get(ehr.view(), path)
+    assert response["status"] == "error" and response["code"] == code
+
+
+def test_missing_series_is_not_found(ehr):
+    assert get(ehr.view(), f"labs.search?mrn={MRN}&test=sodium")["status"] == "not_found"
+
+
+def test_posts_are_private_to_their_view(ehr):
+    writer, reader = ehr.view(), ehr.view()
+    response = post(writer, {"mrn": MRN, "name": "BP", "value": "130/85", "timestamp": "2024-02-01T08:00:00Z"})
+    assert response["status"] == "success" and response["data"]["value"] == "130/85"
+    assert get(writer, f"vitals.search?mrn={MRN}&name=BP")["data"]["value"] == "130/85"
+    assert get(reader, f"vitals.search?mrn={MRN}&name=BP")["data"]["value"] == "118/77"
+    assert get(ehr.view(), f"vitals.search?mrn={MRN}&name=BP&latest=all")["count"] == 3
+    assert writer.writes == 1 and reader.writes == 0
+
+
+def test_post_into_a_new_series_and_out_of_order(ehr):
+    view = ehr.view()
+    post(view, {"mrn": MRN, "name": "rr", "value": 18, "timestamp": "2024-01-10T00:00:00Z"})
+    post(view, {"mrn": MRN, "name": "rr", "value": 16, "timestamp": "2024-01-01T00:00:00Z"})
+    data = get(view, f"vitals.search?mrn={MRN}&name=RR&latest=all")["data"]
+    assert [r["value"] for r in data] == ["16", "18"]
+    assert get(ehr.view(), f"vitals.search?mrn={MRN}&name=RR")["status"] == "not_found"
+
+
+@pytest.mark.parametrize("payload, code", [
+    ({"name": "BP", "value": "120/80"}, 400),
+    ({"mrn": MRN, "name": "BP"}, 400),
+    ({"mrn": MRN, "value": "120/80"}, 400),
+    ({"mrn": MRN, "name": "BP", "value": "120"}, 400),
+    ({"mrn": MRN, "name": "HR", "value": "fast"}, 400),
+    ({"mrn": MRN, "name": "HR", "value": 70, "unit": "kg"}, 400),
+    ({"mrn": "NOPE", "name": "HR", "value": 70}, 404),
+    (["not", "an", "object"], 400),
+])
+def test_invalid_posts(ehr, payload, code):
+    view = ehr.view()
+    response = post(view, payload)
+    assert response["status"] == "error" and response["code"] == code
+    assert view.writes == 0
+
+
+def test_synthetic_patients_are_deterministic():
+    first = build_ehr(num_patients=2, seed=7).view()
+    second = build_ehr(num_patients=2, seed=7).view()
+    query = "vitals.search?mrn=P0000001&latest=all"
+    assert get(first, query) == get(second, query)
+    assert get(first, query)["count"] == 6 * 20
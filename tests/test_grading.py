@@ -0,0 +1,100 @@
+"""Answer grading: unit conversion, blood pressure components and tolerances."""
+
+import pytest
+
+from src.green_agent.grading import convert, grade_task
+
+
+def task(expected, **fields):
+    return {"task_id": "t1", "description": "Test task", "expected_answer": expected, **fields}
+
+
+@pytest.mark.parametrize("expected, answer", [
+    ("100 mg/dL", "1 g/L"),
+    ("120 mmHg", "16 kPa"),
+    ("37 C", "98.6 F"),
+    ("70 kg", "154.3 lb"),
+    ("72 bpm", "72 beats per minute"),
+])
+def test_answer_in_another_unit_is_converted(expected, answer):
+    assert grade_task(task([expected]), [answer]).success
+
+
+def test_mass_to_substance_concentration_needs_the_analyte():
+    assert grade_task(task(["100 mg/dL"], analyte="glucose"), ["5.55 mmol/L"]).success
+    assert not grade_task(task(["100 mg/dL"]), ["5.55 mmol/L"]).success
+
+
+def test_incompatible_units_do_not_convert():
+    assert convert((5.0,), "mmHg", "kg") is None
+    assert not grade_task(task(["120 mmHg"]), ["120 kg"]).success
+
+
+@pytest.mark.parametrize("answer, success", [
+    ("BP 120/80", True),
+    ("120 / 80 mmHg", True),
+    ("16/10.7 kPa", True),
+    ("120/85 mmHg", False),
+    ("125/80 mmHg", False),
+    # One component is not a blood pressure
+    ("120 mmHg", False),
+])
+def test_blood_pressure_compares_both_components(answer, success):
+    assert grade_task(task(["120/80 mmHg"]), [answer]).success is success
+
+
+def test_expected_string_is_not_split_into_characters():
+    # A single string from a TOML task is one accepted answer
+    assert grade_task(task("120/80"), ["120/80"]).success
+
+
+@pytest.mark.parametrize("expected, answer, success", [
+    # Default: half a unit in the last decimal place of the more precise of the two
+    ("14", "14.2", False),
+    ("14", "14.0", True),
+    ("14", "14.6", False),
+    ("14.0", "14.2", False),
+    ("14.2", "14", False),
+    ("14.20", "14.2", True),
+    ("37.0 C", "99 F", False),
+])
+def test_default_tolerance_follows_both_precisions(expected, answer, success):
+    assert grade_task(task([expected]), [answer]).success is success
+
+
+@pytest.mark.parametrize("tolerance, answer, success", [
+    (0.3, "5.25", True),
+    (0.3, "5.4", False),
+    ({"abs": 0.5}, "5.5", True),
+    ({"rel": 0.05}, "5.2", True),
+    ({"rel": 0.05}, "5.3", False),
+])
+def test_task_tolerance(tolerance, answer, success):
+    assert grade_task(task(["5.0"], tolerance=tolerance), [answer]).success is success
+
+
+@pytest.mark.parametrize("answer", [
+    "The hemoglobin is 14.2.",
+    "The hemoglobin is 14.2 g/dL.",
+    "Hemoglobin: 14.2. Repeat in a week.",
+])
+def test_value_ending_a_sentence(answer):
+    assert grade_task(task(["14.2 g/dL"]), [answer]).success
+
+
+def test_version_like_numbers_are_not_values():
+    assert not grade_task(task(["14.2"]), ["build 14.2.1"]).success
+
+
+def test_dates_and_times_are_not_values():
+    assert grade_task(task(["72 bpm"]), ["measured 2024-01-05 10:30: 72 /min"]).success
+
+
+def test_first_comparable_value_is_the_answer():
+    assert not grade_task(task(["72"]), ["60, 72"]).success
+
+
+def test_text_answers_match_tokens():
+    grade = grade_task(task(["Penicillin"]), ["Allergic to penicillin."])
+    assert grade.success and grade.reason == "text match"
+    assert not grade_task(task(["Penicillin"]), ["No known allergies"]).success
@@ -0,0 +1,163 @@
+"""Health monitor: caching, coalesced probes, card fallback and entry eviction."""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.my_util import health
+from src.my_util.health import HealthMonitor, backoff_delay
+
+URL = "http://white:9002"
+
+
+class FakeSession:
+    """Answers /status from `statuses` (an exception instance is raised) and the card from `cards`"""
+
+    def __init__(self, statuses=None, cards=None, gate=None):
+        self.statuses = statuses or {}
+        self.cards = cards or {}
+        self.gate = gate
+        self.status_calls = []
+
+    async def get_status(self, url, timeout):
+        self.status_calls.append(url)
+        if self.gate is not None:
+            await self.gate.wait()
+        status = self.statuses.get(url, {"agent": "white", "version": "1.0"})
+        if isinstance(status, Exception):
+            raise status
+        return status
+
+    async def get_agent_card(self, url, refresh=True):
+        return self.cards.get(url)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(health.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_check_reports_status_and_serves_the_cache_within_max_age(clock):
+    session = FakeSession()
+    monitor = HealthMonitor(session, max_age=2.0)
+
+    async def scenario():
+        first = await monitor.check(URL + "/")
+        clock[0] += 1
+        second = await monitor.check(URL)
+        clock[0] += 2
+        await monitor.check(URL)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first["ready"] and first["source"] == "status" and first["agent"] == "white"
+    assert second["ready"]
+    assert len(session.status_calls) == 2
+    assert monitor.stats()["cache_hits"] == 1
+
+
+def test_concurrent_checks_share_one_probe():
+    async def scenario():
+        session = FakeSession(gate=asyncio.Event())
+        monitor = HealthMonitor(session)
+        checks = asyncio.gather(*(monitor.check(URL) for _ in range(5)))
+        await asyncio.sleep(0)
+        session.gate.set()
+        return session, monitor, await checks
+
+    session, monitor, results = asyncio.run(scenario())
+    assert all(result["ready"] for result in results)
+    assert len(session.status_calls) == 1
+    assert monitor.stats()["coalesced"] == 4
+
+
+def test_missing_status_falls_back_to_the_agent_card():
+    session = FakeSession(
+        statuses={URL: ValueError("not json")},
+        cards={URL: SimpleNamespace(name="white agent", version="0.2")},
+    )
+    result = asyncio.run(HealthMonitor(session).check(URL))
+    assert result["ready"] and result["source"] == "card"
+    assert (result["agent"], result["version"]) == ("white agent", "0.2")
+
+
+def test_unreachable_agent_counts_failures():
+    request = httpx.Request("GET", URL)
+    session = FakeSession(statuses={URL: httpx.ConnectError("refused", request=request)})
+    monitor = HealthMonitor(session)
+
+    async def scenario():
+        await monitor.probe(URL)
+        return (await monitor.probe(URL)).to_dict()
+
+    result = asyncio.run(scenario())
+    assert not result["ready"] and result["failures"] == 2
+    assert result["error"].startswith("ConnectError")
+    assert monitor.stats()["probe_failures"] == 2
+
+
+def test_card_fallback_without_a_card_is_a_failure():
+    session = FakeSession(statuses={URL: ValueError("not json")})
+    result = asyncio.run(HealthMonitor(session).check(URL))
+    assert not result["ready"]
+    assert "agent card not available" in result["error"]
+
+
+@pytest.mark.parametrize("failures", [0, 1, 3, 10, 50])
+def test_backoff_delay_stays_within_jitter_bounds(failures):
+    delay = min(10.0, 0.1 * 2 ** failures)
+    for _ in range(20):
+        assert delay / 2 <= backoff_delay(failures, base=0.1, cap=10.0) <= delay
+
+
+def test_entries_beyond_max_entries_evict_least_recently_checked():
+    monitor = HealthMonitor(FakeSession(), max_entries=2)
+
+    async def scenario():
+        for url in ("http://a", "http://b"):
+            await monitor.check(url)
+        await monitor.check("http://a")
+        await monitor.check("http://c")
+
+    asyncio.run(scenario())
+    stats = monitor.stats()
+    assert sorted(stats["agents"]) == ["http://a", "http://c"]
+    assert stats["evicted"] == 1
+
+
+def test_expired_entries_are_dropped_but_registered_ones_are_kept(clock):
+    monitor = HealthMonitor(FakeSession(), entry_ttl=60)
+
+    async def scenario():
+        monitor.register("http://registered")
+        await monitor.check("http://old")
+        clock[0] += 61
+        await monitor.check("http://new")
+
+    asyncio.run(scenario())
+    stats = monitor.stats()
+    assert sorted(stats["agents"]) == ["http://new", "http://registered"]
+    assert stats["registered"] == ["http://registered"]
+    assert stats["evicted"] == 1
+
+
+def test_background_loop_probes_registered_agents():
+    async def scenario():
+        session = FakeSession()
+        monitor = HealthMonitor(session, interval=60)
+        monitor.register(URL)
+        monitor.start()
+        for _ in range(50):
+            if session.status_calls:
+                break
+            await asyncio.sleep(0.01)
+        await monitor.stop()
+        return session, monitor
+
+    session, monitor = asyncio.run(scenario())
+    assert session.status_calls == [URL]
+    assert monitor.stats()["agents"][URL]["ready"]
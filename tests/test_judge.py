@@ -0,0 +1,118 @@
+"""LLM judge: batched verdict parsing, per-item fallback and single-answer verdicts."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.green_agent.judge import JudgeService
+from src.my_util.completion_cache import CompletionCache
+
+
+class FakeLLM:
+    """Answers each call with the next scripted reply and records the prompts"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+        # Set to an asyncio.Event to hold calls until it is set
+        self.gate = None
+
+    async def complete_with_usage(self, messages, model, **params):
+        self.prompts.append(messages[0]["content"])
+        if self.gate is not None:
+            await self.gate.wait()
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        message = SimpleNamespace(content=reply)
+        usage = {"calls": 1, "prompt_tokens": 30, "completion_tokens": 6, "cost_usd": 0.003}
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)]), usage
+
+
+@pytest.fixture
+def make_judge(tmp_path, monkeypatch):
+    monkeypatch.setattr(JudgeService, "_missing_credentials", lambda self: [])
+
+    def make(*replies, batch_size=3):
+        llm = FakeLLM(*replies)
+        cache = CompletionCache(tmp_path / "verdicts.sqlite")
+        return JudgeService(model="openai/test", cache=cache, llm_client=llm,
+                            batch_size=batch_size, batch_window=0.01), llm
+    return make
+
+
+def judge_all(judge, answers):
+    async def run():
+        return await asyncio.gather(*(judge.judge(f"Task {i}", a) for i, a in enumerate(answers)))
+    return [correct for correct, _ in asyncio.run(run())]
+
+
+def test_batch_reply_is_parsed_per_item(make_judge):
+    judge, llm = make_judge("1. CORRECT\n2) INCORRECT\n3: correct")
+    assert judge_all(judge, ["120/80", "none", "5.4 mmol/L"]) == [True, False, True]
+    assert len(llm.prompts) == 1
+    assert judge.stats()["batches"] == 1
+    assert judge.stats()["fallbacks"] == 0
+
+
+def test_batch_usage_is_shared_and_the_call_counted_once(make_judge):
+    judge, _ = make_judge("1. CORRECT\n2. CORRECT", batch_size=2)
+
+    async def run():
+        return await asyncio.gather(judge.judge("Task a", "x1"), judge.judge("Task b", "x2"))
+    (_, first), (_, second) = asyncio.run(run())
+    assert first["calls"] == 1 and second["calls"] == 0
+    assert first["prompt_tokens"] == second["prompt_tokens"] == 15
+    assert first["cost_usd"] + second["cost_usd"] == pytest.approx(0.003)
+
+
+def test_items_missing_from_batch_reply_fall_back_to_single_calls(make_judge):
+    judge, llm = make_judge("1. INCORRECT\n3. CORRECT", "CORRECT")
+    assert judge_all(judge, ["a1", "a2", "a3"]) == [False, True, True]
+    assert len(llm.prompts) == 2
+    assert "Answer: a2" in llm.prompts[1]
+    assert judge.stats()["fallbacks"] == 1
+
+
+@pytest.mark.parametrize("reply, correct", [
+    ("CORRECT", True),
+    ("correct.", True),
+    # INCORRECT contains CORRECT and must not count as a pass
+    ("INCORRECT", False),
+    ("Incorrect", False),
+    ("The answer is incorrect, not correct", False),
+    ("I cannot tell", False),
+])
+def test_single_verdict(make_judge, reply, correct):
+    judge, _ = make_judge(reply)
+    assert judge_all(judge, ["some answer"]) == [correct]
+
+
+def test_verdicts_are_cached_but_failures_are_not(make_judge):
+    judge, llm = make_judge(RuntimeError("provider down"), "CORRECT")
+    assert judge_all(judge, ["answer"]) == [False]
+    assert judge.stats()["errors"] == 1
+    # The failed call left nothing cached, so the judge asks again
+    assert judge_all(judge, ["answer"]) == [True]
+    assert judge_all(judge, ["  ANSWER "]) == [True]
+    assert len(llm.prompts) == 2
+    assert judge.stats()["cache_hits"] == 1
+
+
+def test_running_batches_are_referenced_until_done(make_judge):
+    judge, llm = make_judge("1. CORRECT\n2. CORRECT\n3. CORRECT")
+
+    async def run():
+        llm.gate = asyncio.Event()
+        judgements = asyncio.gather(*(judge.judge(f"Task {i}", f"a{i}") for i in range(3)))
+        # Cache lookups run in threads, so wait for the batch to reach the LLM
+        while not llm.prompts:
+            await asyncio.sleep(0.001)
+        running = len(judge._batches)
+        llm.gate.set()
+        await judgements
+        return running
+
+    assert asyncio.run(run()) == 1
+    assert not judge._batches
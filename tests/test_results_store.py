@@ -0,0 +1,71 @@
+"""Results store: leaderboards agree with and without filters, including runs missing time or cost."""
+
+import sqlite3
+
+import pytest
+
+from src.green_agent.results_store import ResultsStore
+
+FIELDS = ("runs", "successes", "mean_steps", "mean_time_used", "total_cost_usd")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(tmp_path / "results.sqlite")
+    yield store
+    store.close()
+
+
+def record(store, model, **result):
+    store.record({"task_id": "t1", **result}, "http://white", model=model)
+
+
+def board(store, **filters):
+    return {row["model"]: {k: row[k] for k in FIELDS} for row in store.leaderboard("model", **filters)}
+
+
+def test_missing_values_are_skipped_like_sql_avg(store):
+    record(store, "a", success=True, steps=2, time_used=1.0, usage={"total": {"cost_usd": 0.25}})
+    record(store, "a", success=False, steps=4)
+    record(store, "b", success=False)
+    unfiltered = board(store)
+    assert unfiltered == board(store, agent_url="http://white")
+    assert unfiltered["a"] == {"runs": 2, "successes": 1, "mean_steps": 3.0,
+                               "mean_time_used": 1.0, "total_cost_usd": 0.25}
+    assert unfiltered["b"]["mean_time_used"] is None
+    assert unfiltered["b"]["total_cost_usd"] is None
+
+
+def test_old_rollups_table_is_rebuilt(tmp_path):
+    path = tmp_path / "results.sqlite"
+    store = ResultsStore(path)
+    record(store, "a", success=True, steps=3, time_used=2.0)
+    record(store, "a", success=False)
+    store.close()
+    with sqlite3.connect(path) as conn:
+        conn.execute("DROP TABLE rollups")
+        conn.execute(
+            "CREATE TABLE rollups (dimension TEXT, key TEXT, runs INTEGER, successes INTEGER, "
+            "steps_sum REAL, time_sum REAL, cost_sum REAL, last_run_at REAL, PRIMARY KEY (dimension, key))"
+        )
+    store = ResultsStore(path)
+    try:
+        assert board(store)["a"] == {"runs": 2, "successes": 1, "mean_steps": 3.0,
+                                     "mean_time_used": 2.0, "total_cost_usd": None}
+        assert board(store) == board(store, agent_url="http://white")
+    finally:
+        store.close()
+
+
+def test_stored_runs_counts_without_scanning_runs(store, tmp_path):
+    record(store, "a", success=True)
+    assert store.stored_runs() == 1
+    record(store, "a", success=False)
+    assert store.stored_runs() == 2
+    # Another worker's inserts show up once the total is re-read
+    other = ResultsStore(tmp_path / "results.sqlite")
+    record(other, "b", success=True)
+    other.close()
+    assert store.stored_runs() == 2
+    store._counted_at = None
+    assert store.stored_runs() == 3
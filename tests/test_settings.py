@@ -0,0 +1,126 @@
+"""Settings: source precedence, export to the environment and hot reload."""
+
+import os
+
+import pytest
+
+from src.my_util.settings import SettingsManager, load_settings, read_settings_files
+
+
+@pytest.fixture
+def environ(monkeypatch):
+    """A clean process environment, restored after the test"""
+    env = {"PATH": os.environ.get("PATH", "")}
+    monkeypatch.setattr(os, "environ", env)
+    return env
+
+
+@pytest.fixture
+def files(tmp_path):
+    settings_path, env_path = tmp_path / "settings.toml", tmp_path / ".env"
+    settings_path.write_text('max_steps = 12\nwhite_model = "openai/gpt-4o-mini"\n\n[env]\nEXTRA = "toml"\n')
+    env_path.write_text("EXTRA=dotenv\nOPENAI_API_KEY=sk-test\n")
+    return settings_path, env_path
+
+
+def touch(path, text):
+    """Rewrite a file and move its mtime forward so a check sees the change"""
+    before = path.stat().st_mtime_ns
+    path.write_text(text)
+    os.utime(path, ns=(before + 10**9, before + 10**9))
+
+
+def test_defaults_apply_without_any_source():
+    settings = load_settings({}, {})
+    assert settings.max_steps == 30
+    assert settings.white_model == "openai/gpt-4o"
+    assert settings.public_url is None
+
+
+def test_precedence_is_files_then_environment_then_overrides(files):
+    file_env = read_settings_files(*files)
+    assert file_env["EXTRA"] == "dotenv"
+    assert file_env["MAX_STEPS"] == "12"
+    settings = load_settings(file_env, {"MAX_STEPS": "20", "LLM_TIMEOUT_SECONDS": "5"}, {"llm_timeout": 9.0})
+    assert settings.max_steps == 20
+    assert settings.llm_timeout == 9.0
+    assert settings.white_model == "openai/gpt-4o-mini"
+
+
+def test_invalid_value_names_the_variable():
+    with pytest.raises(ValueError, match="MAX_STEPS='many' is not a valid int"):
+        load_settings({"MAX_STEPS": "many"}, {})
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("example.run.app", "https://example.run.app"),
+    ("http://localhost:8080/", "http://localhost:8080"),
+])
+def test_public_url_is_normalised(value, expected):
+    settings = load_settings({}, {"CLOUDRUN_HOST": value})
+    assert settings.public_url == expected
+    assert settings.agent_url("localhost", 9001) == expected
+
+
+def test_settings_are_read_only():
+    settings = load_settings({}, {})
+    with pytest.raises(AttributeError):
+        settings.max_steps = 5
+
+
+def test_missing_api_key_follows_the_model_provider():
+    settings = load_settings({"OPENAI_API_KEY": "sk-test"}, {})
+    assert settings.missing_api_key("openai/gpt-4o") is None
+    assert settings.missing_api_key("gpt-4o") is None
+    assert settings.missing_api_key("anthropic/claude") == "ANTHROPIC_API_KEY"
+    assert settings.missing_api_key("ollama/llama3") is None
+    assert settings.as_dict()["api_keys"] == ["OPENAI_API_KEY"]
+
+
+def test_file_values_are_exported_unless_the_environment_sets_them(environ, files):
+    environ["EXTRA"] = "process"
+    manager = SettingsManager(*files)
+    assert manager.current.max_steps == 12
+    assert environ["OPENAI_API_KEY"] == "sk-test"
+    assert environ["EXTRA"] == "process"
+
+    touch(files[1], "EXTRA=dotenv\n")
+    assert manager.check()
+    # Dropped from the file, so withdrawn from the environment; the process's own value stays
+    assert "OPENAI_API_KEY" not in environ
+    assert environ["EXTRA"] == "process"
+
+
+def test_check_reloads_changed_files_and_notifies_listeners(environ, files):
+    manager = SettingsManager(*files)
+    seen = []
+    manager.on_reload(seen.append)
+    manager.current
+    assert not manager.check()
+
+    touch(files[0], "max_steps = 15\n")
+    assert manager.check()
+    assert manager.current.max_steps == 15
+    assert [s.max_steps for s in seen] == [15]
+    assert manager.stats()["loads"] == 2
+
+
+def test_failed_reload_keeps_the_previous_settings(environ, files):
+    manager = SettingsManager(*files)
+    before = manager.current
+    touch(files[0], "max_steps = 'lots'\n")
+    assert not manager.check()
+    assert manager.current is before
+    assert manager.stats()["reload_errors"] == 1
+    # Not retried until the file changes again
+    assert not manager.check()
+    assert manager.stats()["reload_errors"] == 1
+
+
+def test_overrides_survive_reloads(environ, files):
+    manager = SettingsManager(*files)
+    manager.configure(max_steps=3, white_model=None)
+    touch(files[0], "max_steps = 15\n")
+    assert manager.check()
+    assert manager.current.max_steps == 3
+    assert manager.stats()["overrides"] == ["max_steps"]
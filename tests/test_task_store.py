@@ -0,0 +1,57 @@
+"""SQLite task store: round trips and queries kept off the event loop thread."""
+
+import asyncio
+import threading
+
+from a2a.types import Task, TaskState, TaskStatus
+
+from src.my_util.task_store import SQLiteTaskStore
+
+
+def make_task(task_id, state=TaskState.working):
+    return Task(id=task_id, context_id="ctx", status=TaskStatus(state=state))
+
+
+def test_save_get_delete(tmp_path):
+    store = SQLiteTaskStore(tmp_path / "tasks.sqlite")
+
+    async def run():
+        await store.save(make_task("t1"))
+        saved = await store.get("t1")
+        await store.delete("t1")
+        return saved, await store.get("t1")
+
+    saved, deleted = asyncio.run(run())
+    assert saved.id == "t1" and saved.status.state == TaskState.working
+    assert deleted is None
+    assert store.stats()["hits"] == 1 and store.stats()["misses"] == 1
+    store.close()
+
+
+def test_queries_run_off_the_event_loop(tmp_path, monkeypatch):
+    store = SQLiteTaskStore(tmp_path / "tasks.sqlite")
+    threads = []
+    save = store._save
+    monkeypatch.setattr(store, "_save", lambda task: (threads.append(threading.get_ident()), save(task)))
+
+    async def run():
+        await store.save(make_task("t1"))
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert threads and threads[0] != loop_thread
+    store.close()
+
+
+def test_stats_counts_come_from_the_last_sweep(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.my_util.task_store.SWEEP_INTERVAL", 0.0)
+    store = SQLiteTaskStore(tmp_path / "tasks.sqlite")
+
+    async def run():
+        await store.save(make_task("t1"))
+        await store.save(make_task("t2", TaskState.completed))
+
+    asyncio.run(run())
+    assert store.stats()["tasks"] == 2
+    assert store.stats()["finished"] == 1
+    store.close()
@@ -0,0 +1,90 @@
+"""Task registry: loading, expected_answer normalization and free-text resolution."""
+
+import pytest
+
+from src.green_agent.tasks import TaskRegistry, load_task_registry
+
+TASKS = [
+    {"task_id": "bp", "category": "vitals", "description": "What is the patient's latest blood pressure?",
+     "expected_answer": ["120/80 mmHg"], "keywords": ["blood pressure", "bp"]},
+    {"task_id": "hr", "category": "vitals", "description": "What is the patient's heart rate?",
+     "keywords": ["heart rate", "pulse"]},
+    {"task_id": "bp_trend", "category": "vitals", "description": "How has the patient's blood pressure changed?",
+     "keywords": ["blood pressure", "trend"]},
+    {"task_id": "hgb", "category": "labs", "description": "Find the most recent hemoglobin",
+     "expected_answer": "14.2 g/dL"},
+]
+
+
+@pytest.fixture
+def registry():
+    return TaskRegistry([dict(task) for task in TASKS])
+
+
+def test_exact_match_ignores_case_and_punctuation(registry):
+    assert registry.resolve("what is the PATIENT'S latest blood-pressure")["task_id"] == "bp"
+
+
+def test_task_description_contained_in_the_query(registry):
+    query = "Please answer: find the most recent hemoglobin, in g/dL."
+    assert registry.resolve(query)["task_id"] == "hgb"
+
+
+def test_query_contained_in_a_task_description(registry):
+    assert registry.resolve("patient's heart rate")["task_id"] == "hr"
+
+
+def test_containment_ties_go_to_the_first_task(registry):
+    # Both blood pressure tasks contain "the patient's"
+    assert registry.resolve("the patient's")["task_id"] == "bp"
+
+
+def test_keyword_match(registry):
+    assert registry.resolve("check the pulse please")["task_id"] == "hr"
+    # Two keywords beat one
+    assert registry.resolve("blood pressure trend over a year")["task_id"] == "bp_trend"
+
+
+def test_keyword_tie_is_ambiguous(registry):
+    assert registry.resolve("tell me about blood pressure readings") is None
+
+
+def test_no_match(registry):
+    assert registry.resolve("unrelated request about billing") is None
+    assert registry.resolve("?!") is None
+
+
+@pytest.mark.parametrize("value, normalized", [
+    ("120/80", ["120/80"]),
+    (5.5, ["5.5"]),
+    (["a", 1], ["a", "1"]),
+    (None, None),
+    ("", None),
+])
+def test_expected_answer_is_a_list_of_strings(value, normalized):
+    registry = TaskRegistry([{"task_id": "t", "description": "x", "expected_answer": value}])
+    assert registry.get("t")["expected_answer"] == normalized
+
+
+@pytest.mark.parametrize("value", [{"a": 1}, True, [["nested"]]])
+def test_other_expected_answers_are_rejected(value):
+    with pytest.raises(ValueError, match="Task t: expected_answer"):
+        TaskRegistry([{"task_id": "t", "description": "x", "expected_answer": value}])
+
+
+def test_duplicate_ids_are_rejected():
+    with pytest.raises(ValueError, match="Duplicate task id: a"):
+        TaskRegistry([{"task_id": "a", "description": "x"}, {"task_id": "a", "description": "y"}])
+
+
+def test_toml_and_jsonl_files_load_together(tmp_path):
+    toml = tmp_path / "extra.toml"
+    toml.write_text('[[tasks]]\ntask_id = "t1"\ndescription = "Latest BP"\nexpected_answer = "120/80"\n')
+    jsonl = tmp_path / "extra.jsonl"
+    jsonl.write_text('{"task_id": "t2", "description": "Latest pulse", "category": "Vitals"}\n\n')
+    registry = load_task_registry([toml, jsonl])
+    assert registry.get("t1")["expected_answer"] == ["120/80"]
+    assert [t["task_id"] for t in registry.by_category("vitals")] == ["t2"]
+    assert registry.select(category="all", task_ids=["t2"]) == [registry.get("t2")]
+    with pytest.raises(ValueError, match="Unknown task ids: t9"):
+        registry.select(task_ids=["t9"])